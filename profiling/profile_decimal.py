@@ -0,0 +1,104 @@
+"""
+Benchmarks encoding and decoding of DECIMAL and MONEY values.
+
+Rows are encoded as bulk load request, same stream is then read back
+as a result set, both with Decimal values and with decimals_as_int option.
+Pass --profile to also print cProfile statistics.
+"""
+import cProfile
+import decimal
+import pstats
+import sys
+import time
+
+from pytds import collate, tds_base
+from pytds.tds_socket import _TdsSocket
+from pytds.tds_types import DecimalType, MoneyType
+
+
+ROWS = 100000
+COLUMNS = [
+    tds_base.Column(name="a", type=DecimalType(precision=18, scale=2)),
+    tds_base.Column(name="b", type=DecimalType(precision=38, scale=10)),
+    tds_base.Column(name="c", type=MoneyType()),
+]
+
+
+class Sock:
+    def __init__(self, response=b""):
+        self._response = response
+        self._read_pos = 0
+        self.sent = bytearray()
+
+    def sendall(self, data, flags=0):
+        self.sent += data
+
+    def recv_into(self, buffer, size=0):
+        if size == 0:
+            size = len(buffer)
+        chunk = self._response[self._read_pos : self._read_pos + size]
+        buffer[: len(chunk)] = chunk
+        self._read_pos += len(chunk)
+        return len(chunk)
+
+    def recv(self, size):
+        buf = bytearray(size)
+        return bytes(buf[: self.recv_into(buf, size)])
+
+    def close(self):
+        pass
+
+
+def _socket(sock, login):
+    tds = _TdsSocket(sock=sock, login=login)
+    tds.tds_version = tds_base.TDS74
+    tds.collation = collate.raw_collation
+    return tds
+
+
+def encode(rows):
+    sock = Sock()
+    _socket(sock, tds_base._TdsLogin()).main_session.submit_bulk(COLUMNS, rows)
+    return bytes(sock.sent)
+
+
+def decode(stream, decimals_as_int):
+    login = tds_base._TdsLogin()
+    login.decimals_as_int = decimals_as_int
+    sess = _socket(Sock(stream), login).main_session
+    sess.submit_plain_query("select 1")
+    sess.begin_response()
+    sess.find_result_or_done()
+    count = 0
+    while sess.fetchone() is not None:
+        count += 1
+    return count
+
+
+def run(name, func, profile):
+    pr = cProfile.Profile()
+    if profile:
+        pr.enable()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    if profile:
+        pr.disable()
+    print(f"{name}: {elapsed:.3f}s, {ROWS * len(COLUMNS) / elapsed:,.0f} values/s")
+    if profile:
+        pstats.Stats(pr).sort_stats("tottime").print_stats(10)
+
+
+profile = "--profile" in sys.argv
+rows = [
+    (
+        decimal.Decimal(i) / 100,
+        decimal.Decimal(-i) * 10**18 + decimal.Decimal(i) / 10**10,
+        decimal.Decimal(i - ROWS // 2) / 10000,
+    )
+    for i in range(ROWS)
+]
+stream = encode(rows)
+run("encode", lambda: encode(rows), profile)
+run("decode Decimal", lambda: decode(stream, False), profile)
+run("decode int", lambda: decode(stream, True), profile)
@@ -1,57 +1,81 @@
-import struct
+"""
+Benchmarks _TdsReader in normal and read-ahead modes.
+
+Mock socket serves endless stream of response packets, number of recv_into
+calls and time spent reading packets is printed for each mode.
+Pass --profile to also print cProfile statistics.
+"""
 import cProfile
 import pstats
-import pytds.tds_socket
+import struct
+import sys
+import time
+
+from pytds.tds_reader import _TdsReader
 
 
 BUFSIZE = 4096
+PACKETS = 50000
 HEADER = struct.Struct(">BBHHBx")
 
 
 class Sock:
-    def __init__(self):
+    def __init__(self, chunk=BUFSIZE * 64):
+        # stream consisting of several complete packets which is served in a loop
+        packet = bytearray(BUFSIZE)
+        HEADER.pack_into(packet, 0, 4, 0, BUFSIZE, 0, 0)
+        self._buf = bytes(packet) * (chunk // BUFSIZE)
         self._read_pos = 0
-        self._buf = bytearray(b"\x00" * BUFSIZE)
-        HEADER.pack_into(self._buf, 0, 0, 0, BUFSIZE, 0, 0)
+        self.recv_calls = 0
 
     def sendall(self, data, flags=0):
         pass
 
     def recv_into(self, buffer, size=0):
+        self.recv_calls += 1
         if size == 0:
             size = len(buffer)
-        if self._read_pos >= BUFSIZE:
-            HEADER.pack_into(self._buf, 0, 0, 0, BUFSIZE, 0, 0)
+        if self._read_pos >= len(self._buf):
             self._read_pos = 0
-        to_read = min(size, BUFSIZE - self._read_pos)
+        to_read = min(size, len(self._buf) - self._read_pos)
         buffer[:to_read] = self._buf[self._read_pos : self._read_pos + to_read]
+        self._read_pos += to_read
         return to_read
 
     def recv(self, size):
-        if self._read_pos >= len(self._buf):
-            HEADER.pack_into(self._buf, 0, 0, 0, BUFSIZE, 0, 0)
-            self._read_pos = 0
-        res = self._buf[self._read_pos : self._read_pos + size]
-        self._read_pos += len(res)
-        return res
+        buf = bytearray(size)
+        return bytes(buf[: self.recv_into(buf, size)])
 
     def close(self):
         pass
 
 
-class Session:
-    def __init__(self):
-        self._transport = Sock()
-
+def run(readahead_size, profile=False):
+    sock = Sock()
+    rdr = _TdsReader(
+        tds_session=None,
+        transport=sock,
+        bufsize=BUFSIZE,
+        readahead_size=readahead_size,
+    )
+    pr = cProfile.Profile()
+    if profile:
+        pr.enable()
+    start = time.perf_counter()
+    for _ in range(PACKETS):
+        rdr._read_packet()
+        rdr.read_whole_packet()
+    elapsed = time.perf_counter() - start
+    if profile:
+        pr.disable()
+    print(
+        f"readahead_size={readahead_size}: {elapsed:.3f}s, "
+        f"{sock.recv_calls} recv_into calls for {PACKETS} packets"
+    )
+    if profile:
+        pstats.Stats(pr).sort_stats("tottime").print_stats(10)
 
-sess = Session()
 
-rdr = pytds.tds._TdsReader(sess)
-pr = cProfile.Profile()
-pr.enable()
-for _ in range(50000):
-    rdr.recv(BUFSIZE)
-pr.disable()
-sortby = "tottime"
-ps = pstats.Stats(pr).sort_stats(sortby)
-ps.print_stats()
+profile = "--profile" in sys.argv
+for size in (0, 64 * 1024, 256 * 1024):
+    run(size, profile)
@@ -23,6 +23,7 @@ from .row_strategies import (
     dict_row_strategy,
     namedtuple_row_strategy,  # noqa: F401 # export for backward compatibility
     recordtype_row_strategy,  # noqa: F401 # export for backward compatibility
+    lazy_row_strategy,  # noqa: F401 # export
     RowStrategy,
 )
 from .tds_socket import _TdsSocket
@@ -143,6 +144,12 @@ def connect(
     access_token_callable: Callable[[], str] | None = None,
     logical_server_name: str | None = None,
     tls_hostname: str | None = None,
+    readahead_size: int = 0,
+    binary_as_memoryview: bool = False,
+    decimals_as_int: bool = False,
+    string_cache_max_length: int = 0,
+    prepared_cache_size: int = 0,
+    bulk_executemany_min_rows: int = 0,
 ):
     """
     Opens connection to the database
@@ -187,7 +194,7 @@ def connect(
     :type bytes_to_unicode: bool
     :keyword row_strategy: strategy used to create rows, determines type of returned rows, can be custom or one of:
       :func:`tuple_row_strategy`, :func:`list_row_strategy`, :func:`dict_row_strategy`,
-      :func:`namedtuple_row_strategy`, :func:`recordtype_row_strategy`
+      :func:`namedtuple_row_strategy`, :func:`recordtype_row_strategy`, :func:`lazy_row_strategy`
     :type row_strategy: function of list of column names returning row factory
     :keyword cafile: Name of the file containing trusted CAs in PEM format, if provided will enable TLS
     :type cafile: str
@@ -210,6 +217,35 @@ def connect(
       differs from ``logical_server_name`` (e.g. when a proxy performs TLS termination under a
       different name). Defaults to ``logical_server_name``.
     :type tls_hostname: str
+    :keyword readahead_size: Enables read-ahead mode when greater than zero, in this mode
+      data is received from the socket in chunks of up to given size, e.g. 65536, and TDS packets
+      are split out of these chunks, which reduces number of receive calls for large results.
+      Not used with MARS. Default is 0, which reads each packet separately.
+    :type readahead_size: int
+    :keyword binary_as_memoryview: If true VARBINARY, VARBINARY(MAX) and IMAGE values are returned
+      as read-only memoryview objects instead of bytes, which saves a copy of large values.
+    :type binary_as_memoryview: bool
+    :keyword decimals_as_int: If true DECIMAL/NUMERIC values are returned as integers
+      scaled by 10 to the power of column's scale, and MONEY/SMALLMONEY values
+      as integers in ten-thousandths, instead of Decimal objects.
+    :type decimals_as_int: bool
+    :keyword string_cache_max_length: Enables cache of decoded values for VARCHAR/NVARCHAR/CHAR/NCHAR
+      result columns declared with at most this many characters, identical values of such
+      columns are decoded once and returned as the same string object,
+      see :func:`pytds.Cursor.set_decode_cache`.  Default is 0, which disables the cache.
+    :type string_cache_max_length: int
+    :keyword prepared_cache_size: Maximum number of prepared statement handles kept by the connection.
+      When it is not 0, parameterized queries are prepared on the server with ``sp_prepexec``
+      on first execution and executed by handle with ``sp_execute`` afterwards.
+      Least recently used handles are unprepared when cache is full.
+      Default is 0, which disables the cache and uses ``sp_executesql`` for every execution.
+    :type prepared_cache_size: int
+    :keyword bulk_executemany_min_rows: When not 0, :func:`pytds.Cursor.executemany` called with
+      at least this many parameter sets for a single row ``INSERT INTO table (columns) VALUES (...)``
+      statement loads rows with ``INSERT BULK`` request instead of executing statement for every row.
+      Types of columns are inferred from the values.  Statements which list identity columns
+      are executed for every row.  Default is 0, which disables this.
+    :type bulk_executemany_min_rows: int
     :returns: An instance of :class:`Connection`
     """
     if use_sso and auth:
@@ -272,9 +308,15 @@ def connect(
     login.connect_timeout = login_timeout
     login.query_timeout = timeout
     login.blocksize = blocksize
+    login.readahead_size = readahead_size
     login.readonly = readonly
     login.load_balancer = load_balancer
     login.bytes_to_unicode = bytes_to_unicode
+    login.binary_as_memoryview = binary_as_memoryview
+    login.decimals_as_int = decimals_as_int
+    login.string_cache_max_length = string_cache_max_length
+    login.prepared_cache_size = prepared_cache_size
+    login.bulk_executemany_min_rows = bulk_executemany_min_rows
 
     if server and dsn:
         raise ValueError("Both server and dsn shouldn't be specified")
@@ -326,8 +368,14 @@ def connect(
         login.use_mars,
         login.cafile,
         login.blocksize,
+        login.readahead_size,
         login.readonly,
         login.bytes_to_unicode,
+        login.binary_as_memoryview,
+        login.decimals_as_int,
+        login.string_cache_max_length,
+        login.prepared_cache_size,
+        login.bulk_executemany_min_rows,
         login.auth,
         login.client_tz,
         autocommit,
@@ -354,6 +402,8 @@ def connect(
             if res is not None:
                 tds_socket, sess = res
                 sess.callproc("sp_reset_connection", [])
+                # reset releases prepared statements on the server
+                tds_socket.clear_prepared_cache()
                 tds_socket._row_strategy = row_strategy
                 if tds_socket.mars_enabled:
                     return MarsConnection(
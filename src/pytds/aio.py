@@ -0,0 +1,671 @@
+"""
+This module implements asyncio connection and cursor classes
+
+Requests are sent and responses are received using asyncio streams, while
+requests are built and responses are parsed by the same code which is used
+by blocking connections.
+
+Responses and requests are not streamed:
+
+- each response is received into memory as a whole before it is parsed,
+  so all rows of all result sets of a query are held in memory until
+  they are fetched, memory use grows with the size of the response;
+- :meth:`AsyncCursor.copy_to` encodes all rows into memory before they
+  are sent, so memory use grows with the size of the loaded data.
+
+Use blocking connections, which stream both, for large result sets and loads,
+or split them into smaller queries and ``copy_to`` calls.
+
+Example:
+
+.. code-block:: python
+
+    conn = await pytds.aio.connect("localhost", user="sa", password="secret")
+    async with conn:
+        cursor = conn.cursor()
+        await cursor.execute("select name from sys.databases where owner_sid = %s", (sid,))
+        async for row in cursor:
+            print(row[0])
+
+Encryption, MARS, named instances, connection pooling and authentication
+methods other than SQL server login are not supported by asyncio connections.
+"""
+from __future__ import annotations
+
+import asyncio
+import collections.abc
+import datetime
+import os
+import socket
+import typing
+import uuid
+from typing import Any, Callable, Iterable
+
+import pytds.tz
+from . import bulk, lcid, tds_base, utils
+from .cursor import _copy_options
+from .row_strategies import RowStrategy, tuple_row_strategy
+from .tds_base import PreLoginEnc, _header, logger
+from .tds_session import _TdsSession
+from .tds_socket import _TdsSocket
+
+# Responses are received into memory before they are parsed,
+# so reading them in large chunks is cheap
+_READAHEAD_SIZE = 65536
+
+
+class _StreamTransport:
+    """
+    Transport for :class:`_TdsSession` on top of asyncio streams.
+
+    Written data is passed to the stream writer which buffers it until
+    :meth:`drain` is awaited, reads are served from responses received by
+    :meth:`receive_message`.
+    """
+
+    def __init__(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self._reader = reader
+        self._writer = writer
+        self._input = bytearray()
+        self._pos = 0
+        self._timeout: float | None = None
+
+    def gettimeout(self) -> float | None:
+        return self._timeout
+
+    def settimeout(self, timeout: float | None) -> None:
+        self._timeout = timeout
+
+    def sendall(self, buf: bytes, flags: int = 0) -> None:
+        self._writer.write(buf)
+
+    def recv(self, size: int) -> bytes:
+        buf = bytearray(size)
+        received = self.recv_into(buf, size)
+        return bytes(buf[:received])
+
+    def recv_into(
+        self, buf: bytearray | memoryview, size: int = 0, flags: int = 0
+    ) -> int:
+        available = len(self._input) - self._pos
+        if not available:
+            raise tds_base.InterfaceError(
+                "Response should be received before it is parsed"
+            )
+        size = min(size or len(buf), available)
+        buf[:size] = self._input[self._pos : self._pos + size]
+        self._pos += size
+        if self._pos == len(self._input):
+            self._input.clear()
+            self._pos = 0
+        return size
+
+    def close(self) -> None:
+        self._writer.close()
+
+    async def drain(self) -> None:
+        await self._writer.drain()
+
+    async def receive_message(self) -> None:
+        """Receives all packets of the next response message"""
+        try:
+            while True:
+                header = await self._reader.readexactly(_header.size)
+                _, status, size, _, _ = _header.unpack(header)
+                self._input += header
+                self._input += await self._reader.readexactly(size - _header.size)
+                # status bit 0x1 marks the last packet of the message
+                if status & 1:
+                    return
+        except asyncio.IncompleteReadError:
+            raise tds_base.ClosedConnectionError()
+
+
+def _skip_response(session: _TdsSession) -> None:
+    """Skips unread part of the previous response, it is already received"""
+    while session.state != tds_base.TDS_IDLE:
+        try:
+            session.complete_rpc()
+        except tds_base.DatabaseError:
+            # errors of statements which results were not read are discarded,
+            # as it happens when pending request is cancelled
+            pass
+
+
+class AsyncConnection:
+    """
+    Asyncio connection, this object is created by calling :func:`connect`
+    """
+
+    _connection_closed_exception = tds_base.InterfaceError("Connection closed")
+
+    def __init__(self, tds_socket: _TdsSocket, transport: _StreamTransport) -> None:
+        # _tds_socket is set to None when connection is closed
+        self._tds_socket: _TdsSocket | None = tds_socket
+        self._transport = transport
+
+    @property
+    def _session(self) -> _TdsSession:
+        if self._tds_socket is None:
+            raise self._connection_closed_exception
+        return self._tds_socket.main_session
+
+    @property
+    def autocommit(self) -> bool:
+        """
+        The current state of autocommit on the connection.
+        """
+        return self._session.autocommit
+
+    @property
+    def mars_enabled(self) -> bool:
+        return False
+
+    @property
+    def tds_version(self) -> int:
+        """
+        Version of the TDS protocol that is being used by this connection
+        """
+        if self._tds_socket is None:
+            raise self._connection_closed_exception
+        return self._tds_socket.tds_version
+
+    @property
+    def product_version(self):
+        """
+        Version of the MSSQL server
+        """
+        if self._tds_socket is None:
+            raise self._connection_closed_exception
+        return self._tds_socket.product_version
+
+    async def __aenter__(self) -> AsyncConnection:
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+    def cursor(self) -> AsyncCursor:
+        """
+        Return cursor object that can be used to make queries and fetch
+        results from the database.
+        """
+        if self._tds_socket is None:
+            raise self._connection_closed_exception
+        return AsyncCursor(self)
+
+    async def _receive(self, timeout: float | None) -> None:
+        try:
+            await asyncio.wait_for(self._transport.receive_message(), timeout)
+        except asyncio.TimeoutError:
+            # stream is in the middle of a response, so connection
+            # cannot be used anymore
+            self._abort()
+            raise tds_base.TimeoutError("Timeout")
+        except BaseException:
+            self._abort()
+            raise
+
+    async def _request(
+        self, submit: Callable[[], None], use_query_timeout: bool = True
+    ) -> None:
+        """Sends request written by `submit` and receives its response"""
+        session = self._session
+        _skip_response(session)
+        submit()
+        await self._transport.drain()
+        await self._receive(
+            self._transport.gettimeout() if use_query_timeout else None
+        )
+
+    async def _ensure_transaction(self) -> None:
+        session = self._session
+        if not session.autocommit and not session._tds.tds72_transaction:
+            await self._request(
+                lambda: session.submit_begin_tran(
+                    isolation_level=session.isolation_level
+                )
+            )
+            session.process_simple_request()
+
+    async def commit(self) -> None:
+        """
+        Commit transaction which is currently in progress.
+        """
+        session = self._session
+        if session.autocommit or not session._tds.tds72_transaction:
+            return
+        # Setting cont to True to start new transaction
+        # after current transaction is committed
+        await self._request(
+            lambda: session.submit_commit(
+                cont=True, isolation_level=session.isolation_level
+            ),
+            use_query_timeout=False,
+        )
+        session.process_simple_request()
+
+    async def rollback(self) -> None:
+        """
+        Roll back transaction which is currently in progress.
+        """
+        if self._tds_socket is None:
+            return
+        session = self._session
+        if session.autocommit or not session._tds.tds72_transaction:
+            return
+        # Setting cont to True to start new transaction
+        # after current transaction is rolled back
+        await self._request(
+            lambda: session.submit_rollback(
+                cont=True, isolation_level=session.isolation_level
+            ),
+            use_query_timeout=False,
+        )
+        session.process_simple_request()
+
+    def _abort(self) -> None:
+        if self._tds_socket is not None:
+            self._tds_socket.close()
+            self._tds_socket = None
+
+    async def close(self) -> None:
+        """Close connection to an MS SQL Server.
+
+        It can be called more than once in a row. No exception is raised in
+        this case.
+        """
+        if self._tds_socket is not None:
+            logger.debug("Closing connection")
+            self._abort()
+            try:
+                await self._transport._writer.wait_closed()
+            except OSError:
+                pass
+
+
+class AsyncCursor:
+    """
+    Asyncio cursor, which is used to issue queries and fetch results
+    from a database connection.  Only one cursor of a connection can be
+    used at a time, executing a query discards unread results of the previous one.
+
+    Response of a query is received in full by :meth:`execute`, so fetch methods
+    read rows from memory.
+    """
+
+    _cursor_closed_exception = tds_base.InterfaceError("Cursor is closed")
+
+    def __init__(self, connection: AsyncConnection) -> None:
+        self.arraysize = 1
+        # Null value in _connection means cursor was closed
+        self._connection: AsyncConnection | None = connection
+
+    @property
+    def _conn(self) -> AsyncConnection:
+        if self._connection is None:
+            raise self._cursor_closed_exception
+        return self._connection
+
+    @property
+    def connection(self) -> AsyncConnection | None:
+        return self._connection
+
+    async def __aenter__(self) -> AsyncCursor:
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        self.close()
+
+    def __aiter__(self) -> AsyncCursor:
+        return self
+
+    async def __anext__(self) -> Any:
+        row = await self.fetchone()
+        if row is None:
+            raise StopAsyncIteration
+        return row
+
+    def close(self) -> None:
+        """
+        Closes the cursor. The cursor is unusable from this point.
+        """
+        self._connection = None
+
+    async def execute(
+        self,
+        operation: str,
+        params: list[Any] | tuple[Any, ...] | dict[str, Any] | None = None,
+    ) -> AsyncCursor:
+        """Execute an SQL query
+
+        Parameters are passed in the same way as for :func:`pytds.Cursor.execute`.
+        """
+        conn = self._conn
+        await conn._ensure_transaction()
+        session = conn._session
+        await conn._request(lambda: session.submit_execute(operation, params))
+        session.begin_response()
+        session.find_result_or_done()
+        return self
+
+    async def execute_scalar(
+        self,
+        query_string: str,
+        params: list[Any] | tuple[Any, ...] | dict[str, Any] | None = None,
+    ) -> Any:
+        """
+        This method executes SQL query then returns first column of first row or the
+        result.
+        """
+        await self.execute(query_string, params)
+        row = await self.fetchone()
+        if not row:
+            return None
+        return row[0]
+
+    async def callproc(
+        self,
+        procname: tds_base.InternalProc | str,
+        parameters: dict[str, Any] | Iterable[Any] = (),
+    ) -> list[Any]:
+        """
+        Call a stored procedure with the given name.
+
+        :param procname: The name of the procedure to call
+        :param parameters: The optional parameters for the procedure
+        :returns: Parameters with values of OUTPUT parameters updated
+        """
+        conn = self._conn
+        await conn._ensure_transaction()
+        session = conn._session
+        results = list(parameters)
+        conv_parameters = session._convert_params(parameters)
+        await conn._request(lambda: session.submit_rpc(procname, conv_parameters, 0))
+        session.begin_response()
+        session.process_rpc()
+        for key, param in session.output_params.items():
+            results[key] = param.value
+        return results
+
+    async def get_proc_outputs(self) -> list[Any]:
+        """
+        If stored procedure has result sets and OUTPUT parameters use this method
+        after you processed all result sets to get values of the OUTPUT parameters.
+        """
+        return self._conn._session.get_proc_outputs()
+
+    async def get_proc_return_status(self) -> int | None:
+        """Last executed stored procedure's return value"""
+        if self._connection is None:
+            return None
+        return self._conn._session.get_proc_return_status()
+
+    async def copy_to(
+        self,
+        file: Iterable[str] | None = None,
+        table_or_view: str | None = None,
+        sep: str = "\t",
+        columns: Iterable[tds_base.Column | str] | None = None,
+        check_constraints: bool = False,
+        fire_triggers: bool = False,
+        keep_nulls: bool = False,
+        kb_per_batch: int | None = None,
+        rows_per_batch: int | None = None,
+        order: str | None = None,
+        tablock: bool = False,
+        schema: str | None = None,
+        null_string: str | None = None,
+        data: Iterable[collections.abc.Sequence[Any]] | None = None,
+        native_types: bool = False,
+    ) -> None:
+        """Load data to database using ``INSERT BULK`` operation,
+        parameters are the same as for :func:`pytds.Cursor.copy_to`
+
+        Unlike the blocking version, this method does not stream rows,
+        all rows are encoded into memory before they are sent, so for
+        large loads pass rows in several calls.
+        """
+        conn = self._conn
+        if native_types and data is None:
+            raise ValueError("native_types can only be used with data")
+        rows = bulk.copy_source_rows(file, data, sep, null_string)
+        obj_name = bulk.copy_target_name(table_or_view, schema)
+        if columns:
+            metadata = bulk.copy_columns_metadata(columns)
+        else:
+            await self.execute(f"select top 1 * from {obj_name} where 1<>1")
+            metadata = bulk.copy_table_metadata(conn._session, typed=native_types)
+        with_opts = _copy_options(
+            check_constraints=check_constraints,
+            fire_triggers=fire_triggers,
+            keep_nulls=keep_nulls,
+            kb_per_batch=kb_per_batch,
+            rows_per_batch=rows_per_batch,
+            order=order,
+            tablock=tablock,
+        )
+        operation = bulk.insert_bulk_statement(obj_name, metadata, with_opts)
+        await self.execute(operation)
+        session = conn._session
+        await conn._request(lambda: session.submit_bulk(metadata, rows))
+        session.process_simple_request()
+
+    async def nextset(self) -> bool | None:
+        """Move to next recordset in batch statement, all rows of current recordset are
+        discarded if present.
+
+        :returns: true if successful or ``None`` when there are no more recordsets
+        """
+        return self._conn._session.next_set()
+
+    async def fetchone(self) -> Any:
+        """Fetch next row.
+
+        Returns row using currently configured factory, or ``None`` if there are no more rows
+        """
+        return self._conn._session.fetchone()
+
+    async def fetchmany(self, size: int | None = None) -> list[Any]:
+        """Fetch next N rows
+
+        :param size: Maximum number of rows to return, default value is cursor.arraysize
+        """
+        if size is None:
+            size = self.arraysize
+        return self._conn._session.fetch_rows(size)
+
+    async def fetchall(self) -> list[Any]:
+        """Fetch all remaining rows"""
+        return self._conn._session.fetch_rows()
+
+    @property
+    def rowcount(self) -> int:
+        """Number of rows affected by previous statement
+
+        :returns: -1 if this information was not supplied by the server
+        """
+        if self._connection is None or self._connection._tds_socket is None:
+            return -1
+        return self._connection._session.rows_affected
+
+    @property
+    def description(self):
+        """Cursor description, see http://legacy.python.org/dev/peps/pep-0249/#description"""
+        if self._connection is None or self._connection._tds_socket is None:
+            return None
+        res = self._connection._session.res_info
+        if res:
+            return res.description
+        else:
+            return None
+
+    @property
+    def messages(
+        self,
+    ) -> (
+        list[
+            tuple[
+                typing.Type,
+                tds_base.IntegrityError
+                | tds_base.ProgrammingError
+                | tds_base.OperationalError,
+            ]
+        ]
+        | None
+    ):
+        """Messages generated by server, see http://legacy.python.org/dev/peps/pep-0249/#cursor-messages"""
+        if self._connection is None or self._connection._tds_socket is None:
+            return None
+        result = []
+        for msg in self._connection._session.messages:
+            ex = tds_base._create_exception_by_message(msg)
+            result.append((type(ex), ex))
+        return result
+
+
+async def _open(
+    login: tds_base._TdsLogin,
+    host: str,
+    port: int,
+    autocommit: bool,
+    isolation_level: int,
+    use_tz: datetime.tzinfo | None,
+    row_strategy: RowStrategy,
+) -> AsyncConnection:
+    """
+    Establish physical connection and login.
+    """
+    login.server_name = host
+    login.tls_hostname = host
+    logger.info("Opening connection to %s:%d", host, port)
+    reader, writer = await asyncio.open_connection(host, port)
+    transport = _StreamTransport(reader, writer)
+    try:
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            # default keep alive should be 30 seconds according to spec:
+            # https://msdn.microsoft.com/en-us/library/dd341108.aspx
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 30)
+        tds_socket = _TdsSocket(
+            sock=transport,
+            tzinfo_factory=None if use_tz is None else pytds.tz.FixedOffsetTimezone,
+            use_tz=use_tz,
+            row_strategy=row_strategy,
+            autocommit=autocommit,
+            login=login,
+            isolation_level=isolation_level,
+        )
+        logger.info("Performing login on the connection")
+        for _ in tds_socket.login_steps():
+            await transport.drain()
+            await transport.receive_message()
+        route = tds_socket.route
+        if route is not None:
+            logger.info(
+                "Connection was rerouted to %s:%d", route["server"], route["port"]
+            )
+            transport.close()
+            return await _open(
+                login=login,
+                host=route["server"],
+                port=route["port"],
+                autocommit=autocommit,
+                isolation_level=isolation_level,
+                use_tz=use_tz,
+                row_strategy=row_strategy,
+            )
+        transport.settimeout(login.query_timeout)
+        conn = AsyncConnection(tds_socket, transport)
+        await conn._ensure_transaction()
+        return conn
+    except BaseException:
+        transport.close()
+        raise
+
+
+async def connect(
+    dsn: str | None = None,
+    database: str | None = None,
+    user: str | None = None,
+    password: str | None = None,
+    timeout: float | None = None,
+    login_timeout: float = 15,
+    appname: str | None = None,
+    port: int | None = None,
+    tds_version: int = tds_base.TDS74,
+    autocommit: bool = False,
+    blocksize: int = 4096,
+    readonly: bool = False,
+    use_tz: datetime.tzinfo | None = None,
+    bytes_to_unicode: bool = True,
+    row_strategy: RowStrategy | None = None,
+    isolation_level: int = 0,
+) -> AsyncConnection:
+    """
+    Opens asyncio connection to the database
+
+    Parameters have the same meaning as parameters of :func:`pytds.connect`.
+
+    Responses of this connection are received into memory as a whole before
+    they are parsed, and bulk loads are encoded into memory before they are
+    sent, see :mod:`pytds.aio`.
+
+    :keyword dsn: SQL server host, named instances are not supported, use port instead
+    :keyword port: the TCP port to use to connect to the server, default is 1433
+    :returns: An instance of :class:`AsyncConnection`
+    """
+    host, instance = utils.parse_server(dsn or "localhost")
+    if instance:
+        raise ValueError(
+            "Named instances are not supported by asyncio connections, specify port instead"
+        )
+    if tds_version < tds_base.TDS70:
+        raise ValueError("This TDS version is not supported")
+
+    login = tds_base._TdsLogin()
+    login.client_host_name = socket.gethostname()[:128]
+    login.library = "Python TDS Library"
+    login.user_name = user or ""
+    login.password = password or ""
+    login.app_name = appname or "pytds"
+    login.port = port
+    login.language = ""  # use database default
+    login.attach_db_file = ""
+    login.tds_version = tds_version
+    login.database = database or ""
+    login.bulk_copy = False
+    login.client_lcid = lcid.LANGID_ENGLISH_US
+    login.use_mars = False
+    login.pid = os.getpid()
+    login.change_password = ""
+    login.client_id = uuid.getnode()  # client mac address
+    login.tls_ctx = None
+    login.enc_flag = PreLoginEnc.ENCRYPT_NOT_SUP
+    login.client_tz = use_tz or pytds.tz.local
+    # see pytds.connect
+    login.option_flag2 = tds_base.TDS_ODBC_ON
+    login.connect_timeout = login_timeout
+    login.query_timeout = timeout
+    login.blocksize = blocksize
+    login.readahead_size = _READAHEAD_SIZE
+    login.readonly = readonly
+    login.bytes_to_unicode = bytes_to_unicode
+
+    try:
+        return await asyncio.wait_for(
+            _open(
+                login=login,
+                host=host,
+                port=port or 1433,
+                autocommit=autocommit,
+                isolation_level=isolation_level,
+                use_tz=use_tz,
+                row_strategy=row_strategy or tuple_row_strategy,
+            ),
+            login_timeout,
+        )
+    except asyncio.TimeoutError:
+        raise tds_base.TimeoutError("Login timeout")
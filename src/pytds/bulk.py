@@ -0,0 +1,544 @@
+"""
+This module contains helpers for bulk loading of data with ``INSERT BULK`` requests
+"""
+from __future__ import annotations
+
+import concurrent.futures
+import csv
+import itertools
+import queue
+import re
+import threading
+import typing
+from typing import Any, Callable, Iterable, Iterator, Sequence
+
+from pytds import tds_base, tds_types
+from pytds.tds_types import (
+    BigIntType,
+    DecimalType,
+    IntType,
+    NVarCharType,
+    TdsTypeInferrer,
+)
+
+if typing.TYPE_CHECKING:
+    from pytds.connection import Connection
+    from pytds.tds_session import _TdsSession
+
+_IDENT = r'(?:\[(?:[^\]]|\]\])+\]|"[^"]+"|[\w#@$]+)'
+
+_INSERT_RE = re.compile(
+    r"^\s*insert\s+(?:into\s+)?"
+    rf"(?P<table>{_IDENT}(?:\s*\.\s*{_IDENT}){{0,3}})\s*"
+    r"\((?P<columns>[^()]*)\)\s*"
+    r"values\s*\((?P<values>(?:[^()]|%\([^()]*\))*)\)\s*;?\s*$",
+    re.IGNORECASE,
+)
+
+_PLACEHOLDER_RE = re.compile(r"%s|%\((?P<name>[^)]+)\)s")
+
+
+class InsertStatement(typing.NamedTuple):
+    """Parsed single row ``INSERT ... VALUES`` statement"""
+
+    #: Name of the target table as written in the statement
+    table: str
+    #: Unquoted names of the target columns
+    columns: list[str]
+    #: Names of the placeholders for dict parameters, None for positional placeholders
+    param_names: list[str] | None
+
+
+def _unquote_id(ident: str) -> str:
+    if ident.startswith("[") and ident.endswith("]"):
+        return ident[1:-1].replace("]]", "]")
+    if ident.startswith('"') and ident.endswith('"'):
+        return ident[1:-1]
+    return ident
+
+
+def parse_insert(operation: str) -> InsertStatement | None:
+    """Parses ``INSERT INTO table (columns) VALUES (placeholders)`` statement
+
+    Every value should be a placeholder, either ``%s`` or ``%(name)s``.
+
+    :returns: Parsed statement or None if operation is not such statement
+    """
+    match = _INSERT_RE.match(operation)
+    if not match:
+        return None
+    columns = [
+        _unquote_id(column.strip()) for column in match.group("columns").split(",")
+    ]
+    values = [value.strip() for value in match.group("values").split(",")]
+    if len(columns) != len(values):
+        return None
+    names = []
+    for value in values:
+        placeholder = _PLACEHOLDER_RE.fullmatch(value)
+        if not placeholder:
+            return None
+        names.append(placeholder.group("name"))
+    if all(name is None for name in names):
+        return InsertStatement(match.group("table"), columns, None)
+    if any(name is None for name in names):
+        return None
+    return InsertStatement(match.group("table"), columns, names)
+
+
+def _merge_types(a: Any, b: Any) -> Any | None:
+    """Returns type which can hold values of both types, or None if there is no such type"""
+    if a.get_declaration() == b.get_declaration():
+        return a
+    if isinstance(a, (IntType, BigIntType)) and isinstance(b, (IntType, BigIntType)):
+        return BigIntType()
+    if isinstance(a, DecimalType) and isinstance(b, DecimalType):
+        scale = max(a.scale, b.scale)
+        digits = max(a.precision - a.scale, b.precision - b.scale)
+        if digits + scale > 38:
+            return None
+        return DecimalType(precision=digits + scale, scale=scale)
+    return None
+
+
+def infer_columns(
+    type_inferrer: TdsTypeInferrer,
+    names: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+) -> list[tds_base.Column] | None:
+    """Infers types of bulk insert columns from values of all rows
+
+    Type of each column is the narrowest type which can hold all non NULL values
+    of the column.
+
+    :returns: List of nullable columns, or None if values of some column
+              cannot be stored in a single type
+    """
+    types: list[Any] = [None] * len(names)
+    classes: list[type | None] = [None] * len(names)
+    for row in rows:
+        for i, value in enumerate(row):
+            if value is None:
+                continue
+            cls = type(value)
+            # types of these values do not depend on the value itself
+            if cls is classes[i] and cls in (str, float, bool):
+                continue
+            value_type = type_inferrer.from_value(value)
+            if types[i] is None:
+                types[i] = value_type
+            else:
+                merged = _merge_types(types[i], value_type)
+                if merged is None:
+                    return None
+                types[i] = merged
+            classes[i] = cls
+    return [
+        tds_base.Column(
+            name=name,
+            type=types[i] if types[i] is not None else type_inferrer.from_value(None),
+            flags=tds_base.Column.fNullable,
+        )
+        for i, name in enumerate(names)
+    ]
+
+
+def insert_bulk_statement(
+    obj_name: str, metadata: Sequence[tds_base.Column], options: Sequence[str] = ()
+) -> str:
+    """Builds ``INSERT BULK`` statement which should precede bulk load request
+
+    :param obj_name: Quoted name of the target table or view
+    :param metadata: Columns which are loaded
+    :param options: Bulk load options, e.g. ``TABLOCK``
+    """
+    col_defs = ",".join(
+        f"{tds_base.tds_quote_id(col.column_name)} {col.type.get_declaration()}"
+        for col in metadata
+    )
+    with_part = ""
+    if options:
+        with_part = "WITH ({0})".format(",".join(options))
+    return "INSERT BULK {0}({1}) {2}".format(obj_name, col_defs, with_part)
+
+
+# SQL types of serializers of fixed size columns
+_fixed_sql_types: dict[type, tds_types.SqlTypeMetaclass] = {
+    tds_types.BitSerializer: tds_types.BitType(),
+    tds_types.TinyIntSerializer: tds_types.TinyIntType(),
+    tds_types.SmallIntSerializer: tds_types.SmallIntType(),
+    tds_types.IntSerializer: tds_types.IntType(),
+    tds_types.BigIntSerializer: tds_types.BigIntType(),
+    tds_types.RealSerializer: tds_types.RealType(),
+    tds_types.FloatSerializer: tds_types.FloatType(),
+    tds_types.Money4Serializer: tds_types.SmallMoneyType(),
+    tds_types.Money8Serializer: tds_types.MoneyType(),
+    tds_types.SmallDateTimeSerializer: tds_types.SmallDateTimeType(),
+    tds_types.DateTimeSerializer: tds_types.DateTimeType(),
+    tds_types.BitNSerializer: tds_types.BitType(),
+    tds_types.MsUniqueSerializer: tds_types.UniqueIdentifierType(),
+    tds_types.VariantSerializer: tds_types.VariantType(),
+}
+
+# SQL types of serializers of nullable columns by size of the value
+_sized_sql_types: dict[type, dict[int, tds_types.SqlTypeMetaclass]] = {
+    tds_types.FloatNSerializer: {4: tds_types.RealType(), 8: tds_types.FloatType()},
+    tds_types.MoneyNSerializer: {
+        4: tds_types.SmallMoneyType(),
+        8: tds_types.MoneyType(),
+    },
+    tds_types.DateTimeNSerializer: {
+        4: tds_types.SmallDateTimeType(),
+        8: tds_types.DateTimeType(),
+    },
+}
+
+
+def _column_sql_type(
+    serializer: tds_types.BaseTypeSerializer,
+) -> tds_types.SqlTypeMetaclass | None:
+    """Returns SQL type in which values of a result set column can be loaded
+
+    Non Unicode strings are loaded as Unicode strings, since Python strings are
+    encoded by the serializer using connection collation, which can be different
+    from collation of the column.
+
+    :returns: SQL type or None for types which cannot be declared, e.g. CLR types
+    """
+    sql_type = _fixed_sql_types.get(type(serializer))
+    if sql_type is not None:
+        return sql_type
+    sized = _sized_sql_types.get(type(serializer))
+    if sized is not None:
+        return sized.get(serializer.size)
+    if isinstance(
+        serializer,
+        (
+            tds_types.IntNSerializer,
+            tds_types.MsDateSerializer,
+            tds_types.MsTimeSerializer,
+            tds_types.DateTime2Serializer,
+            tds_types.DateTimeOffsetSerializer,
+        ),
+    ):
+        return serializer._typ
+    if isinstance(serializer, tds_types.MsDecimalSerializer):
+        return tds_types.DecimalType(
+            precision=serializer.precision, scale=serializer.scale
+        )
+    if isinstance(serializer, tds_types.XmlSerializer):
+        return tds_types.XmlType()
+    if isinstance(
+        serializer, (tds_types.NVarCharMaxSerializer, tds_types.VarCharMaxSerializer)
+    ):
+        return tds_types.NVarCharMaxType()
+    if isinstance(
+        serializer, (tds_types.NVarChar70Serializer, tds_types.VarChar70Serializer)
+    ):
+        size = int(serializer.size)
+        if size > 4000:
+            return tds_types.NVarCharMaxType()
+        return tds_types.NVarCharType(size=size)
+    if isinstance(
+        serializer, (tds_types.NText70Serializer, tds_types.Text70Serializer)
+    ):
+        return tds_types.NTextType()
+    if isinstance(serializer, tds_types.VarBinarySerializerMax):
+        return tds_types.VarBinaryMaxType()
+    if isinstance(serializer, tds_types.VarBinarySerializer):
+        return tds_types.VarBinaryType(size=serializer.size)
+    if isinstance(serializer, tds_types.Image70Serializer):
+        return tds_types.ImageType()
+    return None
+
+
+def table_columns(columns: Iterable[tds_base.Column]) -> list[tds_base.Column]:
+    """Builds bulk load columns from result set columns of the target table
+
+    Loaded columns have the same SQL types as the table, so values should be
+    Python objects of the corresponding types, e.g. ``int`` for `INT` columns.
+    Such values are sent in their native binary form and are not converted
+    by the server.
+    Columns which types cannot be declared are loaded as `NVARCHAR(4000)`.
+
+    :param columns: Columns of a result set of ``SELECT`` from the target table
+    """
+    result = []
+    for col in columns:
+        sql_type = _column_sql_type(col.serializer)
+        result.append(
+            tds_base.Column(
+                name=col.column_name,
+                type=sql_type or tds_types.NVarCharType(size=4000),
+                flags=col.flags & tds_base.Column.fNullable,
+            )
+        )
+    return result
+
+
+class CopyProgress(typing.NamedTuple):
+    """Progress of :func:`pytds.Cursor.copy_to`, reported after every committed batch"""
+
+    #: Number of rows loaded so far
+    rows: int
+    #: Offset of the next row of the input, pass it as `start_row` to resume the load
+    next_row: int
+    #: Number of bytes sent to the server so far
+    bytes: int
+    #: Number of seconds since the load has started
+    elapsed: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes / self.elapsed if self.elapsed else 0.0
+
+
+def iter_batches(rows: Iterable[Sequence[Any]], batch_size: int) -> Iterator[list]:
+    """Splits rows into lists of up to `batch_size` rows, reading input lazily"""
+    it = iter(rows)
+    while True:
+        batch = list(itertools.islice(it, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def copy_source_rows(
+    file: Iterable[str] | None,
+    data: Iterable[Sequence[Any]] | None,
+    sep: str,
+    null_string: str | None,
+) -> Iterable[Sequence[Any]]:
+    """Returns rows for :func:`pytds.Cursor.copy_to` from either csv file or data"""
+    if data is not None:
+        return data
+    if file is None:
+        raise ValueError("No data was specified via file or data parameter")
+    reader = csv.reader(file, delimiter=sep)
+
+    if null_string is not None:
+
+        def _convert_null_strings(csv_reader):
+            for row in csv_reader:
+                yield [r if r != null_string else None for r in row]
+
+        return _convert_null_strings(reader)
+    return reader
+
+
+def copy_target_name(table_or_view: str | None, schema: str | None) -> str:
+    obj_name = tds_base.tds_quote_id(table_or_view)
+    if schema:
+        obj_name = f"{tds_base.tds_quote_id(schema)}.{obj_name}"
+    return obj_name
+
+
+def copy_columns_metadata(
+    columns: Iterable[tds_base.Column | str],
+) -> list[tds_base.Column]:
+    """Column names are loaded as nullable NVARCHAR(4000) columns"""
+    metadata = []
+    for column in columns:
+        if isinstance(column, tds_base.Column):
+            metadata.append(column)
+        else:
+            metadata.append(
+                tds_base.Column(
+                    name=column,
+                    type=NVarCharType(size=4000),
+                    flags=tds_base.Column.fNullable,
+                )
+            )
+    return metadata
+
+
+def copy_table_metadata(session: _TdsSession, typed: bool) -> list[tds_base.Column]:
+    """Builds columns from result set of ``SELECT`` from the target table
+
+    Columns have SQL types of the table columns if `typed` is set,
+    otherwise they are NVARCHAR(4000) columns.
+    """
+    info = session.res_info
+    assert info is not None
+    if typed:
+        return table_columns(info.columns)
+    return [
+        tds_base.Column(
+            name=col[0],
+            type=NVarCharType(size=4000),
+            flags=tds_base.Column.fNullable if col[6] else 0,
+        )
+        for col in info.description
+    ]
+
+
+class _ParallelCopyState:
+    """State shared by workers of :func:`parallel_copy`"""
+
+    def __init__(self, workers: int):
+        # bounded, so that only a few batches are read ahead of the workers
+        self.batches: queue.Queue[tuple[int, list[Sequence[Any]]] | None] = (
+            queue.Queue(maxsize=workers * 2)
+        )
+        self.failed = threading.Event()
+        self.lock = threading.Lock()
+        self.loaded: list[tuple[int, int]] = []
+        self.errors: list[tuple[int, Exception]] = []
+
+
+def _copy_batches(
+    conn: Connection,
+    state: _ParallelCopyState,
+    copy_options: dict[str, Any],
+) -> None:
+    """Loads batches from the queue using given connection, until sentinel is received
+
+    After any batch fails remaining batches are skipped.  Queue is always
+    read up to the sentinel, even if the worker fails unexpectedly,
+    so that producer never blocks on a full queue.
+    """
+    try:
+        _load_batches(conn, state, copy_options)
+    except BaseException:
+        state.failed.set()
+        while state.batches.get() is not None:
+            pass
+        raise
+
+
+def _load_batches(
+    conn: Connection,
+    state: _ParallelCopyState,
+    copy_options: dict[str, Any],
+) -> None:
+    cursor = None
+    while True:
+        item = state.batches.get()
+        if item is None:
+            return
+        if state.failed.is_set():
+            continue
+        index, rows = item
+        try:
+            if cursor is None:
+                cursor = conn.cursor()
+            cursor.copy_to(data=rows, **copy_options)
+            conn.commit()
+        except Exception as ex:
+            with state.lock:
+                state.errors.append((index, ex))
+            state.failed.set()
+            try:
+                conn.rollback()
+            except Exception:
+                tds_base.logger.exception("Failed to rollback batch %d", index)
+        else:
+            with state.lock:
+                state.loaded.append((index, len(rows)))
+
+
+def parallel_copy(
+    conn_factory: Callable[[], Connection],
+    table: str,
+    rows: Iterable[Sequence[Any]] | None = None,
+    workers: int = 4,
+    batch_size: int = 10000,
+    file: Iterable[str] | None = None,
+    sep: str = "\t",
+    null_string: str | None = None,
+    columns: Iterable[tds_base.Column | str] | None = None,
+    schema: str | None = None,
+    native_types: bool = False,
+    **copy_options: Any,
+) -> int:
+    """Loads rows into the table over several connections in parallel
+
+    Rows are read from either `rows` or csv `file`, and are split into batches
+    of `batch_size` rows.  Batches are loaded by `workers` threads, each of them
+    uses its own connection created by `conn_factory` and loads every batch
+    with :func:`pytds.Cursor.copy_to`, followed by a commit.
+    Input is read lazily, only a few batches are held in memory at a time.
+
+    Other keyword arguments are passed to :func:`pytds.Cursor.copy_to`,
+    e.g. ``tablock=True`` allows concurrent loads into a heap
+    with compatible bulk update locks.
+
+    Example:
+
+    .. code-block::
+
+       def connect():
+           return pytds.connect(server, database, user, password)
+
+       with open("events.csv") as f:
+           parallel_copy(connect, "events", file=f, workers=8, tablock=True)
+
+    :param conn_factory: Callable which returns new connection
+    :param table: Name of the target table or view
+    :param rows: Rows to load, specify either this or `file`
+    :param workers: Number of connections which load data in parallel
+    :param batch_size: Number of rows loaded and committed at once
+    :param columns: Target columns, see :func:`pytds.Cursor.copy_to`
+    :param schema: Schema of the target table
+    :param native_types: Load rows into columns of the same types as columns
+                         of the table, see :func:`pytds.Cursor.copy_to`
+    :returns: Number of loaded rows
+    :raises BulkCopyError: If loading of some batches failed, batches which were
+                           loaded and committed are listed in the error
+    """
+    from pytds.cursor import BaseCursor
+
+    if workers < 1 or batch_size < 1:
+        raise ValueError("workers and batch_size should be positive numbers")
+    if native_types and rows is None:
+        raise ValueError("native_types can only be used with rows")
+    source = copy_source_rows(file, rows, sep, null_string)
+    connections: list[Connection] = []
+    try:
+        for _ in range(workers):
+            connections.append(conn_factory())
+        if columns:
+            metadata = copy_columns_metadata(columns)
+        else:
+            # resolve columns once instead of letting every batch query them
+            cursor = connections[0].cursor()
+            assert isinstance(cursor, BaseCursor)
+            obj_name = copy_target_name(table, schema)
+            cursor.execute(f"select top 1 * from {obj_name} where 1<>1")
+            assert cursor._session is not None
+            metadata = copy_table_metadata(cursor._session, typed=native_types)
+            cursor.close()
+        copy_options.update(table_or_view=table, schema=schema, columns=metadata)
+        state = _ParallelCopyState(workers)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_copy_batches, conn, state, copy_options)
+                for conn in connections
+            ]
+            try:
+                for index, batch in enumerate(iter_batches(source, batch_size)):
+                    if state.failed.is_set():
+                        break
+                    state.batches.put((index, batch))
+            finally:
+                for _ in futures:
+                    state.batches.put(None)
+            for future in futures:
+                future.result()
+    finally:
+        for conn in connections:
+            conn.close()
+    loaded = sorted(state.loaded)
+    rows_loaded = sum(count for _, count in loaded)
+    if state.errors:
+        errors = sorted(state.errors, key=lambda item: item[0])
+        raise tds_base.BulkCopyError(
+            errors=errors,
+            loaded_batches=[index for index, _ in loaded],
+            rows_loaded=rows_loaded,
+        ) from errors[0][1]
+    return rows_loaded
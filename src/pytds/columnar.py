@@ -0,0 +1,551 @@
+"""
+This module implements columnar fetching of result sets.
+
+Rows are decoded straight into preallocated per-column NumPy arrays instead of
+a tuple per row.  When result set consists only of fixed width numeric columns,
+whole runs of rows are copied out of the packet buffer with a single NumPy
+operation per column.
+Columns can also be exported as Arrow record batches.
+Columnar data can be bulk loaded, fixed width values are packed
+into the request with a few NumPy operations per chunk of rows.
+
+NumPy and PyArrow are optional dependencies, they are only needed when columnar API is used.
+"""
+from __future__ import annotations
+
+import collections.abc
+import typing
+from typing import Any, Iterator
+
+from pytds import tds_base, tds_types
+from pytds.row_decoder import fixed_layout
+from pytds.lazy_row import LazyRowDecoder
+
+if typing.TYPE_CHECKING:
+    import numpy
+    import pyarrow  # type: ignore # optional dependency
+    from pytds.tds_session import _TdsSession
+    from pytds.tds_writer import _TdsWriter
+
+# number of rows allocated at once when number of rows is not known upfront
+_CHUNK_ROWS = 65536
+
+# NumPy types for struct formats used by fixed width serializers
+_fixed_dtypes = {
+    "?": "?",
+    "B": "u1",
+    "h": "<i2",
+    "l": "<i4",
+    "q": "<i8",
+    "f": "<f4",
+    "d": "<f8",
+}
+
+
+def import_numpy() -> Any:
+    try:
+        import numpy  # type: ignore # optional dependency
+    except ImportError:
+        raise ImportError(
+            "To use columnar fetch you need to install numpy package"
+        )
+    return numpy
+
+
+def import_pyarrow() -> Any:
+    try:
+        import pyarrow  # type: ignore # optional dependency
+    except ImportError:
+        raise ImportError(
+            "To use Arrow export you need to install pyarrow package"
+        )
+    return pyarrow
+
+
+def column_dtype(serializer: tds_types.BaseTypeSerializer, tz_aware: bool) -> str:
+    """Returns NumPy type used to store values of the column
+
+    Columns which don't have native NumPy representation, e.g. strings, use object arrays.
+
+    :param serializer: Serializer of the column
+    :param tz_aware: True if date/time values are returned with timezone
+    """
+    layout = fixed_layout(serializer)
+    if layout is not None:
+        return _fixed_dtypes[layout[0]]
+    if isinstance(serializer, tds_types.MsDateSerializer):
+        return "datetime64[D]"
+    if not tz_aware and isinstance(
+        serializer,
+        (
+            tds_types.SmallDateTimeSerializer,
+            tds_types.DateTimeSerializer,
+            tds_types.DateTimeNSerializer,
+            tds_types.DateTime2Serializer,
+        ),
+    ):
+        return "datetime64[us]"
+    return "O"
+
+
+class ColumnarReader:
+    """Reads rows of the current result set of a session into per-column arrays
+
+    Each column is returned as :class:`numpy.ma.MaskedArray`, where mask
+    is set for NULL values.  Trailing hidden columns are not returned.
+    """
+
+    def __init__(self, session: _TdsSession):
+        self._np = np = import_numpy()
+        self._session = session
+        assert session.res_info is not None
+        columns = session.res_info.columns
+        tz_aware = session.tzinfo_factory is not None
+        # arrays are allocated only for visible columns,
+        # values of hidden columns are skipped when arrays are filled
+        visible = tds_base.visible_columns_count(columns)
+        self._dtypes = [
+            column_dtype(col.serializer, tz_aware) for col in columns[:visible]
+        ]
+        # If all columns have fixed layout on the wire, every row without NULLs
+        # has the same size and consecutive rows can be viewed as NumPy record array
+        self._row_dtype = None
+        layouts = [fixed_layout(col.serializer) for col in columns]
+        if layouts and all(layouts):
+            fields = [("token", "u1")]
+            self._prefixes = []
+            self._value_fields = []
+            for i, layout in enumerate(layouts):
+                assert layout is not None
+                fmt, prefix = layout
+                if prefix is not None:
+                    fields.append((f"p{i}", "u1"))
+                    self._prefixes.append((f"p{i}", prefix))
+                fields.append((f"v{i}", _fixed_dtypes[fmt]))
+                self._value_fields.append(f"v{i}")
+            self._row_dtype = np.dtype(fields)
+
+    def read(self, size: int | None = None) -> list[numpy.ma.MaskedArray]:
+        """Reads up to `size` rows, all remaining rows are read if `size` is None
+
+        :returns: List of arrays, one per column, arrays are shorter than `size`
+                  if result set has ended.
+        """
+        np = self._np
+        if size is not None:
+            datas, masks = self._allocate(size)
+            count = self._fill(datas, masks, size)
+            return self._masked(datas, masks, count)
+        chunks = []
+        while True:
+            datas, masks = self._allocate(_CHUNK_ROWS)
+            count = self._fill(datas, masks, _CHUNK_ROWS)
+            chunks.append(self._masked(datas, masks, count))
+            if count < _CHUNK_ROWS:
+                break
+        if len(chunks) == 1:
+            return chunks[0]
+        return [np.ma.concatenate(column) for column in zip(*chunks)]
+
+    def _allocate(self, size: int) -> tuple[list[Any], list[Any]]:
+        np = self._np
+        datas = [np.zeros(size, dtype=dtype) for dtype in self._dtypes]
+        masks = [np.zeros(size, dtype=bool) for _ in self._dtypes]
+        return datas, masks
+
+    def _masked(self, datas, masks, count: int) -> list[numpy.ma.MaskedArray]:
+        np = self._np
+        return [
+            np.ma.MaskedArray(data[:count], mask=mask[:count])
+            for data, mask in zip(datas, masks)
+        ]
+
+    def _fill(self, datas, masks, size: int) -> int:
+        session = self._session
+        row = session.row
+        assert row is not None
+        # lazy rows hold offsets of encoded values, they need to be decoded
+        lazy = isinstance(session._row_decoder, LazyRowDecoder)
+        count = 0
+        while count < size:
+            if self._row_dtype is not None and session.more_rows:
+                count += self._fill_fixed(datas, count, size - count)
+                if count >= size:
+                    break
+            if not session.next_row():
+                break
+            values = session._row_convertor(row) if lazy else row
+            for data, mask, value in zip(datas, masks, values):
+                if value is None:
+                    mask[count] = True
+                else:
+                    data[count] = value
+            count += 1
+        return count
+
+    def _fill_fixed(self, datas, start: int, size: int) -> int:
+        """Copies rows which are fully contained in the current packet buffer
+
+        Stops at first token which is not a ROW token, or at first row with NULLs,
+        those are handled by the regular decoding path.
+
+        :returns: Number of copied rows
+        """
+        np = self._np
+        r = self._session._reader
+        row_dtype = self._row_dtype
+        assert row_dtype is not None
+        pos = r._pos
+        count = min((r._size - pos) // row_dtype.itemsize, size)
+        if count <= 0:
+            return 0
+        rows = np.frombuffer(r._buf, dtype=row_dtype, count=count, offset=pos)
+        valid = rows["token"] == tds_base.TDS_ROW_TOKEN
+        for name, prefix in self._prefixes:
+            valid &= rows[name] == prefix
+        if not valid.all():
+            count = int(valid.argmin())
+            if count == 0:
+                return 0
+        for data, name in zip(datas, self._value_fields):
+            data[start : start + count] = rows[name][:count]
+        del rows
+        r._pos = pos + count * row_dtype.itemsize
+        assert self._session.res_info is not None
+        self._session.res_info.row_count += count
+        return count
+
+
+# Arrow types for struct formats used by fixed width serializers
+_fixed_arrow_types = {
+    "?": "bool_",
+    "B": "uint8",
+    "h": "int16",
+    "l": "int32",
+    "q": "int64",
+    "f": "float32",
+    "d": "float64",
+}
+
+
+def arrow_type(
+    pa: Any,
+    serializer: tds_types.BaseTypeSerializer,
+    tz_aware: bool,
+    bytes_to_unicode: bool,
+    decimals_as_int: bool = False,
+) -> pyarrow.DataType | None:
+    """Returns Arrow type for values of the column
+
+    :param pa: pyarrow module
+    :param serializer: Serializer of the column
+    :param tz_aware: True if date/time values are returned with timezone
+    :param bytes_to_unicode: True if VARCHAR values are returned as strings
+    :param decimals_as_int: True if DECIMAL and MONEY values are returned
+      as scaled integers
+    :returns: Arrow type or None if type should be inferred from values
+    """
+    layout = fixed_layout(serializer)
+    if layout is not None:
+        return getattr(pa, _fixed_arrow_types[layout[0]])()
+    if isinstance(serializer, tds_types.MsDateSerializer):
+        return pa.date32()
+    if isinstance(serializer, tds_types.MsTimeSerializer):
+        return pa.time64("us")
+    if isinstance(serializer, tds_types.DateTimeOffsetSerializer):
+        return pa.timestamp("us", tz="UTC")
+    if isinstance(
+        serializer,
+        (
+            tds_types.SmallDateTimeSerializer,
+            tds_types.DateTimeSerializer,
+            tds_types.DateTimeNSerializer,
+            tds_types.DateTime2Serializer,
+        ),
+    ):
+        return pa.timestamp("us", tz="UTC" if tz_aware else None)
+    if isinstance(serializer, tds_types.MsDecimalSerializer):
+        if decimals_as_int:
+            return pa.decimal128(serializer.precision, 0)
+        return pa.decimal128(serializer.precision, serializer.scale)
+    if decimals_as_int and isinstance(
+        serializer,
+        (
+            tds_types.Money4Serializer,
+            tds_types.Money8Serializer,
+            tds_types.MoneyNSerializer,
+        ),
+    ):
+        return pa.int64()
+    if isinstance(serializer, tds_types.Money4Serializer):
+        return pa.decimal128(10, 4)
+    if isinstance(serializer, (tds_types.Money8Serializer, tds_types.MoneyNSerializer)):
+        return pa.decimal128(19, 4)
+    if isinstance(
+        serializer,
+        (
+            tds_types.NVarChar70Serializer,
+            tds_types.NText70Serializer,
+            tds_types.MsUniqueSerializer,
+        ),
+    ):
+        return pa.string()
+    if isinstance(serializer, (tds_types.VarChar70Serializer, tds_types.Text70Serializer)):
+        return pa.string() if bytes_to_unicode else pa.binary()
+    if isinstance(
+        serializer,
+        (
+            tds_types.VarBinarySerializer,
+            tds_types.Image70Serializer,
+            tds_types.UDT72Serializer,
+        ),
+    ):
+        return pa.binary()
+    return None
+
+
+class ArrowBatchReader:
+    """Reads rows of the current result set of a session as Arrow record batches"""
+
+    def __init__(self, session: _TdsSession):
+        self._pa = pa = import_pyarrow()
+        self._columnar = ColumnarReader(session)
+        assert session.res_info is not None
+        columns = session.res_info.columns
+        columns = columns[: tds_base.visible_columns_count(columns)]
+        tz_aware = session.tzinfo_factory is not None
+        login = session._tds._login
+        self._types = [
+            arrow_type(
+                pa,
+                col.serializer,
+                tz_aware,
+                login.bytes_to_unicode,
+                login.decimals_as_int,
+            )
+            for col in columns
+        ]
+        # uniqueidentifier values are converted to their string form
+        self._uuid_columns = {
+            i
+            for i, col in enumerate(columns)
+            if isinstance(col.serializer, tds_types.MsUniqueSerializer)
+        }
+        self._names = [
+            col.column_name or f"col{i}" for i, col in enumerate(columns)
+        ]
+
+    def batches(self, batch_rows: int) -> Iterator[pyarrow.RecordBatch]:
+        """Yields record batches of up to `batch_rows` rows until result set ends
+
+        At least one batch is produced, even for empty result set,
+        so that schema of the result is always available.
+        """
+        while True:
+            columns = self._columnar.read(batch_rows)
+            count = len(columns[0]) if columns else 0
+            yield self._make_batch(columns)
+            if count < batch_rows:
+                return
+
+    def _make_batch(self, columns: list[numpy.ma.MaskedArray]) -> pyarrow.RecordBatch:
+        pa = self._pa
+        arrays = []
+        for i, (column, typ) in enumerate(zip(columns, self._types)):
+            data: Any = column.data
+            if i in self._uuid_columns:
+                data = [None if value is None else str(value) for value in data]
+            arrays.append(pa.array(data, mask=column.mask, type=typ))
+        return pa.RecordBatch.from_arrays(arrays, names=self._names)
+
+
+def column_sources(data: Any) -> list[tuple[str, Any, Any]]:
+    """Splits columnar data into columns for bulk loading
+
+    :param data: Dict of arrays, pandas DataFrame or Arrow table,
+                 values of a dict can be NumPy arrays, including masked arrays,
+                 pandas series or Arrow arrays
+    :returns: List of tuples of column name, NumPy array of values
+              and boolean NumPy array which is set for NULL values
+    """
+    np = import_numpy()
+    if hasattr(data, "column_names") and hasattr(data, "column"):
+        # Arrow table or record batch
+        items = [(name, data.column(name)) for name in data.column_names]
+    elif hasattr(data, "columns") and hasattr(data, "to_numpy"):
+        # pandas DataFrame
+        items = [(str(name), data[name]) for name in data.columns]
+    elif isinstance(data, collections.abc.Mapping):
+        items = list(data.items())
+    else:
+        raise TypeError(
+            "Columnar data should be a dict of arrays, a pandas DataFrame "
+            "or an Arrow table"
+        )
+    sources = []
+    for name, column in items:
+        values, mask = _column_arrays(np, column)
+        sources.append((name, values, mask))
+    if len({len(values) for _, values, _ in sources}) > 1:
+        raise ValueError("All columns should have the same number of values")
+    return sources
+
+
+def _column_arrays(np: Any, column: Any) -> tuple[Any, Any]:
+    if isinstance(column, np.ma.MaskedArray):
+        return column.data, np.ma.getmaskarray(column)
+    if hasattr(column, "is_null"):
+        # Arrow array, nulls are converted to NaN or None by NumPy conversion
+        return np.asarray(column), np.asarray(column.is_null())
+    if hasattr(column, "isna"):
+        # pandas series
+        return column.to_numpy(), column.isna().to_numpy()
+    values = np.asarray(column)
+    if values.dtype.kind == "O":
+        mask = np.equal(values, None)
+    elif values.dtype.kind == "f":
+        mask = np.isnan(values)
+    elif values.dtype.kind in "mM":
+        mask = np.isnat(values)
+    else:
+        mask = np.zeros(len(values), dtype=bool)
+    return values, mask
+
+
+class ColumnarBulkWriter:
+    """Writes rows of columnar data into ``INSERT BULK`` request
+
+    Values of fixed width numeric columns are packed into their wire format
+    with NumPy, a chunk of rows at a time.  When all columns are fixed width,
+    whole chunk is written into the stream as a single buffer.
+    Other columns are converted into Python values and written
+    by column serializers.
+    """
+
+    def __init__(
+        self,
+        serializers: list[tds_types.BaseTypeSerializer],
+        names: list[str],
+        chunk_rows: int = _CHUNK_ROWS,
+    ):
+        self._np = import_numpy()
+        self._serializers = serializers
+        self._names = names
+        self._chunk_rows = chunk_rows
+        self._layouts = [fixed_layout(serializer) for serializer in serializers]
+        # runs of adjacent fixed width columns are packed together
+        self._segments: list[tuple[bool, list[int]]] = []
+        for i, layout in enumerate(self._layouts):
+            fixed = layout is not None
+            if fixed and self._segments and self._segments[-1][0]:
+                self._segments[-1][1].append(i)
+            else:
+                self._segments.append((fixed, [i]))
+
+    def write(self, w: _TdsWriter, columns: list[tuple[Any, Any]]) -> None:
+        """Writes ROW tokens for all rows of the columns
+
+        :param w: Writer of the bulk request
+        :param columns: Arrays of values and NULL masks, one pair per column,
+                        see :func:`column_sources`
+        """
+        count = len(columns[0][0]) if columns else 0
+        for start in range(0, count, self._chunk_rows):
+            stop = min(start + self._chunk_rows, count)
+            if len(self._segments) == 1 and self._segments[0][0]:
+                data, _ = self._pack(self._segments[0][1], columns, start, stop, True)
+                w.write(data)
+            else:
+                self._write_rows(w, columns, start, stop)
+
+    def _write_rows(
+        self, w: _TdsWriter, columns: list[tuple[Any, Any]], start: int, stop: int
+    ) -> None:
+        parts: list[Any] = []
+        for fixed, indexes in self._segments:
+            if fixed:
+                parts.append(self._pack(indexes, columns, start, stop, False))
+            else:
+                parts.append(self._python_values(*columns[indexes[0]], start, stop))
+        segments = list(zip(self._segments, parts))
+        serializers = self._serializers
+        for row in range(stop - start):
+            w.put_byte(tds_base.TDS_ROW_TOKEN)
+            for (fixed, indexes), part in segments:
+                if fixed:
+                    data, ends = part
+                    w.write(data[ends[row] : ends[row + 1]])
+                else:
+                    serializers[indexes[0]].write(w, part[row])
+
+    def _python_values(self, values: Any, mask: Any, start: int, stop: int) -> list:
+        values = values[start:stop]
+        if values.dtype.kind == "M" and values.dtype != "datetime64[D]":
+            # nanoseconds are converted into integers by tolist
+            values = values.astype("datetime64[us]")
+        return [
+            None if null else value
+            for value, null in zip(values.tolist(), mask[start:stop].tolist())
+        ]
+
+    def _pack(
+        self,
+        indexes: list[int],
+        columns: list[tuple[Any, Any]],
+        start: int,
+        stop: int,
+        token: bool,
+    ) -> tuple[bytes, list[int]]:
+        """Packs values of fixed width columns into their wire format
+
+        :param token: Prepend every row with ROW token
+        :returns: Packed rows and offsets of the ends of the rows,
+                  preceded by zero
+        """
+        np = self._np
+        fields = [("token", "u1")] if token else []
+        for i in indexes:
+            layout = self._layouts[i]
+            assert layout is not None
+            if layout[1] is not None:
+                fields.append((f"p{i}", "u1"))
+            fields.append((f"v{i}", _fixed_dtypes[layout[0]]))
+        row_dtype = np.dtype(fields)
+        size = stop - start
+        rows = np.zeros(size, dtype=row_dtype)
+        if token:
+            rows["token"] = tds_base.TDS_ROW_TOKEN
+        # bytes of NULL values are cut out of packed rows
+        keep = None
+        for i in indexes:
+            fmt, prefix = self._layouts[i]  # type: ignore # fixed width column
+            values, mask = columns[i]
+            values = values[start:stop]
+            mask = mask[start:stop]
+            nulls = mask.any()
+            if nulls and prefix is None:
+                raise ValueError(
+                    f"Column {self._names[i]} is not nullable, but has NULL values"
+                )
+            if nulls:
+                values = np.where(mask, 0, values)
+            packed = values.astype(_fixed_dtypes[fmt])
+            if packed.dtype.kind != "f" and (packed != values).any():
+                raise ValueError(
+                    f"Values of column {self._names[i]} cannot be converted "
+                    f"to {packed.dtype} without loss"
+                )
+            rows[f"v{i}"] = packed
+            if prefix is not None:
+                rows[f"p{i}"] = np.where(mask, 0, prefix)
+            if nulls:
+                if keep is None:
+                    keep = np.ones((size, row_dtype.itemsize), dtype=bool)
+                offset = row_dtype.fields[f"v{i}"][1]
+                keep[mask, offset : offset + packed.itemsize] = False
+        if keep is None:
+            itemsize = row_dtype.itemsize
+            return rows.tobytes(), list(range(0, (size + 1) * itemsize, itemsize))
+        data = rows.view(np.uint8).reshape(size, row_dtype.itemsize)[keep]
+        ends = np.concatenate(([0], np.cumsum(keep.sum(axis=1))))
+        return data.tobytes(), ends.tolist()
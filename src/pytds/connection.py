@@ -11,6 +11,8 @@ from .tds_socket import _TdsSocket
 from . import row_strategies
 from .tds_base import logger
 from . import connection_pool
+from .pipeline import Pipeline
+from .server_cursor import ServerCursor
 
 if typing.TYPE_CHECKING:
     from .cursor import Cursor, NonMarsCursor, _MarsCursor
@@ -186,6 +188,32 @@ class BaseConnection(Connection):
     def __exit__(self, *args) -> None:
         self.close()
 
+    def pipeline(self) -> Pipeline:
+        """
+        Return pipeline object which executes queued statements
+        with a single request to the server, see :class:`pytds.pipeline.Pipeline`.
+        Pipeline uses new cursor, so for non-MARS connections currently active
+        cursor is closed.
+        """
+        from .cursor import BaseCursor
+
+        cursor = self.cursor()
+        assert isinstance(cursor, BaseCursor)
+        return Pipeline(cursor)
+
+    def server_cursor(self, fetch_size: int = 1000) -> ServerCursor:
+        """
+        Return cursor which reads rows of a query through a server side cursor
+        in blocks of `fetch_size` rows, see :class:`pytds.server_cursor.ServerCursor`.
+        It uses new cursor, so for non-MARS connections currently active
+        cursor is closed.
+        """
+        from .cursor import BaseCursor
+
+        cursor = self.cursor()
+        assert isinstance(cursor, BaseCursor)
+        return ServerCursor(cursor, fetch_size=fetch_size)
+
     def commit(self) -> None:
         """
         Commit transaction which is currently in progress.
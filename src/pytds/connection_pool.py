@@ -16,8 +16,14 @@ PoolKeyType = Tuple[
     bool,
     Optional[str],
     int,
+    int,
+    bool,
+    bool,
     bool,
     bool,
+    int,
+    int,
+    int,
     Union[AuthProtocol, None],
     datetime.tzinfo,
     bool,
@@ -4,20 +4,26 @@ This module implements DBAPI cursor classes for MARS and non-MARS
 from __future__ import annotations
 
 import collections
-import csv
+import itertools
+import time
 import typing
 import warnings
 from collections.abc import Iterable
 
 import pytds
 from pytds.connection import Connection, MarsConnection, NonMarsConnection
-from pytds.tds_types import NVarCharType, TzInfoFactoryType
+from pytds.tds_types import TzInfoFactoryType
+from pytds import tds_types
 
 from pytds.tds_socket import _TdsSession
 
-from pytds import tds_base
+from pytds import bulk, columnar, export, tds_base
+from pytds.spool import SpooledRows
 from .tds_base import logger
 
+# number of rows read ahead when iterating over cursor
+_ITER_BATCH_ROWS = 256
+
 
 class Cursor(typing.Protocol, Iterable):
     """
@@ -105,6 +111,11 @@ class Cursor(typing.Protocol, Iterable):
     def set_stream(self, column_idx: int, stream) -> None:
         ...
 
+    def set_decode_cache(
+        self, column_idx: int, max_size: int | None = tds_types.DEFAULT_DECODE_CACHE_SIZE
+    ) -> None:
+        ...
+
     @property
     def messages(
         self
@@ -134,6 +145,12 @@ class Cursor(typing.Protocol, Iterable):
     def fetchall(self) -> list[typing.Any]:
         ...
 
+    def fetch_columns(self, size: int | None = None) -> list[typing.Any]:
+        ...
+
+    def fetch_arrow_batches(self, batch_rows: int = 65536) -> typing.Iterator[typing.Any]:
+        ...
+
     @staticmethod
     def setinputsizes(sizes=None) -> None:
         ...
@@ -157,10 +174,46 @@ class Cursor(typing.Protocol, Iterable):
         tablock: bool = False,
         schema: str | None = None,
         null_string: str | None = None,
-        data: Iterable[tuple[typing.Any, ...]] | None = None,
+        data: Iterable[collections.abc.Sequence[typing.Any]] | None = None,
+        batch_size: int | None = None,
+        start_row: int = 0,
+        progress: typing.Callable[[bulk.CopyProgress], None] | None = None,
+        format: str = "csv",
+        native_types: bool = False,
     ):
         ...
 
+    def copy_columns_to(
+        self,
+        data: typing.Any,
+        table_or_view: str,
+        columns: Iterable[tds_base.Column] | None = None,
+        check_constraints: bool = False,
+        fire_triggers: bool = False,
+        keep_nulls: bool = False,
+        kb_per_batch: int | None = None,
+        rows_per_batch: int | None = None,
+        order: str | None = None,
+        tablock: bool = False,
+        schema: str | None = None,
+    ) -> None:
+        ...
+
+    def copy_from(
+        self,
+        query: str,
+        file: typing.IO,
+        format: str = "csv",
+        params: list[typing.Any]
+        | tuple[typing.Any, ...]
+        | dict[str, typing.Any]
+        | None = None,
+        sep: str = "\t",
+        null_string: str = "",
+        header: bool = False,
+    ) -> int:
+        ...
+
 
 class BaseCursor(Cursor, collections.abc.Iterator):
     """
@@ -332,6 +385,15 @@ class BaseCursor(Cursor, collections.abc.Iterator):
     ) -> None:
         """
         Execute same SQL query multiple times for each parameter set in the `params_seq` list.
+
+        Parameter sets are sent in batches of up to 1000 executions per request.
+        Unlike execution of parameter sets one by one, a failure does not stop
+        execution at the failing parameter set: the server still executes all
+        following parameter sets of the same batch, and in autocommit mode they
+        are committed.  Error of the first failed parameter set is raised after
+        the whole batch is executed, following batches are not sent.
+        Use a transaction and roll it back on error if all parameter sets
+        should be applied or none of them.
         """
         if self._session is None:
             raise self._cursor_closed_exception
@@ -436,6 +498,43 @@ class BaseCursor(Cursor, collections.abc.Iterator):
             pytds.tds_types._StreamChunkedHandler(stream)
         )
 
+    def set_decode_cache(
+        self, column_idx: int, max_size: int | None = tds_types.DEFAULT_DECODE_CACHE_SIZE
+    ) -> None:
+        """
+        Enables cache of decoded values for a string column of the current result set.
+
+        Useful for columns with small number of distinct values, e.g. status codes
+        or country names.  Identical values of the column are decoded once and
+        all rows share the same string object, which saves time and memory.
+        Cache holds up to `max_size` distinct values, it is cleared when it becomes full.
+        Only `VARCHAR`, `NVARCHAR`, `CHAR` and `NCHAR` columns which are not `MAX` types are supported.
+
+        Example:
+
+        .. code-block::
+
+           cursor.execute("select country, amount from sales")
+           cursor.set_decode_cache(0)
+           rows = cursor.fetchall()
+
+        :param column_idx: Zero based index of a column
+        :param max_size: Maximum number of cached values, None disables cache
+        """
+        if self._session is None:
+            raise self._cursor_closed_exception
+        res_info = self._session.res_info
+        if not res_info:
+            raise ValueError("No result set is active")
+        if len(res_info.columns) <= column_idx or column_idx < 0:
+            raise ValueError("Invalid value for column_idx")
+        serializer = res_info.columns[column_idx].serializer
+        if not tds_types.supports_decode_cache(serializer):
+            raise ValueError(
+                "Decode cache is only supported for VARCHAR, NVARCHAR, CHAR and NCHAR columns"
+            )
+        serializer.set_decode_cache(max_size)
+
     @property
     def messages(
         self
@@ -490,14 +589,7 @@ class BaseCursor(Cursor, collections.abc.Iterator):
             raise self._cursor_closed_exception
         if size is None:
             size = self.arraysize
-
-        rows = []
-        for _ in range(size):
-            row = self.fetchone()
-            if not row:
-                break
-            rows.append(row)
-        return rows
+        return self._session.fetch_rows(size)
 
     def fetchall(self) -> list[typing.Any]:
         """Fetch all remaining rows
@@ -508,10 +600,96 @@ class BaseCursor(Cursor, collections.abc.Iterator):
         """
         if self._session is None:
             raise self._cursor_closed_exception
-        return list(row for row in self)
+        return self._session.fetch_rows()
+
+    def fetch_columns(self, size: int | None = None) -> list[typing.Any]:
+        """Fetch next N rows of the current result set in columnar form
+
+        Rows are decoded straight into NumPy arrays, one array per column,
+        which is much faster and more compact than fetching rows as tuples.
+        Integer, float and bit columns are returned as arrays of the
+        corresponding NumPy type, dates and datetimes as ``datetime64``
+        arrays (unless timezone aware values are requested) and
+        other types as object arrays.
+        Each array is a :class:`numpy.ma.MaskedArray`, where mask is set for
+        `NULL` values.
+
+        Requires NumPy to be installed.
+
+        Example usage:
+
+        .. code-block::
+
+           cursor.execute("select id, price from prices")
+           ids, prices = cursor.fetch_columns()
+
+        :param size: Maximum number of rows to fetch, by default all remaining rows are fetched
+        :returns: List of arrays, one per column, arrays are empty when there are no more rows
+        """
+        if self._session is None:
+            raise self._cursor_closed_exception
+        return self._session.fetch_columns(size)
+
+    def fetch_arrow_batches(self, batch_rows: int = 65536) -> typing.Iterator[typing.Any]:
+        """Fetch remaining rows of the current result set as Arrow record batches
+
+        Rows are decoded into columns directly, without creating
+        intermediate row tuples, see :func:`fetch_columns`.
+        Arrow types of the columns are derived from SQL types of result set
+        columns, e.g. `INT` becomes ``int32``, `DECIMAL(p, s)` becomes ``decimal128(p, s)``,
+        `NVARCHAR` becomes ``string``.
+
+        Requires NumPy and PyArrow to be installed.
+
+        Example usage:
+
+        .. code-block::
+
+           cursor.execute("select * from sales")
+           with pyarrow.parquet.ParquetWriter("sales.parquet", schema=None) as writer:
+               for batch in cursor.fetch_arrow_batches(100000):
+                   writer.write_batch(batch)
+
+        :param batch_rows: Maximum number of rows in each batch
+        :returns: Iterator of :class:`pyarrow.RecordBatch`, at least one, possibly empty,
+                  batch is produced
+        """
+        if self._session is None:
+            raise self._cursor_closed_exception
+        return self._session.fetch_arrow_batches(batch_rows)
+
+    def fetch_spooled(self, max_memory: int = 64 * 1024 * 1024) -> SpooledRows:
+        """Fetch all remaining rows into a spool
+
+        Unlike :func:`fetchall` rows are not decoded when they are read.
+        Encoded rows are kept in memory until their size goes over `max_memory`,
+        after that they are written into a temporary file, which is memory-mapped
+        once all rows are read.  Rows are returned as a read-only sequence,
+        each row is decoded when it is accessed.
+        Since rows are read without decoding, connection becomes available for
+        the next query sooner than with :func:`fetchall`.
+
+        Example usage:
+
+        .. code-block::
+
+           cursor.execute("select * from events")
+           with cursor.fetch_spooled() as rows:
+               print(len(rows), rows[-1])
+
+        :param max_memory: Maximum size in bytes of encoded rows kept in memory
+        :returns: :class:`pytds.spool.SpooledRows` sequence, it should be closed
+                  to remove spool file
+        """
+        if self._session is None:
+            raise self._cursor_closed_exception
+        return self._session.fetch_spooled(max_memory)
 
     def __next__(self) -> typing.Any:
-        row = self.fetchone()
+        if self._session is None:
+            raise self._cursor_closed_exception
+        # rows are read ahead in batches and returned from session's buffer
+        row = self._session.fetch_next(_ITER_BATCH_ROWS)
         if row is None:
             raise StopIteration
         return row
@@ -546,6 +724,11 @@ class BaseCursor(Cursor, collections.abc.Iterator):
         schema: str | None = None,
         null_string: str | None = None,
         data: Iterable[collections.abc.Sequence[typing.Any]] | None = None,
+        batch_size: int | None = None,
+        start_row: int = 0,
+        progress: typing.Callable[[bulk.CopyProgress], None] | None = None,
+        format: str = "csv",
+        native_types: bool = False,
     ):
         """*Experimental*. Efficiently load data to database from file using ``BULK INSERT`` operation
 
@@ -561,8 +744,8 @@ class BaseCursor(Cursor, collections.abc.Iterator):
         :keyword columns: List of :class:`pytds.tds_base.Column` objects or column names in target
           table to insert to. SQL Server will do some conversions, so these
           may not have to match the actual table definition exactly.
-          If not provided will insert into all columns assuming nvarchar(4000)
-          NULL for all columns.
+          If not provided will insert into all columns of the target table,
+          nvarchar(4000) is assumed for all columns, unless `native_types` is set.
           If only the column name is provided, the type is assumed to be
           nvarchar(4000) NULL.
           If rows are given with file, you cannot specify non-string data
@@ -593,79 +776,251 @@ class BaseCursor(Cursor, collections.abc.Iterator):
           reading the CSV file. Has no meaning if using data instead of file.
         :keyword data: The data to insert as an iterable of rows, which are
           iterables of values. Specify either data parameter or file parameter but not both.
+        :keyword batch_size: Split input into batches of this many rows, every batch
+          is loaded with separate ``INSERT BULK`` request and committed.
+          This bounds growth of the transaction log, and batches which were
+          committed before a failure stay loaded.  Failure is reported with
+          :class:`pytds.tds_base.BulkCopyError`, load can be resumed by passing
+          ``start_row + error.rows_loaded`` as `start_row`.
+          By default all rows are loaded with single request and are not committed.
+        :keyword start_row: Number of rows of the input to skip, e.g. rows which were
+          loaded before the failure.
+        :keyword progress: Callable which is called after every loaded batch
+          with :class:`pytds.bulk.CopyProgress`.
+        :keyword format: Format of the file, ``csv`` or ``native``.  Binary file
+          in native format, written by :func:`copy_from`, holds columns
+          and encoded rows, which are sent to the server as is.
+          It cannot be combined with `columns`, `batch_size` or `start_row`.
+        :keyword native_types: If set and `columns` are not provided, rows given
+          with data are loaded into columns of the same types as columns of the table,
+          and values should be of the corresponding Python types, e.g. ``int``
+          for INT columns and ``datetime`` for DATETIME2 columns.
+          This saves conversion of values into strings and back.
+          Cannot be used with file.
         """
         if self._session is None:
             raise self._cursor_closed_exception
-        # conn = self._conn()
-        rows: Iterable[collections.abc.Sequence[typing.Any]]
-        if data is None:
-            if file is None:
-                raise ValueError("No data was specified via file or data parameter")
-            reader = csv.reader(file, delimiter=sep)
+        session = self._session
+        obj_name = bulk.copy_target_name(table_or_view, schema)
+        with_opts = _copy_options(
+            check_constraints=check_constraints,
+            fire_triggers=fire_triggers,
+            keep_nulls=keep_nulls,
+            kb_per_batch=kb_per_batch,
+            rows_per_batch=rows_per_batch,
+            order=order,
+            tablock=tablock,
+        )
+        if format == "native":
+            if file is None or data is not None or columns:
+                raise ValueError("Native format can only be loaded from file")
+            if batch_size is not None or start_row:
+                raise ValueError("Native file cannot be split into batches")
+            metadata, chunks = export.read_native(typing.cast(typing.BinaryIO, file))
+            operation = bulk.insert_bulk_statement(obj_name, metadata, with_opts)
+            self._copy_batches(
+                operation,
+                [chunks],
+                lambda batch: session.submit_bulk_encoded(metadata, batch),
+                start_row,
+                progress,
+            )
+            return
+        if format != "csv":
+            raise ValueError(f"Unknown format {format!r}, expected 'csv' or 'native'")
+        if native_types and data is None:
+            raise ValueError("native_types can only be used with data")
+        rows = bulk.copy_source_rows(file, data, sep, null_string)
+        if columns:
+            metadata = bulk.copy_columns_metadata(columns)
+        else:
+            self.execute(f"select top 1 * from {obj_name} where 1<>1")
+            metadata = bulk.copy_table_metadata(session, typed=native_types)
+        operation = bulk.insert_bulk_statement(obj_name, metadata, with_opts)
+        if start_row:
+            rows = itertools.islice(rows, start_row, None)
 
-            if null_string is not None:
+        def submit(batch: Iterable[collections.abc.Sequence[typing.Any]]) -> None:
+            session.submit_bulk(metadata, batch)
 
-                def _convert_null_strings(csv_reader):
-                    for row in csv_reader:
-                        yield [r if r != null_string else None for r in row]
+        if batch_size is None:
+            self._copy_batches(operation, [rows], submit, start_row, progress)
+        else:
+            if batch_size < 1:
+                raise ValueError("batch_size should be a positive number")
+            batches = bulk.iter_batches(rows, batch_size)
+            self._copy_batches(operation, batches, submit, start_row, progress, True)
 
-                reader = _convert_null_strings(reader)
+    def _copy_batches(
+        self,
+        operation: str,
+        batches: Iterable[typing.Any],
+        submit: typing.Callable[[typing.Any], None],
+        start_row: int,
+        progress: typing.Callable[[bulk.CopyProgress], None] | None,
+        commit: bool = False,
+    ) -> None:
+        """Loads every batch with separate ``INSERT BULK`` request"""
+        session = self._session
+        assert session is not None
+        started = time.monotonic()
+        bytes_start = session._writer.bytes_written
+        loaded = 0
+        for index, batch in enumerate(batches):
+            try:
+                self.execute(operation)
+                submit(batch)
+                session.process_simple_request()
+                # row count is taken before COMMIT, which resets it
+                count = max(session.rows_affected, 0)
+                if commit:
+                    self._commit()
+            except Exception as ex:
+                if not commit:
+                    raise
+                raise tds_base.BulkCopyError(
+                    errors=[(index, ex)],
+                    loaded_batches=list(range(index)),
+                    rows_loaded=loaded,
+                ) from ex
+            loaded += count
+            if progress is not None:
+                progress(
+                    bulk.CopyProgress(
+                        rows=loaded,
+                        next_row=start_row + loaded,
+                        bytes=session._writer.bytes_written - bytes_start,
+                        elapsed=time.monotonic() - started,
+                    )
+                )
+        if commit:
+            # row count of the whole load rather than of the last batch
+            session.rows_affected = loaded
 
-            rows = reader
-        else:
-            rows = data
+    def _commit(self) -> None:
+        if self._connection is None:
+            raise self._cursor_closed_exception
+        self._connection.commit()
+
+    def copy_from(
+        self,
+        query: str,
+        file: typing.IO,
+        format: str = "csv",
+        params: list[typing.Any]
+        | tuple[typing.Any, ...]
+        | dict[str, typing.Any]
+        | None = None,
+        sep: str = "\t",
+        null_string: str = "",
+        header: bool = False,
+    ) -> int:
+        """*Experimental*. Efficiently export result of a query into a file
+
+        Reverse of :func:`copy_to`.  Rows are read off the connection without
+        decoding them into tuples, and are decoded, formatted and written into
+        the file by a background thread, while rows are being received.
+
+        Example usage:
+
+        .. code-block::
 
-        obj_name = tds_base.tds_quote_id(table_or_view)
-        if schema:
-            obj_name = f"{tds_base.tds_quote_id(schema)}.{obj_name}"
+           with open("sales.csv", "w", newline="") as f:
+               cursor.copy_from("select * from sales", f)
+           with open("sales.bin", "wb") as f:
+               cursor.copy_from("select * from sales", f, format="native")
+           with open("sales.bin", "rb") as f:
+               cursor.copy_to(f, "sales_copy", format="native")
+
+        :param query: Query which produces exported result set
+        :param file: Text file for ``csv`` format, opened with ``newline=""``,
+          binary file for ``native`` format
+        :keyword format: ``csv`` writes values as text, binary values are written
+          as hexadecimal digits without ``0x`` prefix, which are loaded back
+          by :func:`copy_to` as strings, not bytes.
+          ``native`` writes values in binary form, in which they are sent
+          in bulk load requests, such file can be loaded back with
+          :func:`copy_to` with ``format="native"``.
+        :keyword params: Parameters of the query, same as for :func:`execute`
+        :keyword sep: Separator used in csv file
+        :keyword null_string: String written for NULL values into csv file
+        :keyword header: Write names of the columns as first line of csv file
+        :returns: Number of exported rows
+        """
+        if self._session is None:
+            raise self._cursor_closed_exception
+        self.execute(query, params)
+        return self._session.export_result_set(
+            file, format=format, sep=sep, null_string=null_string, header=header
+        )
+
+    def copy_columns_to(
+        self,
+        data: typing.Any,
+        table_or_view: str,
+        columns: Iterable[tds_base.Column] | None = None,
+        check_constraints: bool = False,
+        fire_triggers: bool = False,
+        keep_nulls: bool = False,
+        kb_per_batch: int | None = None,
+        rows_per_batch: int | None = None,
+        order: str | None = None,
+        tablock: bool = False,
+        schema: str | None = None,
+    ) -> None:
+        """*Experimental*. Efficiently load columnar data using ``BULK INSERT`` operation
+
+        Variant of :func:`copy_to` for data stored in columns, which does not
+        convert data into rows of Python values.  Values of integer, float
+        and bit columns are packed into the request with NumPy,
+        a chunk of rows at a time, values of other types are converted
+        into Python objects one column at a time.
+
+        Requires NumPy to be installed.
+
+        Example usage:
+
+        .. code-block::
+
+           cursor.copy_columns_to(dataframe, "prices")
+
+        :param data: Dict of NumPy arrays, pandas DataFrame or Arrow table.
+          Names of the columns of data are names of the columns of the target table.
+          NULL values are given by masks of NumPy masked arrays, by NaN and NaT
+          values, or by nulls of pandas and Arrow columns.
+        :param table_or_view: Destination table or view in the database
+        :keyword columns: List of :class:`pytds.tds_base.Column` objects,
+          one for every column of data.
+          If not provided, columns have types of the columns of the target table.
+
+        Other parameters have the same meaning as in :func:`copy_to`.
+        """
+        if self._session is None:
+            raise self._cursor_closed_exception
+        sources = columnar.column_sources(data)
+        obj_name = bulk.copy_target_name(table_or_view, schema)
         if columns:
-            metadata = []
-            for column in columns:
-                if isinstance(column, tds_base.Column):
-                    metadata.append(column)
-                else:
-                    metadata.append(
-                        tds_base.Column(
-                            name=column,
-                            type=NVarCharType(size=4000),
-                            flags=tds_base.Column.fNullable,
-                        )
-                    )
+            metadata = list(columns)
+            if len(metadata) != len(sources):
+                raise ValueError("Number of columns does not match columns of data")
         else:
-            self.execute(f"select top 1 * from {obj_name} where 1<>1")
-            metadata = [
-                tds_base.Column(
-                    name=col[0],
-                    type=NVarCharType(size=4000),
-                    flags=tds_base.Column.fNullable if col[6] else 0,
-                )
-                for col in self.description
-            ]
-        col_defs = ",".join(
-            f"{tds_base.tds_quote_id(col.column_name)} {col.type.get_declaration()}"
-            for col in metadata
+            names = ", ".join(tds_base.tds_quote_id(name) for name, _, _ in sources)
+            self.execute(f"select top 1 {names} from {obj_name} where 1<>1")
+            metadata = bulk.copy_table_metadata(self._session, typed=True)
+        with_opts = _copy_options(
+            check_constraints=check_constraints,
+            fire_triggers=fire_triggers,
+            keep_nulls=keep_nulls,
+            kb_per_batch=kb_per_batch,
+            rows_per_batch=rows_per_batch,
+            order=order,
+            tablock=tablock,
         )
-        with_opts = []
-        if check_constraints:
-            with_opts.append("CHECK_CONSTRAINTS")
-        if fire_triggers:
-            with_opts.append("FIRE_TRIGGERS")
-        if keep_nulls:
-            with_opts.append("KEEP_NULLS")
-        if kb_per_batch:
-            with_opts.append("KILOBYTES_PER_BATCH = {0}".format(kb_per_batch))
-        if rows_per_batch:
-            with_opts.append("ROWS_PER_BATCH = {0}".format(rows_per_batch))
-        if order:
-            with_opts.append("ORDER({0})".format(",".join(order)))
-        if tablock:
-            with_opts.append("TABLOCK")
-        with_part = ""
-        if with_opts:
-            with_part = "WITH ({0})".format(",".join(with_opts))
-        operation = "INSERT BULK {0}({1}) {2}".format(obj_name, col_defs, with_part)
+        operation = bulk.insert_bulk_statement(obj_name, metadata, with_opts)
         self.execute(operation)
-        self._session.submit_bulk(metadata, rows)
+        self._session.submit_bulk_columns(
+            metadata, [(values, mask) for _, values, mask in sources]
+        )
         self._session.process_simple_request()
 
 
@@ -709,3 +1064,30 @@ class _MarsCursor(BaseCursor):
             self._session.close()
             self._session = None
         self._connection = None
+
+
+def _copy_options(
+    check_constraints: bool,
+    fire_triggers: bool,
+    keep_nulls: bool,
+    kb_per_batch: int | None,
+    rows_per_batch: int | None,
+    order: str | None,
+    tablock: bool,
+) -> list[str]:
+    with_opts = []
+    if check_constraints:
+        with_opts.append("CHECK_CONSTRAINTS")
+    if fire_triggers:
+        with_opts.append("FIRE_TRIGGERS")
+    if keep_nulls:
+        with_opts.append("KEEP_NULLS")
+    if kb_per_batch:
+        with_opts.append("KILOBYTES_PER_BATCH = {0}".format(kb_per_batch))
+    if rows_per_batch:
+        with_opts.append("ROWS_PER_BATCH = {0}".format(rows_per_batch))
+    if order:
+        with_opts.append("ORDER({0})".format(",".join(order)))
+    if tablock:
+        with_opts.append("TABLOCK")
+    return with_opts
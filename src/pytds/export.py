@@ -0,0 +1,338 @@
+"""
+This module implements export of result sets into files.
+
+Rows of a result set are read off the connection by the calling thread
+without decoding them, like in :mod:`pytds.spool`, and are handed over
+in batches to a writer thread, which decodes and formats values and writes
+them into the file.  Python code of both threads is serialized by the GIL,
+but waiting for the network overlaps with formatting and file writes.
+
+Two formats are supported:
+
+- ``csv`` -- values are written as text by :func:`str`, binary values
+  are written as hexadecimal digits without ``0x`` prefix.  Such file
+  can be loaded back with :func:`pytds.Cursor.copy_to` from `file`
+  into tables without binary columns, since fields of csv file are loaded
+  as strings and hexadecimal digits are not converted back into bytes.
+- ``native`` -- values are written in binary form in which they are sent
+  in ``INSERT BULK`` requests, after a header which describes the columns.
+  Values which have the same encoding in result sets and in bulk requests
+  are copied without decoding them.  Such file is loaded back with
+  :func:`pytds.Cursor.copy_to` with ``format="native"``, which sends
+  its content as is.
+"""
+from __future__ import annotations
+
+import csv
+import json
+import queue
+import struct
+import threading
+import typing
+from typing import Any, Callable, Iterator
+
+from pytds import bulk, tds_base, tds_types
+from pytds.lazy_row import LazyRowDecoder, column_capture
+from pytds.tds_writer import _TdsWriter
+
+if typing.TYPE_CHECKING:
+    from pytds.tds_session import _TdsSession
+
+# native file starts with magic, format version and size of JSON header
+_NATIVE_MAGIC = b"PYTDSBLK"
+_native_header = struct.Struct("<II")
+_NATIVE_VERSION = 1
+
+# number of rows handed over to the writer thread at once
+_BATCH_ROWS = 1000
+# number of batches which can wait for the writer thread
+_QUEUE_BATCHES = 8
+# size of chunks in which native rows are written and read,
+# should fit into size field of packet header
+_NATIVE_CHUNK_SIZE = 32768
+
+# a row record: encoded values, offsets of their ends and eagerly decoded values
+_Record = typing.Tuple[bytearray, typing.Tuple[int, ...], typing.Optional[dict]]
+
+# serializers which read values with text pointers, which are not sent in bulk requests
+_TEXT_SERIALIZERS = (
+    tds_types.Text70Serializer,
+    tds_types.NText70Serializer,
+    tds_types.Image70Serializer,
+)
+
+
+class _FileTransport:
+    """Transport for :class:`_TdsWriter` which writes packets into a file
+    without packet headers"""
+
+    def __init__(self, file: typing.IO):
+        self._file = file
+
+    def sendall(self, buf: bytes, flags: int = 0) -> None:
+        self._file.write(memoryview(buf)[8:])
+
+
+def _string_decoder(
+    session: _TdsSession, decoder: LazyRowDecoder
+) -> Callable[[bytearray, tuple[int, ...], int], Any]:
+    """Returns function which decodes values of columns like decoder does,
+    except that values of non Unicode string columns are always decoded into
+    strings, even when ``bytes_to_unicode`` option is off"""
+    if session._tds._login.bytes_to_unicode:
+        return decoder.decode
+    codecs = [
+        s._codec
+        if isinstance(s, (tds_types.VarChar70Serializer, tds_types.Text70Serializer))
+        else None
+        for s in decoder._serializers
+    ]
+    if not any(codecs):
+        return decoder.decode
+
+    def decode(data: bytearray, ends: tuple[int, ...], index: int) -> Any:
+        value = decoder.decode(data, ends, index)
+        codec = codecs[index]
+        if codec is not None and value is not None:
+            value = codec.decode(value)[0]
+        return value
+
+    return decode
+
+
+def _same_encoding(
+    a: tds_types.BaseTypeSerializer, b: tds_types.BaseTypeSerializer
+) -> bool:
+    """True if values of both serializers have the same wire format,
+    collation is not compared since it does not affect encoding of Unicode strings"""
+    return (
+        type(a) is type(b)
+        and a.size == b.size
+        and a.precision == b.precision
+        and a.scale == b.scale
+    )
+
+
+class _CsvFormatter:
+    """Formats rows as csv lines, values are formatted by :func:`str`,
+    except for binary values which are written in hex"""
+
+    def __init__(
+        self,
+        file: typing.IO,
+        session: _TdsSession,
+        decoder: LazyRowDecoder,
+        names: list[str],
+        sep: str,
+        null_string: str,
+        header: bool,
+    ):
+        self._writer = csv.writer(file, delimiter=sep)
+        self._decode = _string_decoder(session, decoder)
+        self._columns = len(names)
+        self._null_string = null_string
+        if header:
+            self._writer.writerow(names)
+
+    def _format(self, value: Any) -> Any:
+        if value is None:
+            return self._null_string
+        if isinstance(value, (bytes, bytearray)):
+            return value.hex()
+        return value
+
+    def write(self, records: list[_Record]) -> None:
+        decode = self._decode
+        fmt = self._format
+        columns = range(self._columns)
+        for data, ends, values in records:
+            if values:
+                self._writer.writerow(
+                    fmt(values[i] if i in values else decode(data, ends, i))
+                    for i in columns
+                )
+            else:
+                self._writer.writerow(fmt(decode(data, ends, i)) for i in columns)
+
+    def finish(self) -> None:
+        pass
+
+
+class _NativeFormatter:
+    """Writes rows as ROW tokens of bulk request"""
+
+    def __init__(
+        self,
+        file: typing.IO,
+        session: _TdsSession,
+        decoder: LazyRowDecoder,
+        columns: list[tds_base.Column],
+    ):
+        self._decode = _string_decoder(session, decoder)
+        metadata = bulk.table_columns(columns)
+        header = json.dumps(
+            {
+                "columns": [
+                    {
+                        "name": col.column_name,
+                        "type": col.type.get_declaration(),
+                        "nullable": bool(col.flags & tds_base.Column.fNullable),
+                    }
+                    for col in metadata
+                ]
+            }
+        ).encode("utf8")
+        file.write(_NATIVE_MAGIC)
+        file.write(_native_header.pack(_NATIVE_VERSION, len(header)))
+        file.write(header)
+        transport = typing.cast(tds_base.TransportProtocol, _FileTransport(file))
+        self._w = _TdsWriter(transport, _NATIVE_CHUNK_SIZE, session)
+        self._w.begin_packet(tds_base.PacketType.BULK)
+        self._serializers = [
+            col.choose_serializer(
+                type_factory=session._tds.type_factory,
+                collation=session._tds.collation,
+            )
+            for col in metadata
+        ]
+        # values which are encoded the same way as in result set are copied as is
+        self._raw = [
+            column_capture(col.serializer) is not None
+            and not isinstance(col.serializer, _TEXT_SERIALIZERS)
+            and _same_encoding(col.serializer, serializer)
+            for col, serializer in zip(columns, self._serializers)
+        ]
+        # whole row can be copied if it has no hidden columns
+        self._raw_rows = all(self._raw) and len(columns) == len(decoder._serializers)
+
+    def write(self, records: list[_Record]) -> None:
+        w = self._w
+        decode = self._decode
+        serializers = self._serializers
+        raw = self._raw
+        for data, ends, values in records:
+            w.put_byte(tds_base.TDS_ROW_TOKEN)
+            if self._raw_rows and not values:
+                w.write(data)
+                continue
+            for i, serializer in enumerate(serializers):
+                if values and i in values:
+                    serializer.write(w, values[i])
+                elif raw[i]:
+                    w.write(data[ends[i - 1] if i else 0 : ends[i]])
+                else:
+                    serializer.write(w, decode(data, ends, i))
+
+    def finish(self) -> None:
+        self._w.flush()
+
+
+def _write_batches(
+    formatter: _CsvFormatter | _NativeFormatter,
+    batches: queue.Queue[list[_Record] | None],
+    errors: list[BaseException],
+) -> None:
+    """Writes batches from the queue until sentinel is received
+
+    After a failure remaining batches are skipped, but are still taken
+    from the queue, so that the reading thread is never blocked by a full queue.
+    """
+    while True:
+        batch = batches.get()
+        if batch is None:
+            break
+        if errors:
+            continue
+        try:
+            formatter.write(batch)
+        except BaseException as ex:
+            errors.append(ex)
+    if not errors:
+        try:
+            formatter.finish()
+        except BaseException as ex:
+            errors.append(ex)
+
+
+def export_result_set(
+    session: _TdsSession,
+    file: typing.IO,
+    format: str = "csv",
+    sep: str = "\t",
+    null_string: str = "",
+    header: bool = False,
+) -> int:
+    """Writes remaining rows of the current result set of the session into a file
+
+    :param file: Text file for csv format, binary file for native format
+    :returns: Number of written rows
+    """
+    info = session.res_info
+    row = session.row
+    assert info is not None and row is not None
+    names = [col[0] for col in info.description]
+    decoder = session._row_decoder
+    if not isinstance(decoder, LazyRowDecoder):
+        # lazy decoder copies encoded values of rows without decoding them
+        decoder = LazyRowDecoder(session, info.columns)
+    formatter: _CsvFormatter | _NativeFormatter
+    if format == "csv":
+        formatter = _CsvFormatter(
+            file, session, decoder, names, sep, null_string, header
+        )
+    elif format == "native":
+        columns = info.columns[: len(names)]
+        formatter = _NativeFormatter(file, session, decoder, columns)
+    else:
+        raise ValueError(f"Unknown format {format!r}, expected 'csv' or 'native'")
+    batches: queue.Queue[list[_Record] | None] = queue.Queue(maxsize=_QUEUE_BATCHES)
+    errors: list[BaseException] = []
+    writer = threading.Thread(
+        target=_write_batches, args=(formatter, batches, errors), daemon=True
+    )
+    writer.start()
+    saved_decoder = session._row_decoder
+    session._row_decoder = decoder
+    count = 0
+    try:
+        batch: list[_Record] = []
+        while not errors and session.next_row():
+            data, values = decoder.encoded_row()
+            batch.append((data, tuple(row), values))
+            if len(batch) >= _BATCH_ROWS:
+                batches.put(batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            batches.put(batch)
+            count += len(batch)
+    finally:
+        session._row_decoder = saved_decoder
+        batches.put(None)
+        writer.join()
+    if errors:
+        raise errors[0]
+    return count
+
+
+def read_native(file: typing.BinaryIO) -> tuple[list[tds_base.Column], Iterator[bytes]]:
+    """Reads header of a file in native format
+
+    :returns: Columns of the file and iterator over chunks of encoded rows
+    """
+    magic = file.read(len(_NATIVE_MAGIC))
+    if magic != _NATIVE_MAGIC:
+        raise ValueError("File is not in native format")
+    version, size = _native_header.unpack(file.read(_native_header.size))
+    if version != _NATIVE_VERSION:
+        raise ValueError(f"Unsupported version {version} of native format")
+    header = json.loads(file.read(size).decode("utf8"))
+    columns = [
+        tds_base.Column(
+            name=col["name"],
+            type=tds_types.sql_type_by_declaration(col["type"]),
+            flags=tds_base.Column.fNullable if col["nullable"] else 0,
+        )
+        for col in header["columns"]
+    ]
+    return columns, iter(lambda: file.read(_NATIVE_CHUNK_SIZE), b"")
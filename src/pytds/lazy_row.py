@@ -0,0 +1,288 @@
+"""
+This module implements lazy rows.
+
+Lazy row decoder does not convert values of columns into Python objects when
+row is read, instead it copies encoded values of the whole row out of packet
+buffers into a single buffer.
+Values are decoded by the column serializers when they are first accessed
+and cached on the row.
+
+Lazy rows are enabled by :func:`pytds.row_strategies.lazy_row_strategy`.
+"""
+from __future__ import annotations
+
+import itertools
+import typing
+from typing import Any, Callable, Iterator
+
+from pytds import tds_base, tds_types
+from pytds.tds_base import _int_le, _uint_le, _uint8_le, _usmallint_le
+from pytds.tds_reader import _TdsBufferReader
+
+if typing.TYPE_CHECKING:
+    from pytds.tds_base import Column
+    from pytds.tds_reader import _TdsReader
+    from pytds.tds_session import _TdsSession
+
+Capture = Callable[["_TdsReader", bytearray], None]
+
+
+def _copy(r: _TdsReader, out: bytearray, size: int) -> None:
+    """Appends next size bytes of the stream to out"""
+    pos = r._pos
+    end = pos + size
+    if end <= r._size:
+        out += r._bufview[pos:end]
+        r._pos = end
+    else:
+        out += r.read_bytes(size)
+
+
+def _make_fixed_capture(size: int) -> Capture:
+    def capture(r: _TdsReader, out: bytearray) -> None:
+        _copy(r, out, size)
+
+    return capture
+
+
+def _capture_byte_len(r: _TdsReader, out: bytearray) -> None:
+    size = r.get_byte()
+    out.append(size)
+    _copy(r, out, size)
+
+
+def _capture_usmallint_len(r: _TdsReader, out: bytearray) -> None:
+    size = r.get_usmallint()
+    out += _usmallint_le.pack(size)
+    if size != 0xFFFF:
+        _copy(r, out, size)
+
+
+def _capture_int_len(r: _TdsReader, out: bytearray) -> None:
+    size = r.get_int()
+    out += _int_le.pack(size)
+    if size > 0:
+        _copy(r, out, size)
+
+
+def _capture_plp(r: _TdsReader, out: bytearray) -> None:
+    size = r.get_uint8()
+    out += _uint8_le.pack(size)
+    if size == tds_base.PLP_NULL:
+        return
+    while True:
+        chunk_len = r.get_uint()
+        out += _uint_le.pack(chunk_len)
+        if chunk_len == 0:
+            return
+        _copy(r, out, chunk_len)
+
+
+def _make_text_capture(textptr_size: int | None) -> Capture:
+    """Capture for TEXT/NTEXT/IMAGE values
+
+    :param textptr_size: Size of text pointer which denotes not NULL value,
+                         any non zero size if None
+    """
+
+    def capture(r: _TdsReader, out: bytearray) -> None:
+        size = r.get_byte()
+        out.append(size)
+        if size == 0 or (textptr_size is not None and size != textptr_size):
+            return
+        # text pointer and timestamp
+        _copy(r, out, size + 8)
+        colsize = r.get_int()
+        out += _int_le.pack(colsize)
+        _copy(r, out, colsize)
+
+    return capture
+
+
+# sizes of fixed size types which are not nullable
+_fixed_sizes: dict[type, int] = {
+    tds_types.BitSerializer: 1,
+    tds_types.TinyIntSerializer: 1,
+    tds_types.SmallIntSerializer: 2,
+    tds_types.IntSerializer: 4,
+    tds_types.BigIntSerializer: 8,
+    tds_types.RealSerializer: 4,
+    tds_types.FloatSerializer: 8,
+    tds_types.Money4Serializer: 4,
+    tds_types.Money8Serializer: 8,
+    tds_types.SmallDateTimeSerializer: 4,
+    tds_types.DateTimeSerializer: 8,
+}
+
+
+def column_capture(serializer: tds_types.BaseTypeSerializer) -> Capture | None:
+    """Returns function which copies encoded value of the column without decoding it
+
+    Captured value can be decoded later by serializer's ``read`` method.
+
+    :returns: Capture function or None if values of this type should be decoded eagerly
+    """
+    size = _fixed_sizes.get(type(serializer))
+    if size is not None:
+        return _make_fixed_capture(size)
+    if isinstance(
+        serializer,
+        (
+            tds_types.VarCharMaxSerializer,
+            tds_types.NVarCharMaxSerializer,
+            tds_types.VarBinarySerializerMax,
+            tds_types.UDT72Serializer,
+        ),
+    ):
+        return _capture_plp
+    if isinstance(
+        serializer,
+        (
+            tds_types.VarChar70Serializer,
+            tds_types.NVarChar70Serializer,
+            tds_types.VarBinarySerializer,
+        ),
+    ):
+        return _capture_usmallint_len
+    if isinstance(
+        serializer,
+        (
+            tds_types.BaseTypeSerializerN,
+            tds_types.MsDateSerializer,
+            tds_types.MsTimeSerializer,
+            tds_types.DateTime2Serializer,
+            tds_types.DateTimeOffsetSerializer,
+            tds_types.MsDecimalSerializer,
+            tds_types.MsUniqueSerializer,
+        ),
+    ):
+        return _capture_byte_len
+    if isinstance(serializer, tds_types.VariantSerializer):
+        return _capture_int_len
+    if isinstance(serializer, tds_types.Image70Serializer):
+        return _make_text_capture(16)
+    if isinstance(serializer, (tds_types.Text70Serializer, tds_types.NText70Serializer)):
+        return _make_text_capture(None)
+    return None
+
+
+class LazyRowDecoder:
+    """Reads ROW tokens of a single result set into lazy rows
+
+    For every column row list receives offset of the end of its
+    encoded value in the row buffer.  Columns which cannot be captured,
+    and NULL columns of NBCROW tokens, are stored in row values dictionary.
+    Trailing hidden columns are read but are not included into lazy rows.
+    """
+
+    def __init__(self, session: _TdsSession, columns: list[Column]):
+        self._session = session
+        self._serializers = [col.serializer for col in columns]
+        self._captures = [column_capture(s) for s in self._serializers]
+        self._visible = tds_base.visible_columns_count(columns)
+        self._names: dict[str, int] = {}
+        for i, col in enumerate(columns[: self._visible]):
+            self._names.setdefault(col.column_name, i)
+        self._data = bytearray()
+        self._values: dict[int, Any] | None = None
+
+    def read_row(self, r: _TdsReader, row: list) -> None:
+        out = bytearray()
+        values = None
+        for i, capture in enumerate(self._captures):
+            if capture is None:
+                if values is None:
+                    values = {}
+                values[i] = self._serializers[i].read(r)
+            else:
+                capture(r, out)
+            row[i] = len(out)
+        self._data = out
+        self._values = values
+
+    def read_nbc_row(self, r: _TdsReader, row: list, nbc: bytes) -> None:
+        out = bytearray()
+        values: dict[int, Any] = {}
+        for i, capture in enumerate(self._captures):
+            if nbc[i // 8] & (1 << (i % 8)):
+                values[i] = None
+            elif capture is None:
+                values[i] = self._serializers[i].read(r)
+            else:
+                capture(r, out)
+            row[i] = len(out)
+        self._data = out
+        self._values = values
+
+    def encoded_row(self) -> tuple[bytearray, dict[int, Any] | None]:
+        """Returns encoded values of the last row read by this decoder
+        and values which were decoded eagerly"""
+        return self._data, self._values
+
+    def make_row(self, row: typing.Iterable[Any]) -> LazyRow:
+        """Creates lazy row from the last row read by this decoder"""
+        ends = tuple(itertools.islice(row, self._visible))
+        return LazyRow(self, self._data, ends, self._values or {})
+
+    def decode(
+        self, data: bytes | bytearray, ends: tuple[int, ...], index: int
+    ) -> Any:
+        start = ends[index - 1] if index else 0
+        r = _TdsBufferReader(self._session, data, start, ends[index])
+        return self._serializers[index].read(r)
+
+
+class LazyRow:
+    """Row which decodes values of columns on first access
+
+    Values can be accessed by column index, slice or column name.
+    Decoded values are cached.
+    Rows compare equal to tuples and lists with the same values.
+    """
+
+    __slots__ = ("_decoder", "_data", "_ends", "_values")
+
+    def __init__(
+        self,
+        decoder: LazyRowDecoder,
+        data: bytearray,
+        ends: tuple[int, ...],
+        values: dict[int, Any],
+    ):
+        self._decoder = decoder
+        self._data = data
+        self._ends = ends
+        self._values = values
+
+    def __len__(self) -> int:
+        return len(self._ends)
+
+    def __getitem__(self, key: int | slice | str) -> Any:
+        if isinstance(key, slice):
+            return tuple(self[i] for i in range(*key.indices(len(self._ends))))
+        if isinstance(key, str):
+            try:
+                key = self._decoder._names[key]
+            except KeyError:
+                raise KeyError(key) from None
+        elif key < 0:
+            key += len(self._ends)
+        if not 0 <= key < len(self._ends):
+            raise IndexError("row index out of range")
+        values = self._values
+        if key in values:
+            return values[key]
+        value = values[key] = self._decoder.decode(self._data, self._ends, key)
+        return value
+
+    def __iter__(self) -> Iterator[Any]:
+        for i in range(len(self._ends)):
+            yield self[i]
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (LazyRow, tuple, list)):
+            return tuple(self) == tuple(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"LazyRow({tuple(self)!r})"
@@ -0,0 +1,103 @@
+"""
+This module implements pipeline which sends several statements to the server
+in a single request
+"""
+from __future__ import annotations
+
+import typing
+from typing import Any
+
+if typing.TYPE_CHECKING:
+    from .cursor import BaseCursor
+
+
+class PipelineResult:
+    """Results of a single statement executed by :class:`Pipeline`"""
+
+    def __init__(self) -> None:
+        #: Rows of every result set produced by the statement
+        self.result_sets: list[list[Any]] = []
+        #: Descriptions of every result set produced by the statement
+        self.descriptions: list[
+            tuple[tuple[str, Any, None, int, int, int, int], ...]
+        ] = []
+        #: Number of rows affected by the statement, or -1 if not known
+        self.rowcount = -1
+
+    @property
+    def rows(self) -> list[Any]:
+        """Rows of the first result set, empty list if there are no result sets"""
+        return self.result_sets[0] if self.result_sets else []
+
+    @property
+    def description(
+        self,
+    ) -> tuple[tuple[str, Any, None, int, int, int, int], ...] | None:
+        """Description of the first result set, None if there are no result sets"""
+        return self.descriptions[0] if self.descriptions else None
+
+
+class Pipeline:
+    """
+    Queues statements and executes all of them with a single request to the server.
+
+    Statements are sent as a batch of ``sp_executesql`` calls, so the whole
+    pipeline costs one network round trip.  Each statement runs in its own
+    ``sp_executesql`` scope, which means that local temporary tables created by one
+    statement are dropped before the next statement runs.
+
+    Rows of all result sets are read into memory.  If a statement fails,
+    exception is raised and responses of the following statements are discarded,
+    results of the statements which precede it are available in :attr:`results`.
+
+    Example:
+
+    .. code-block:: python
+
+        with conn.pipeline() as pipe:
+            pipe.execute("select * from orders where id = %s", (1,))
+            pipe.execute("update counters set value = value + 1")
+        orders = pipe.results[0].rows
+    """
+
+    def __init__(self, cursor: BaseCursor) -> None:
+        self._cursor = cursor
+        self._statements: list[
+            tuple[str, list[Any] | tuple[Any, ...] | dict[str, Any] | None]
+        ] = []
+        #: Results of statements executed by the last call to :meth:`run`
+        self.results: list[PipelineResult] = []
+
+    def execute(
+        self,
+        operation: str,
+        params: list[Any] | tuple[Any, ...] | dict[str, Any] | None = None,
+    ) -> None:
+        """Queues statement for execution, parameters use the same
+        placeholders as :meth:`pytds.Cursor.execute`"""
+        self._statements.append((operation, params))
+
+    def run(self) -> list[PipelineResult]:
+        """Executes queued statements
+
+        :returns: List of results in the same order in which statements were queued
+        """
+        session = self._cursor._session
+        if session is None:
+            raise self._cursor._cursor_closed_exception
+        statements = self._statements
+        self._statements = []
+        self.results = []
+        if statements:
+            session.cancel_if_pending()
+            session.execute_pipeline(statements, self.results)
+        return self.results
+
+    def __enter__(self) -> Pipeline:
+        return self
+
+    def __exit__(self, exc_type, *args) -> None:
+        if exc_type is None:
+            self.run()
+        else:
+            self._statements = []
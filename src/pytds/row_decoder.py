@@ -0,0 +1,180 @@
+"""
+This module implements compiled row decoders.
+
+Row decoder is built once per result set when COLMETADATA token is processed.
+Runs of adjacent fixed width numeric columns are merged into a single
+:class:`struct.Struct` which is unpacked straight from the reader's packet
+buffer when the whole run is available there.
+All other columns are decoded by their serializers,
+with ``read`` methods bound once per result set.
+"""
+from __future__ import annotations
+
+import struct
+import typing
+from typing import Callable, Any
+
+from pytds import tds_types
+
+if typing.TYPE_CHECKING:
+    from pytds.tds_base import Column
+    from pytds.tds_reader import _TdsReader
+
+RowStep = Callable[["_TdsReader", list], None]
+
+
+def fixed_layout(
+    serializer: tds_types.BaseTypeSerializer,
+) -> tuple[str, int | None] | None:
+    """Returns fixed layout of the column value on the wire.
+
+    :returns: Tuple of struct format of the value and expected value
+              of the length prefix, length prefix is None for not nullable types.
+              Returns None if value cannot be decoded using :mod:`struct`.
+    """
+    if isinstance(serializer, tds_types.BasePrimitiveTypeSerializer):
+        if serializer.fixed_format:
+            return serializer.fixed_format, None
+        return None
+    if isinstance(serializer, tds_types.BaseTypeSerializerN):
+        subtype = serializer.subtypes[serializer.size]
+        fmt = getattr(subtype, "fixed_format", "")
+        if fmt:
+            return fmt, serializer.size
+    return None
+
+
+def _make_variable_step(index: int, read: Callable[[_TdsReader], Any]) -> RowStep:
+    def step(r: _TdsReader, row: list) -> None:
+        row[index] = read(r)
+
+    return step
+
+
+def _make_fixed_step(
+    start: int,
+    serializers: list[tds_types.BaseTypeSerializer],
+    formats: list[str],
+    prefixes: tuple[int, ...] | None,
+) -> RowStep:
+    stop = start + len(serializers)
+    if prefixes is None:
+        struc = struct.Struct("<" + "".join(formats))
+    else:
+        struc = struct.Struct("<" + "".join("B" + fmt for fmt in formats))
+    size = struc.size
+    unpack_from = struc.unpack_from
+    slow_reads = [serializer.read for serializer in serializers]
+
+    def read_slow(r: _TdsReader, row: list) -> None:
+        for i, read in enumerate(slow_reads, start):
+            row[i] = read(r)
+
+    if prefixes is None:
+
+        def step(r: _TdsReader, row: list) -> None:
+            pos = r._pos
+            if r._size - pos >= size:
+                row[start:stop] = unpack_from(r._buf, pos)
+                r._pos = pos + size
+            else:
+                read_slow(r, row)
+
+    else:
+
+        def step(r: _TdsReader, row: list) -> None:
+            pos = r._pos
+            if r._size - pos >= size:
+                values = unpack_from(r._buf, pos)
+                # length prefixes would differ from expected ones for NULL values,
+                # in which case layout of the run is different and slow path is used
+                if values[0::2] == prefixes:
+                    row[start:stop] = values[1::2]
+                    r._pos = pos + size
+                    return
+            read_slow(r, row)
+
+    return step
+
+
+class RowDecoder:
+    """Decodes ROW tokens of a single result set.
+
+    Use :func:`compile_row_decoder` to create instances of this class.
+    """
+
+    def __init__(self, steps: list[RowStep], reads: list[Callable[[_TdsReader], Any]]):
+        self._steps = steps
+        self._reads = reads
+
+    def read_row(self, r: _TdsReader, row: list) -> None:
+        """Reads values of all columns of the row into row list
+
+        :param r: Reader positioned at the beginning of the row data
+        :param row: List which receives decoded values, should have one item per column
+        """
+        for step in self._steps:
+            step(r, row)
+
+    def read_nbc_row(self, r: _TdsReader, row: list, nbc: bytes) -> None:
+        """Reads values of columns of NBCROW token into row list
+
+        :param r: Reader positioned at the beginning of the row data, after NULL bitmap
+        :param row: List which receives decoded values, should have one item per column
+        :param nbc: NULL bitmap of the row, 1 bits represent NULL values
+        """
+        for i, read in enumerate(self._reads):
+            if nbc[i // 8] & (1 << (i % 8)):
+                row[i] = None
+            else:
+                row[i] = read(r)
+
+
+def compile_row_decoder(columns: list[Column]) -> RowDecoder:
+    """Builds row decoder for given result set columns
+
+    :param columns: List of result set columns, each column should have serializer set
+    """
+    steps: list[RowStep] = []
+    run_start = 0
+    run_serializers: list[tds_types.BaseTypeSerializer] = []
+    run_formats: list[str] = []
+    run_prefixes: list[int | None] = []
+
+    def close_run() -> None:
+        if not run_serializers:
+            return
+        if len(run_serializers) == 1:
+            # single column gains nothing from merging
+            steps.append(_make_variable_step(run_start, run_serializers[0].read))
+        else:
+            prefixes = (
+                None
+                if run_prefixes[0] is None
+                else tuple(typing.cast("list[int]", run_prefixes))
+            )
+            steps.append(
+                _make_fixed_step(run_start, run_serializers, run_formats, prefixes)
+            )
+        run_serializers.clear()
+        run_formats.clear()
+        run_prefixes.clear()
+
+    for i, col in enumerate(columns):
+        serializer = col.serializer
+        layout = fixed_layout(serializer)
+        if layout is None:
+            close_run()
+            steps.append(_make_variable_step(i, serializer.read))
+            continue
+        fmt, prefix = layout
+        # nullable and not nullable columns are not mixed in one run
+        if run_prefixes and (run_prefixes[0] is None) != (prefix is None):
+            close_run()
+        if not run_serializers:
+            run_start = i
+        run_serializers.append(serializer)
+        run_formats.append(fmt)
+        run_prefixes.append(prefix)
+    close_run()
+    return RowDecoder(steps, [col.serializer.read for col in columns])
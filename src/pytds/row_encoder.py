@@ -0,0 +1,175 @@
+"""
+This module implements compiled row encoders for bulk load requests.
+
+Row encoder is built once per bulk load from serializers of the columns.
+Runs of adjacent fixed width numeric columns, together with ROW token
+when the run starts the row, are merged into a single :class:`struct.Struct`
+which is packed straight into the writer's packet buffer when there is
+enough space left in it.
+All other columns are encoded by their serializers,
+with ``write`` methods bound once per load.
+"""
+from __future__ import annotations
+
+import struct
+import typing
+from typing import Any, Callable, Iterable, Sequence
+
+from pytds import tds_base, tds_types
+from pytds.row_decoder import fixed_layout
+
+if typing.TYPE_CHECKING:
+    from pytds.tds_writer import _TdsWriter
+
+RowStep = Callable[["_TdsWriter", Sequence[Any]], None]
+
+
+def _write_token(w: _TdsWriter, row: Sequence[Any]) -> None:
+    w.put_byte(tds_base.TDS_ROW_TOKEN)
+
+
+def _make_variable_step(
+    index: int, write: Callable[[_TdsWriter, Any], None]
+) -> RowStep:
+    def step(w: _TdsWriter, row: Sequence[Any]) -> None:
+        write(w, row[index])
+
+    return step
+
+
+def _make_fixed_step(
+    start: int,
+    serializers: list[tds_types.BaseTypeSerializer],
+    formats: list[str],
+    prefixes: tuple[int, ...] | None,
+    token: bool,
+) -> RowStep:
+    stop = start + len(serializers)
+    head = "<B" if token else "<"
+    # arguments of the struct are optional ROW token followed by values,
+    # or by pairs of length prefix and value for nullable types
+    template: list[Any] = [tds_base.TDS_ROW_TOKEN] if token else []
+    if prefixes is None:
+        struc = struct.Struct(head + "".join(formats))
+    else:
+        struc = struct.Struct(head + "".join("B" + fmt for fmt in formats))
+        for prefix in prefixes:
+            template += [prefix, None]
+    size = struc.size
+    pack_into = struc.pack_into
+    pack = struc.pack
+    slow_writes = [serializer.write for serializer in serializers]
+    first_value = len(template) - 2 * len(serializers) + 1
+
+    def write(w: _TdsWriter, args: list[Any]) -> None:
+        pos = w._pos
+        if pos + size <= len(w._buf):
+            pack_into(w._buf, pos, *args)
+            w._pos = pos + size
+        else:
+            w.write(pack(*args))
+
+    if prefixes is None:
+
+        def step(w: _TdsWriter, row: Sequence[Any]) -> None:
+            write(w, template + list(row[start:stop]))
+
+    else:
+
+        def step(w: _TdsWriter, row: Sequence[Any]) -> None:
+            values = row[start:stop]
+            # NULL values have no value bytes, so layout of the run is different
+            # and values are written by serializers
+            if None in values:
+                if token:
+                    w.put_byte(tds_base.TDS_ROW_TOKEN)
+                for i, write_value in enumerate(slow_writes, start):
+                    write_value(w, row[i])
+                return
+            args = template.copy()
+            args[first_value::2] = values
+            write(w, args)
+
+    return step
+
+
+class RowEncoder:
+    """Encodes rows into ROW tokens of a bulk load request.
+
+    Use :func:`compile_row_encoder` to create instances of this class.
+    """
+
+    def __init__(self, steps: list[RowStep]):
+        self._steps = steps
+
+    def write_row(self, w: _TdsWriter, row: Sequence[Any]) -> None:
+        """Writes ROW token with values of the row
+
+        :param w: Writer of the bulk request
+        :param row: Values of the row, one item per column
+        """
+        for step in self._steps:
+            step(w, row)
+
+    def write_rows(self, w: _TdsWriter, rows: Iterable[Sequence[Any]]) -> None:
+        """Writes ROW tokens for all rows"""
+        steps = self._steps
+        if len(steps) == 1:
+            step = steps[0]
+            for row in rows:
+                step(w, row)
+            return
+        for row in rows:
+            for step in steps:
+                step(w, row)
+
+
+def compile_row_encoder(serializers: list[tds_types.BaseTypeSerializer]) -> RowEncoder:
+    """Builds row encoder for given column serializers
+
+    :param serializers: Serializers of the columns of bulk load request
+    """
+    steps: list[RowStep] = []
+    run_start = 0
+    run_serializers: list[tds_types.BaseTypeSerializer] = []
+    run_formats: list[str] = []
+    run_prefixes: list[int | None] = []
+
+    def close_run() -> None:
+        if not run_serializers:
+            return
+        prefixes = (
+            None
+            if run_prefixes[0] is None
+            else tuple(typing.cast("list[int]", run_prefixes))
+        )
+        # ROW token is packed together with the run which starts the row
+        token = not steps
+        steps.append(
+            _make_fixed_step(run_start, run_serializers, run_formats, prefixes, token)
+        )
+        run_serializers.clear()
+        run_formats.clear()
+        run_prefixes.clear()
+
+    for i, serializer in enumerate(serializers):
+        layout = fixed_layout(serializer)
+        if layout is None:
+            close_run()
+            if not steps:
+                steps.append(_write_token)
+            steps.append(_make_variable_step(i, serializer.write))
+            continue
+        fmt, prefix = layout
+        # nullable and not nullable columns are not mixed in one run
+        if run_prefixes and (run_prefixes[0] is None) != (prefix is None):
+            close_run()
+        if not run_serializers:
+            run_start = i
+        run_serializers.append(serializer)
+        run_formats.append(fmt)
+        run_prefixes.append(prefix)
+    close_run()
+    if not steps:
+        steps.append(_write_token)
+    return RowEncoder(steps)
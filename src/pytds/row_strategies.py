@@ -106,3 +106,19 @@ def recordtype_row_strategy(
         return Row(*row)
 
     return row_factory
+
+
+def lazy_row_strategy(
+    column_names: Iterable[str]
+) -> Callable[[Iterable[Any]], Tuple[Any, ...]]:
+    """Lazy row strategy, rows returned as :class:`pytds.lazy_row.LazyRow` objects
+
+    Values of columns are kept in their encoded form and are decoded
+    when they are first accessed, which saves time when only some of
+    the columns of wide rows are used.
+    Values can be accessed by index or by column name.
+
+    This strategy is recognized by the connection, when called directly
+    it produces tuples.
+    """
+    return tuple
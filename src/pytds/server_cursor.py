@@ -0,0 +1,170 @@
+"""
+This module implements cursor which reads rows through a server side cursor
+in blocks of limited size
+"""
+from __future__ import annotations
+
+import collections
+import typing
+from typing import Any
+
+from . import tds_base
+
+if typing.TYPE_CHECKING:
+    from .cursor import BaseCursor
+    from .tds_base import _Results
+    from .tds_session import _TdsSession
+
+
+class ServerCursor:
+    """
+    Executes query as a fast forward read only server cursor and fetches its rows
+    in blocks of `fetch_size` rows.
+
+    Query is opened with ``sp_cursoropen`` and every block of rows is requested
+    with a separate ``sp_cursorfetch`` call, so the server sends next block only
+    when previous one was consumed.  Memory used by the client is bounded
+    by the block size, and reading can be paused for any amount of time
+    without the server waiting on a full network buffer.
+    Each fetch costs a network round trip, so larger blocks should be used
+    for scans of large tables.
+
+    Server cursor is closed with ``sp_cursorclose`` once all rows are fetched,
+    or when :meth:`close` is called.
+
+    Example:
+
+    .. code-block:: python
+
+        with conn.server_cursor(fetch_size=10000) as cursor:
+            cursor.execute("select * from events where day = %s", (day,))
+            for row in cursor:
+                process(row)
+    """
+
+    def __init__(self, cursor: BaseCursor, fetch_size: int = 1000) -> None:
+        if fetch_size < 1:
+            raise ValueError("fetch_size should be a positive number")
+        self._cursor = cursor
+        #: Number of rows requested from the server by every fetch
+        self.fetch_size = fetch_size
+        #: Default number of rows returned by :meth:`fetchmany`
+        self.arraysize = 1
+        self._handle = 0
+        self._info: _Results | None = None
+        self._rows: collections.deque[Any] = collections.deque()
+
+    def execute(
+        self,
+        operation: str,
+        params: list[Any] | tuple[Any, ...] | dict[str, Any] | None = None,
+    ) -> ServerCursor:
+        """Opens server cursor for the query, previously opened cursor is closed
+
+        Query should be a single ``SELECT`` statement, parameters use the same
+        placeholders as :meth:`pytds.Cursor.execute`.
+        """
+        session = self._session()
+        self._close_handle()
+        self._rows.clear()
+        session.cancel_if_pending()
+        self._handle, self._info = session.open_cursor(operation, params)
+        if self._info is None:
+            self._close_handle()
+        return self
+
+    def _session(self) -> _TdsSession:
+        session = self._cursor._session
+        if session is None:
+            raise self._cursor._cursor_closed_exception
+        return session
+
+    def _fetch_block(self) -> bool:
+        """Fetches next block of rows into the buffer
+
+        :returns: False if there are no more rows
+        """
+        if self._info is None:
+            raise tds_base.ProgrammingError(
+                "Previous statement didn't produce any results"
+            )
+        if not self._handle:
+            return False
+        session = self._session()
+        rows = session.fetch_cursor(self._handle, self._info, self.fetch_size)
+        self._rows.extend(rows)
+        if len(rows) < self.fetch_size:
+            # cursor is exhausted, release it on the server right away
+            self._close_handle()
+        return bool(rows)
+
+    def fetchone(self) -> Any:
+        """Fetch next row, or ``None`` if there are no more rows"""
+        if not self._rows and not self._fetch_block():
+            return None
+        return self._rows.popleft()
+
+    def fetchmany(self, size: int | None = None) -> list[Any]:
+        """Fetch next N rows
+
+        :param size: Maximum number of rows to return, default value is cursor.arraysize
+        """
+        if size is None:
+            size = self.arraysize
+        rows: list[Any] = []
+        while len(rows) < size:
+            if not self._rows and not self._fetch_block():
+                break
+            while self._rows and len(rows) < size:
+                rows.append(self._rows.popleft())
+        return rows
+
+    def fetchall(self) -> list[Any]:
+        """Fetch all remaining rows, all of them are loaded into memory"""
+        rows = list(self._rows)
+        self._rows.clear()
+        while self._fetch_block():
+            rows.extend(self._rows)
+            self._rows.clear()
+        return rows
+
+    def __iter__(self) -> ServerCursor:
+        return self
+
+    def __next__(self) -> Any:
+        row = self.fetchone()
+        if row is None:
+            raise StopIteration
+        return row
+
+    @property
+    def description(self):
+        """Cursor description, see http://legacy.python.org/dev/peps/pep-0249/#description"""
+        if self._info is None:
+            return None
+        return self._info.description
+
+    @property
+    def rowcount(self) -> int:
+        """Always -1, since number of rows of fast forward cursor is not known"""
+        return -1
+
+    def _close_handle(self) -> None:
+        handle = self._handle
+        self._handle = 0
+        session = self._cursor._session
+        if handle and session is not None:
+            session.close_cursor(handle)
+
+    def close(self) -> None:
+        """Closes server cursor and underlying cursor"""
+        self._close_handle()
+        self._rows.clear()
+        self._info = None
+        self._cursor.close()
+
+    def __enter__(self) -> ServerCursor:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
@@ -0,0 +1,198 @@
+"""
+This module implements spooling of result sets.
+
+Rows of a result set are read off the connection without decoding them,
+encoded values of every row are appended to a spool, which is kept in memory
+until it grows over the limit and then moves into a temporary file.
+File is memory-mapped once all rows are read, and rows are decoded
+when they are accessed.
+"""
+from __future__ import annotations
+
+import array
+import collections.abc
+import mmap
+import pickle
+import struct
+import tempfile
+import typing
+from typing import Any
+
+from pytds.lazy_row import LazyRowDecoder
+
+if typing.TYPE_CHECKING:
+    from pytds.row_strategies import RowGenerator
+    from pytds.tds_session import _TdsSession
+
+# record header: size of encoded values and size of pickled eagerly decoded values
+_record_header = struct.Struct("<II")
+
+# type of offsets of the ends of encoded values, stored after the header
+_ENDS_TYPECODE = "I"
+_ENDS_ITEMSIZE = array.array(_ENDS_TYPECODE).itemsize
+
+# buffered records are written to the spool file in chunks of this size
+_WRITE_CHUNK_SIZE = 1024 * 1024
+
+
+class _SpoolWriter:
+    """Appends records of rows to memory buffer, or to temporary file
+    once size of the buffer goes over the limit"""
+
+    def __init__(self, max_memory: int):
+        self._max_memory = max_memory
+        self._buffer = bytearray()
+        self._file: typing.BinaryIO | None = None
+        self._size = 0
+        self.offsets = array.array("Q")
+
+    def write(
+        self, ends: list[int], data: bytearray, values: dict[int, Any] | None
+    ) -> None:
+        pickled = pickle.dumps(values, pickle.HIGHEST_PROTOCOL) if values else b""
+        buffer = self._buffer
+        self.offsets.append(self._size + len(buffer))
+        buffer += _record_header.pack(len(data), len(pickled))
+        buffer += array.array(_ENDS_TYPECODE, ends).tobytes()
+        buffer += data
+        buffer += pickled
+        if self._file is None:
+            if len(buffer) > self._max_memory:
+                self._file = tempfile.TemporaryFile()
+                self._flush()
+        elif len(buffer) >= _WRITE_CHUNK_SIZE:
+            self._flush()
+
+    def _flush(self) -> None:
+        assert self._file is not None
+        self._file.write(self._buffer)
+        self._size += len(self._buffer)
+        self._buffer = bytearray()
+
+    def finish(self) -> tuple[bytes | bytearray | mmap.mmap, typing.BinaryIO | None]:
+        """Returns buffer with all records and spool file, if one was created"""
+        if self._file is None:
+            return self._buffer, None
+        self._flush()
+        self._file.flush()
+        return mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ), self._file
+
+
+def spool_result_set(session: _TdsSession, max_memory: int) -> SpooledRows:
+    """Reads remaining rows of the current result set of the session into a spool
+
+    :param max_memory: Maximum size of encoded rows kept in memory,
+                       larger result sets are spooled into a temporary file
+    """
+    info = session.res_info
+    row = session.row
+    assert info is not None and row is not None
+    decoder = session._row_decoder
+    if not isinstance(decoder, LazyRowDecoder):
+        # lazy decoder copies encoded values of rows without decoding them
+        decoder = LazyRowDecoder(session, info.columns)
+    saved_decoder = session._row_decoder
+    session._row_decoder = decoder
+    writer = _SpoolWriter(max_memory)
+    try:
+        while session.next_row():
+            data, values = decoder.encoded_row()
+            writer.write(row, data, values)
+    finally:
+        session._row_decoder = saved_decoder
+    buffer, file = writer.finish()
+    names = [col[0] for col in info.description]
+    return SpooledRows(
+        decoder=decoder,
+        convertor=session.row_strategy(names),
+        columns=len(info.columns),
+        visible_columns=len(names),
+        offsets=writer.offsets,
+        buffer=buffer,
+        file=file,
+    )
+
+
+class SpooledRows(collections.abc.Sequence):
+    """Read-only sequence of spooled rows
+
+    Rows are decoded every time they are accessed, using row strategy
+    of the connection.  Spool file is removed when sequence is closed
+    or garbage collected.
+    """
+
+    def __init__(
+        self,
+        decoder: LazyRowDecoder,
+        convertor: RowGenerator,
+        columns: int,
+        visible_columns: int,
+        offsets: array.array,
+        buffer: bytes | bytearray | mmap.mmap,
+        file: typing.BinaryIO | None,
+    ):
+        self._decoder = decoder
+        self._convertor = convertor
+        self._columns = columns
+        self._visible_columns = visible_columns
+        self._offsets = offsets
+        self._buffer = buffer
+        self._file = file
+
+    @property
+    def spooled_to_file(self) -> bool:
+        """True if rows were spooled into a temporary file"""
+        return self._file is not None
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    @typing.overload
+    def __getitem__(self, index: int) -> Any:
+        ...
+
+    @typing.overload
+    def __getitem__(self, index: slice) -> list[Any]:
+        ...
+
+    def __getitem__(self, index: int | slice) -> Any:
+        if isinstance(index, slice):
+            return [self._row(i) for i in range(*index.indices(len(self._offsets)))]
+        if index < 0:
+            index += len(self._offsets)
+        if not 0 <= index < len(self._offsets):
+            raise IndexError("row index out of range")
+        return self._row(index)
+
+    def _row(self, index: int) -> Any:
+        buffer = self._buffer
+        pos = self._offsets[index]
+        data_size, values_size = _record_header.unpack_from(buffer, pos)
+        pos += _record_header.size
+        ends_size = self._columns * _ENDS_ITEMSIZE
+        ends = tuple(array.array(_ENDS_TYPECODE, buffer[pos : pos + ends_size]))
+        pos += ends_size
+        data = buffer[pos : pos + data_size]
+        pos += data_size
+        values = pickle.loads(buffer[pos : pos + values_size]) if values_size else {}
+        decode = self._decoder.decode
+        return self._convertor(
+            values[i] if i in values else decode(data, ends, i)
+            for i in range(self._visible_columns)
+        )
+
+    def close(self) -> None:
+        """Releases memory and removes spool file"""
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._buffer = b""
+        self._offsets = array.array("Q")
+
+    def __enter__(self) -> SpooledRows:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
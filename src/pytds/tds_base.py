@@ -195,6 +195,14 @@ TDS_SP_PREPEXEC = 13
 TDS_SP_PREPEXECRPC = 14
 TDS_SP_UNPREPARE = 15
 
+# Options of sp_cursoropen
+TDS_CURSOR_SCROLL_FAST_FORWARD = 0x10
+TDS_CURSOR_SCROLL_PARAMETERIZED_STMT = 0x1000
+TDS_CURSOR_CC_READ_ONLY = 0x1
+
+# Fetch types of sp_cursorfetch
+TDS_CURSOR_FETCH_NEXT = 0x2
+
 # Flags returned in TDS_DONE token
 TDS_DONE_FINAL = 0
 TDS_DONE_MORE_RESULTS = 0x01  # more results follow
@@ -583,6 +591,31 @@ class NotSupportedError(DatabaseError):
     pass
 
 
+class BulkCopyError(Error):
+    """
+    This error is raised by :func:`pytds.bulk.parallel_copy` and by
+    :func:`pytds.Cursor.copy_to` with `batch_size` when some batches
+    failed to load.  Batches which were loaded before the failure stay committed.
+
+    Batches are numbered from zero in the order in which they were read from the input.
+    """
+
+    def __init__(
+        self,
+        errors: list[tuple[int, Exception]],
+        loaded_batches: list[int],
+        rows_loaded: int,
+    ):
+        index, error = errors[0]
+        super().__init__(f"Failed to load batch {index}: {error}")
+        #: List of tuples of batch number and error, ordered by batch number
+        self.errors = errors
+        #: Ordered numbers of batches which were loaded and committed
+        self.loaded_batches = loaded_batches
+        #: Number of rows in loaded batches
+        self.rows_loaded = rows_loaded
+
+
 # DB-API type definitions
 class DBAPITypeObject:
     """
@@ -655,6 +688,11 @@ class InternalProc(object):
 SP_EXECUTESQL = InternalProc(TDS_SP_EXECUTESQL, "sp_executesql")
 SP_PREPARE = InternalProc(TDS_SP_PREPARE, "sp_prepare")
 SP_EXECUTE = InternalProc(TDS_SP_EXECUTE, "sp_execute")
+SP_PREPEXEC = InternalProc(TDS_SP_PREPEXEC, "sp_prepexec")
+SP_UNPREPARE = InternalProc(TDS_SP_UNPREPARE, "sp_unprepare")
+SP_CURSOROPEN = InternalProc(TDS_SP_CURSOROPEN, "sp_cursoropen")
+SP_CURSORFETCH = InternalProc(TDS_SP_CURSORFETCH, "sp_cursorfetch")
+SP_CURSORCLOSE = InternalProc(TDS_SP_CURSORCLOSE, "sp_cursorclose")
 
 
 def skipall(stm, size):
@@ -797,6 +835,9 @@ class Column(CommonEqualityMixin):
     fReadWrite = 8
     fIdentity = 0x10
     fComputed = 0x20
+    # set by the server for columns which were not requested by the query,
+    # e.g. ROWSTAT column of server cursors
+    fHidden = 0x2000
 
     def __init__(self, name="", type=None, flags=fNullable, value=None):
         self.char_codec = None
@@ -831,6 +872,15 @@ class Column(CommonEqualityMixin):
         return type_factory.serializer_by_type(sql_type=self.type, collation=collation)
 
 
+def visible_columns_count(columns: list[Column]) -> int:
+    """Returns number of columns of result set which are returned to the caller,
+    trailing hidden columns are not returned"""
+    count = len(columns)
+    while count and columns[count - 1].flags & Column.fHidden:
+        count -= 1
+    return count
+
+
 class TransportProtocol(Protocol):
     """
     This protocol mimics socket protocol
@@ -989,9 +1039,15 @@ class _TdsLogin:
         self.connect_timeout = 0.0
         self.query_timeout: float | None = None
         self.blocksize = 4096
+        self.readahead_size = 0
         self.readonly = False
         self.load_balancer: LoadBalancer | None = None
         self.bytes_to_unicode = False
+        self.binary_as_memoryview = False
+        self.decimals_as_int = False
+        self.string_cache_max_length = 0
+        self.prepared_cache_size = 0
+        self.bulk_executemany_min_rows = 0
         self.auth: AuthProtocol | None = None
         self.servers: deque[Tuple[Any, int | None, str]] = deque()
         self.server_enc_flag = 0
@@ -11,7 +11,6 @@ from pytds import tds_base
 from pytds.collate import Collation, ucs2_codec
 from pytds.tds_base import (
     readall,
-    readall_fast,
     _header,
     _int_le,
     _uint_be,
@@ -52,7 +51,9 @@ class _TdsReader:
         tds_session: _TdsSession,
         transport: tds_base.TransportProtocol,
         bufsize: int = 4096,
+        readahead_size: int = 0,
     ):
+        self._block_size = bufsize
         self._buf = bytearray(b"\x00" * bufsize)
         self._bufview = memoryview(self._buf)
         self._pos = len(self._buf)  # position in the buffer
@@ -66,17 +67,39 @@ class _TdsReader:
         # 1 - means last packet
         self._status = 1
         self._spid = 0
+        # In read-ahead mode data is received from transport in large chunks
+        # into _buf and packets are split out of it in place, in this mode
+        # _pos and _size are offsets of the current packet within _buf.
+        # _ra_start and _ra_end delimit received but not yet consumed data.
+        self._readahead = readahead_size > 0
+        self._ra_start = 0
+        self._ra_end = 0
+        if self._readahead:
+            self._buf = bytearray(max(readahead_size, bufsize))
+            self._bufview = memoryview(self._buf)
+            self._pos = 0
 
     @property
     def session(self):
         return self._session
 
     def set_block_size(self, size: int) -> None:
+        self._block_size = size
+        if self._readahead:
+            if size > len(self._buf):
+                # keep data which was already received
+                pending = self._buf[self._ra_start : self._ra_end]
+                self._buf = bytearray(size)
+                self._bufview = memoryview(self._buf)
+                self._buf[: len(pending)] = pending
+                self._pos = self._size = self._ra_start = 0
+                self._ra_end = len(pending)
+            return
         self._buf = bytearray(b"\x00" * size)
         self._bufview = memoryview(self._buf)
 
     def get_block_size(self) -> int:
-        return len(self._buf)
+        return self._block_size
 
     @property
     def packet_type(self) -> int | None:
@@ -134,8 +157,13 @@ class _TdsReader:
         :param struc: A struct.Struct instance
         :returns: Result of unpacking
         """
-        buf, offset = readall_fast(self, struc.size)
-        return struc.unpack_from(buf, offset)
+        pos = self._pos
+        end = pos + struc.size
+        if end <= self._size:
+            self._pos = end
+            return struc.unpack_from(self._buf, pos)
+        # structure spans packets
+        return struc.unpack(readall(self, struc.size))
 
     def get_byte(self) -> int:
         """Reads one byte from stream"""
@@ -171,8 +199,7 @@ class _TdsReader:
 
     def read_ucs2(self, num_chars: int) -> str:
         """Reads num_chars UCS2 string from the stream"""
-        buf = readall(self, num_chars * 2)
-        return ucs2_codec.decode(buf)[0]
+        return self.read_str(num_chars * 2, ucs2_codec)
 
     def read_str(self, size: int, codec) -> str:
         """Reads byte string from the stream and decodes it
@@ -181,7 +208,57 @@ class _TdsReader:
         :param codec: Instance of codec to decode string
         :returns: Unicode string
         """
-        return codec.decode(readall(self, size))[0]
+        pos = self._pos
+        end = pos + size
+        if end <= self._size:
+            # decode straight from the packet buffer
+            self._pos = end
+            return codec.decode(self._bufview[pos:end])[0]
+        buf = bytearray(size)
+        self.readinto(buf)
+        return codec.decode(buf)[0]
+
+    def read_bytes(self, size: int) -> bytes:
+        """Reads exactly size bytes from the stream
+
+        Value is copied out of packet buffers once, without intermediate chunks.
+
+        :param size: Number of bytes to read
+        :returns: Bytes buffer of exactly given size
+        """
+        pos = self._pos
+        end = pos + size
+        if end <= self._size:
+            self._pos = end
+            return bytes(self._bufview[pos:end])
+        buf = bytearray(size)
+        self.readinto(buf)
+        return bytes(buf)
+
+    def readinto(self, buf: bytearray | memoryview) -> None:
+        """Fills given buffer with data from the stream
+
+        Data is copied straight from packet buffers, next packets are
+        read as needed.
+
+        :param buf: Writable buffer, exactly len(buf) bytes are read into it
+        :raises ClosedConnectionError: If stream ends before buffer is filled
+        """
+        view = memoryview(buf).cast("B")
+        size = len(view)
+        offset = 0
+        while offset < size:
+            if self._pos >= self._size:
+                if self._status == 1:
+                    raise tds_base.ClosedConnectionError()
+                self._read_packet()
+                continue
+            to_read = min(size - offset, self._size - self._pos)
+            view[offset : offset + to_read] = self._bufview[
+                self._pos : self._pos + to_read
+            ]
+            self._pos += to_read
+            offset += to_read
 
     def get_collation(self) -> Collation:
         """Reads :class:`Collation` object from stream"""
@@ -209,6 +286,9 @@ class _TdsReader:
         Can only be called when transport's read pointer is at the beginning
         of the packet.
         """
+        if self._readahead:
+            self._read_packet_readahead()
+            return
         pos = 0
         while pos < _header.size:
             received = self._transport.recv_into(
@@ -229,6 +309,49 @@ class _TdsReader:
             pos += received
             self._have += received
 
+    def _read_packet_readahead(self) -> None:
+        """Splits next TDS packet out of read-ahead buffer
+
+        Receives more data from the transport when buffer does not contain
+        whole packet yet.
+        """
+        self._fill(_header.size)
+        start = self._ra_start
+        self._type, self._status, size, self._spid, _ = _header.unpack_from(
+            self._buf, start
+        )
+        if size < _header.size:
+            raise tds_base.InterfaceError(f"Invalid TDS packet size {size}")
+        self._fill(size)
+        # buffer could be compacted by _fill
+        start = self._ra_start
+        self._pos = start + _header.size
+        self._size = start + size
+        self._have = size
+        self._ra_start = start + size
+
+    def _fill(self, size: int) -> None:
+        """Makes sure that read-ahead buffer has at least size bytes of unconsumed data"""
+        while self._ra_end - self._ra_start < size:
+            if len(self._buf) - self._ra_start < size:
+                # not enough room left at the end of the buffer,
+                # move unconsumed data to the beginning
+                pending = self._ra_end - self._ra_start
+                if size > len(self._buf):
+                    raise tds_base.InterfaceError(
+                        f"TDS packet size {size} is larger than read-ahead buffer"
+                    )
+                # copy slice first since source and destination may overlap
+                self._buf[:pending] = self._buf[self._ra_start : self._ra_end]
+                self._ra_start = 0
+                self._ra_end = pending
+            received = self._transport.recv_into(
+                self._bufview[self._ra_end :], len(self._buf) - self._ra_end
+            )
+            if received == 0:
+                raise tds_base.ClosedConnectionError()
+            self._ra_end += received
+
     def read_whole_packet(self) -> bytes:
         """Reads single packet and returns bytes payload of the packet
 
@@ -236,4 +359,22 @@ class _TdsReader:
         of the packet.
         """
         # self._read_packet()
-        return readall(self, self._size - _header.size)
+        return readall(self, self._size - self._pos)
+
+
+class _TdsBufferReader(_TdsReader):
+    """Reader over data which was already received
+
+    Used to decode values which were copied out of packet buffers,
+    e.g. by lazy rows.  Reading past the end of given range behaves
+    like reading past the end of the response stream.
+    """
+
+    def __init__(
+        self, tds_session: _TdsSession, buf: bytes | bytearray, start: int, end: int
+    ):
+        super().__init__(tds_session=tds_session, transport=None, bufsize=0)  # type: ignore # no transport
+        self._buf = buf  # type: ignore # read-only buffers are also supported
+        self._bufview = memoryview(buf)
+        self._pos = start
+        self._size = end
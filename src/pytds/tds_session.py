@@ -4,15 +4,18 @@ This module implements TdsSession class
 from __future__ import annotations
 
 import codecs
+import collections
 import collections.abc
 import contextlib
 import datetime
+import itertools
+import operator
 import struct
 import typing
 import warnings
 from typing import Callable, Iterable, Any, List
 
-from pytds import tds_base, tds_types
+from pytds import bulk, tds_base, tds_types
 from pytds.collate import lcid2charset, raw_collation
 from pytds.tds_base import (
     readall,
@@ -32,12 +35,91 @@ from pytds.tds_base import (
 )
 from pytds.tds_reader import _TdsReader, ResponseMetadata
 from pytds.tds_writer import _TdsWriter
-from pytds.row_strategies import list_row_strategy, RowStrategy, RowGenerator
+from pytds.row_strategies import (
+    list_row_strategy,
+    lazy_row_strategy,
+    RowStrategy,
+    RowGenerator,
+)
+from pytds.row_decoder import RowDecoder, compile_row_decoder
+from pytds.row_encoder import compile_row_encoder
+from pytds.lazy_row import LazyRowDecoder
+from pytds.columnar import ColumnarReader, ArrowBatchReader, ColumnarBulkWriter
+from pytds.spool import SpooledRows, spool_result_set
+from pytds.export import export_result_set
 from pytds.fedauth import fedauth_packet
+from pytds.pipeline import PipelineResult
 
 if typing.TYPE_CHECKING:
     from pytds.tds_socket import _TdsSocket
 
+# Maximum number of RPC calls which executemany sends in a single request
+_EXECUTEMANY_BATCH_SIZE = 1000
+
+# Options of INSERT BULK used by executemany, which make bulk load
+# behave like INSERT statements
+_BULK_EXECUTEMANY_OPTIONS = ("CHECK_CONSTRAINTS", "FIRE_TRIGGERS", "KEEP_NULLS")
+
+
+class _RewrittenQuery:
+    """Query with placeholders replaced by MSSQL parameter names
+
+    :param operation: Query with placeholders
+    :param params: Parameters of the query, only used to find NULL parameters
+    """
+
+    def __init__(
+        self, operation: str, params: list[Any] | tuple[Any, ...] | dict[str, Any]
+    ):
+        # pairs of MSSQL parameter name and index or key of the parameter value
+        self.params: list[tuple[str, Any]] = []
+        pid = 1
+        if isinstance(params, dict):
+            # rename parameters
+            rename: dict[str, Any] = {}
+            for name, value in params.items():
+                if value is None:
+                    rename[name] = "NULL"
+                else:
+                    mssql_name = f"@P{pid}"
+                    rename[name] = mssql_name
+                    self.params.append((mssql_name, name))
+                    pid += 1
+            self.operation = operation % rename
+        else:
+            names = []
+            for i, val in enumerate(params):
+                if val is None:
+                    names.append("NULL")
+                else:
+                    name = f"@P{pid}"
+                    names.append(name)
+                    self.params.append((name, i))
+                    pid += 1
+            if len(names) == 1:
+                self.operation = operation % names[0]
+            else:
+                self.operation = operation % tuple(names)
+        # types of parameters of the last call and their declaration
+        self._last_declaration: tuple[list[Any], str] = ([], "")
+
+    def declaration(self, params: list[tds_base.Param]) -> str:
+        """Returns declaration of parameters, e.g. ``@P1 INT,@P2 NVARCHAR(MAX)``
+
+        Declaration is reused while parameters have the same type objects,
+        which is the case for inferred types.
+        """
+        types = [p.type for p in params]
+        last_types, declaration = self._last_declaration
+        if len(types) != len(last_types) or not all(
+            map(operator.is_, types, last_types)
+        ):
+            declaration = ",".join(
+                f"{p.name} {p.type.get_declaration()}" for p in params
+            )
+            self._last_declaration = (types, declaration)
+        return declaration
+
 
 class _TdsSession:
     """TDS session
@@ -57,9 +139,12 @@ class _TdsSession:
         env: _TdsEnv,
         bufsize: int,
         row_strategy: RowStrategy = list_row_strategy,
+        readahead_size: int = 0,
     ):
         self.out_pos = 8
         self.res_info: _Results | None = None
+        # decoder for rows of the current result set, built from COLMETADATA
+        self._row_decoder: RowDecoder | LazyRowDecoder | None = None
         self.in_cancel = False
         self.wire_mtx = None
         self.param_info = None
@@ -68,7 +153,10 @@ class _TdsSession:
         self.skipped_to_status = False
         self._transport = transport
         self._reader = _TdsReader(
-            transport=transport, bufsize=bufsize, tds_session=self
+            transport=transport,
+            bufsize=bufsize,
+            tds_session=self,
+            readahead_size=readahead_size,
         )
         self._writer = _TdsWriter(
             transport=transport, bufsize=bufsize, tds_session=self
@@ -80,8 +168,8 @@ class _TdsSession:
         self.rows_affected = -1
         self.use_tz = tds.use_tz
         self._spid = 0
-        self.tzinfo_factory = tzinfo_factory
-        self.more_rows = False
+        self.tzinfo_factory: tds_types.TzInfoFactoryType | None = tzinfo_factory
+        self.more_rows: bool = False
         self.done_flags = 0
         self.internal_sp_called = 0
         self.output_params: dict[int, tds_base.Column] = {}
@@ -93,6 +181,15 @@ class _TdsSession:
         self._row_strategy = row_strategy
         self._env = env
         self._row_convertor: RowGenerator = list
+        # rows of current result set which were read ahead by fetch_next
+        # but were not returned to the caller yet
+        self._row_buffer: collections.deque[Any] = collections.deque()
+        # key of prepared statements cache for the pending sp_prepexec request,
+        # handle returned by the request is stored in the cache under this key
+        self._prepare_key: tuple[str, str] | None = None
+        # metadata of the server cursor which is being fetched,
+        # server does not send it again with fetched rows
+        self._cursor_results: _Results | None = None
 
     @property
     def autocommit(self):
@@ -206,19 +303,15 @@ class _TdsSession:
 
         num_cols = r.get_smallint()
 
-        # This can be a DUMMY results token from a cursor fetch
+        # This can be a DUMMY results token from a cursor fetch,
+        # rows are decoded using metadata received when cursor was opened
 
         if num_cols == -1:
+            if self._cursor_results is not None:
+                self._start_result_set(self._cursor_results)
             return
 
-        self.param_info = None
-        self.has_status = False
-        self.ret_status = None
-        self.skipped_to_status = False
-        self.rows_affected = tds_base.TDS_NO_COUNT
-        self.more_rows = True
-        self.row = [None] * num_cols
-        self.res_info = info = _Results()
+        info = _Results()
 
         #
         # loop through the columns populating COLINFO struct from
@@ -245,10 +338,39 @@ class _TdsSession:
                     curcol.flags & tds_base.Column.fNullable,
                 )
             )
-        info.description = tuple(header_tuple)
-        self._setup_row_factory()
+        # trailing hidden columns are not returned to the caller
+        info.description = tuple(
+            header_tuple[: tds_base.visible_columns_count(info.columns)]
+        )
+        cache_max_length = self._tds._login.string_cache_max_length
+        if cache_max_length:
+            for col in info.columns:
+                serializer = col.serializer
+                if (
+                    tds_types.supports_decode_cache(serializer)
+                    and serializer.size <= cache_max_length
+                ):
+                    serializer.set_decode_cache()
+        self._start_result_set(info)
         return info
 
+    def _start_result_set(self, info: _Results) -> None:
+        """Makes `info` current result set and prepares for reading its rows"""
+        self.param_info = None
+        self.has_status = False
+        self.ret_status = None
+        self.skipped_to_status = False
+        self.rows_affected = tds_base.TDS_NO_COUNT
+        self.more_rows = True
+        self._row_buffer.clear()
+        self.row = [None] * len(info.columns)
+        self.res_info = info
+        if self._row_strategy is lazy_row_strategy:
+            self._row_decoder = LazyRowDecoder(self, info.columns)
+        else:
+            self._row_decoder = compile_row_decoder(info.columns)
+        self._setup_row_factory()
+
     def process_param(self):
         """Reads and processes RETURNVALUE stream.
 
@@ -270,6 +392,9 @@ class _TdsSession:
         param.value = param.serializer.read(r)
         self.output_params[ordinal] = param
         self.return_value_index += 1
+        if ordinal == 0 and self._prepare_key is not None:
+            self._cache_prepared_handle(self._prepare_key, param.value)
+            self._prepare_key = None
 
     def process_cancel(self):
         """
@@ -346,8 +471,7 @@ class _TdsSession:
         r = self._reader
         info = self.res_info
         info.row_count += 1
-        for i, curcol in enumerate(info.columns):
-            curcol.value = self.row[i] = curcol.serializer.read(r)
+        self._row_decoder.read_row(r, self.row)
 
     def process_nbcrow(self):
         """Reads and handles NBCROW stream.
@@ -367,12 +491,11 @@ class _TdsSession:
         # reading bitarray for nulls, 1 represent null values for
         # corresponding fields
         nbc = readall(r, (len(info.columns) + 7) // 8)
-        for i, curcol in enumerate(info.columns):
-            if tds_base.my_ord(nbc[i // 8]) & (1 << (i % 8)):
-                value = None
-            else:
-                value = curcol.serializer.read(r)
-            self.row[i] = value
+        if not any(nbc):
+            # row without NULLs has the same layout as ROW token
+            self._row_decoder.read_row(r, self.row)
+        else:
+            self._row_decoder.read_nbc_row(r, self.row, nbc)
 
     def process_orderby(self):
         """Reads and processes ORDER stream
@@ -640,6 +763,7 @@ class _TdsSession:
         """
         if self.set_state(tds_base.TDS_QUERYING) != tds_base.TDS_QUERYING:
             raise tds_base.Error("Couldn't switch to state")
+        self._prepare_key = None
         self._writer.begin_packet(packet_type)
         try:
             yield
@@ -755,56 +879,105 @@ class _TdsSession:
         self.output_params = {}
         self.cancel_if_pending()
         self.res_info = None
+        with self.querying_context(tds_base.PacketType.RPC):
+            if tds_base.IS_TDS72_PLUS(self):
+                self._start_query()
+            self._out_params_indexes = []
+            self._write_rpc(rpc_name, params, flags)
+
+    def submit_rpc_batch(
+        self,
+        calls: typing.Sequence[
+            tuple[tds_base.InternalProc | str, List[tds_base.Param]]
+        ],
+    ) -> None:
+        """Sends multiple RPC calls in a single request.
+
+        Calls are separated by batch flag, server executes them one after another
+        and sends responses of all calls, each ending with DONEPROC token.
+
+        :param calls: List of tuples of RPC name and RPC parameters, see :func:`submit_rpc`.
+        """
+        logger.info("Sending batch of %d RPCs", len(calls))
+        self.messages = []
+        self.output_params = {}
+        self.cancel_if_pending()
+        self.res_info = None
         w = self._writer
+        # batch flag was changed in TDS 7.2
+        batch_flag = 0xFF if tds_base.IS_TDS72_PLUS(self) else 0x80
         with self.querying_context(tds_base.PacketType.RPC):
             if tds_base.IS_TDS72_PLUS(self):
                 self._start_query()
-            if tds_base.IS_TDS71_PLUS(self) and isinstance(
-                rpc_name, tds_base.InternalProc
-            ):
-                w.put_smallint(-1)
-                w.put_smallint(rpc_name.proc_id)
+            self._out_params_indexes = []
+            for i, (rpc_name, params) in enumerate(calls):
+                if i:
+                    w.put_byte(batch_flag)
+                self._write_rpc(rpc_name, params, 0)
+
+    def _write_rpc(
+        self,
+        rpc_name: tds_base.InternalProc | str,
+        params: List[tds_base.Param],
+        flags: int,
+    ) -> None:
+        """Writes single RPC call of RPC request"""
+        w = self._writer
+        if tds_base.IS_TDS71_PLUS(self) and isinstance(
+            rpc_name, tds_base.InternalProc
+        ):
+            w.put_smallint(-1)
+            w.put_smallint(rpc_name.proc_id)
+        else:
+            if isinstance(rpc_name, tds_base.InternalProc):
+                proc_name = rpc_name.name
             else:
-                if isinstance(rpc_name, tds_base.InternalProc):
-                    proc_name = rpc_name.name
-                else:
-                    proc_name = rpc_name
-                w.put_smallint(len(proc_name))
-                w.write_ucs2(proc_name)
+                proc_name = rpc_name
+            w.put_smallint(len(proc_name))
+            w.write_ucs2(proc_name)
+        #
+        # TODO support flags
+        # bit 0 (1 as flag) in TDS7/TDS5 is "recompile"
+        # bit 1 (2 as flag) in TDS7+ is "no metadata" bit this will prevent sending of column infos
+        #
+        w.put_usmallint(flags)
+        for i, param in enumerate(params):
+            if param.flags & tds_base.fByRefValue:
+                self._out_params_indexes.append(i)
+            w.put_byte(len(param.name))
+            w.write_ucs2(param.name)
             #
-            # TODO support flags
-            # bit 0 (1 as flag) in TDS7/TDS5 is "recompile"
-            # bit 1 (2 as flag) in TDS7+ is "no metadata" bit this will prevent sending of column infos
+            # TODO support other flags (use defaul null/no metadata)
+            # bit 1 (2 as flag) in TDS7+ is "default value" bit
+            # (what's the meaning of "default value" ?)
             #
-            w.put_usmallint(flags)
-            self._out_params_indexes = []
-            for i, param in enumerate(params):
-                if param.flags & tds_base.fByRefValue:
-                    self._out_params_indexes.append(i)
-                w.put_byte(len(param.name))
-                w.write_ucs2(param.name)
-                #
-                # TODO support other flags (use defaul null/no metadata)
-                # bit 1 (2 as flag) in TDS7+ is "default value" bit
-                # (what's the meaning of "default value" ?)
-                #
-                w.put_byte(param.flags)
+            w.put_byte(param.flags)
 
-                # TYPE_INFO structure: https://msdn.microsoft.com/en-us/library/dd358284.aspx
-                serializer = self._tds.type_factory.serializer_by_type(
-                    sql_type=param.type, collation=self._tds.collation or raw_collation
-                )
-                type_id = serializer.type
-                w.put_byte(type_id)
-                serializer.write_info(w)
+            # TYPE_INFO structure: https://msdn.microsoft.com/en-us/library/dd358284.aspx
+            serializer = self._tds.type_factory.serializer_by_type(
+                sql_type=param.type, collation=self._tds.collation or raw_collation
+            )
+            type_id = serializer.type
+            w.put_byte(type_id)
+            serializer.write_info(w)
 
-                serializer.write(w, param.value)
+            serializer.write(w, param.value)
 
     def _setup_row_factory(self) -> None:
         self._row_convertor = list
-        if self.res_info:
+        if isinstance(self._row_decoder, LazyRowDecoder):
+            self._row_convertor = self._row_decoder.make_row
+        elif self.res_info:
             column_names = [col[0] for col in self.res_info.description]
-            self._row_convertor = self._row_strategy(column_names)
+            convertor = self._row_strategy(column_names)
+            visible = len(column_names)
+            if visible < len(self.res_info.columns):
+                # drop values of hidden columns
+                self._row_convertor = lambda row: convertor(
+                    itertools.islice(row, visible)
+                )
+            else:
+                self._row_convertor = convertor
 
     def callproc(
         self,
@@ -851,72 +1024,541 @@ class _TdsSession:
     ) -> None:
         """
         Execute same SQL query multiple times for each parameter set in the `params_seq` list.
+
+        Executions are sent to the server in batches of RPC calls, one request per batch,
+        which saves a network round trip for every parameter set.
+        If one of the calls fails, remaining calls of the same batch are still executed
+        by the server, i.e. every parameter set of the failed batch is attempted,
+        and in autocommit mode successful calls are committed.
+        Responses of the whole batch are read, then the error of the first failed
+        call is raised and following batches are not sent.
+
+        If ``bulk_executemany_min_rows`` connection option is set and operation is
+        a single row ``INSERT`` statement, rows are loaded with ``INSERT BULK`` request.
         """
-        counts = []
+        self._ensure_transaction()
+        min_rows = self._tds.bulk_executemany_min_rows
+        if min_rows:
+            statement = bulk.parse_insert(operation)
+            if statement is not None:
+                params_seq = list(params_seq)
+                if len(params_seq) >= min_rows and self._executemany_bulk(
+                    statement, params_seq
+                ):
+                    return
+        cache = self._tds.prepared_cache
+        calls: list[tuple[tds_base.InternalProc, list[tds_base.Param]]] = []
+        # statements of calls which use prepared handles, None for other calls
+        prepared: list[tuple[str, str, list[tds_base.Param]] | None] = []
+        counts: list[int] = []
         for params in params_seq:
-            self.execute(operation, params)
-            if self.rows_affected != -1:
-                counts.append(self.rows_affected)
+            query, query_params, param_definition = self._rewrite_query(
+                operation, params
+            )
+            if not query_params:
+                self._execute_many_batch(calls, prepared, counts)
+                self.submit_plain_query(query)
+                self.begin_response()
+                self.find_result_or_done()
+                if self.rows_affected != -1:
+                    counts.append(self.rows_affected)
+                continue
+            if cache is None:
+                calls.append(
+                    (
+                        tds_base.SP_EXECUTESQL,
+                        self._executesql_params(
+                            query, param_definition, query_params
+                        ),
+                    )
+                )
+                prepared.append(None)
+            else:
+                handle = cache.get((query, param_definition))
+                if handle is None:
+                    # handle is needed for the following calls, so statement
+                    # is prepared by a separate request
+                    self._execute_many_batch(calls, prepared, counts)
+                    self._execute_prepared_many(
+                        query, param_definition, query_params, counts
+                    )
+                    continue
+                calls.append(
+                    (
+                        tds_base.SP_EXECUTE,
+                        [tds_base.Param(type=tds_types.IntType(), value=handle)]
+                        + query_params,
+                    )
+                )
+                prepared.append((query, param_definition, query_params))
+            if len(calls) >= _EXECUTEMANY_BATCH_SIZE:
+                self._execute_many_batch(calls, prepared, counts)
+        self._execute_many_batch(calls, prepared, counts)
+        self._unprepare_evicted()
         if counts:
             self.rows_affected = sum(counts)
 
-    def execute(
+    def _execute_many_batch(
+        self,
+        calls: list[tuple[tds_base.InternalProc, list[tds_base.Param]]],
+        prepared: list[tuple[str, str, list[tds_base.Param]] | None],
+        counts: list[int],
+    ) -> None:
+        """Executes batch of executemany calls
+
+        Calls which failed because their prepared statement handle is not valid
+        anymore are executed again after the batch, their statements are
+        prepared again as with single executions.
+        Error of the first call which failed otherwise is raised.
+        """
+        self._unprepare_evicted()
+        errors = self._execute_rpc_batch(calls, counts)
+        statements = prepared[:]
+        prepared.clear()
+        stale = []
+        error = None
+        for index, ex in errors:
+            statement = statements[index]
+            if (
+                statement is None
+                or not isinstance(ex, tds_base.DatabaseError)
+                or ex.msg_no != 8179  # could not find prepared statement
+            ):
+                error = ex
+                break
+            stale.append(statement)
+        cache = self._tds.prepared_cache
+        if stale and cache is not None:
+            for operation, param_definition, _ in stale:
+                handle = cache.pop((operation, param_definition))
+                if handle is not None:
+                    logger.info("Prepared statement handle %d is not valid", handle)
+            for operation, param_definition, params in stale:
+                self._execute_prepared_many(operation, param_definition, params, counts)
+        if error is not None:
+            raise error
+
+    def _execute_prepared_many(
         self,
         operation: str,
-        params: list[Any] | tuple[Any, ...] | dict[str, Any] | None = None,
+        param_definition: str,
+        params: list[tds_base.Param],
+        counts: list[int],
     ) -> None:
+        self._execute_prepared(operation, param_definition, params)
+        if self.rows_affected != -1:
+            counts.append(self.rows_affected)
+        self.complete_rpc()
+
+    def _executemany_bulk(
+        self,
+        statement: bulk.InsertStatement,
+        params_seq: list[list[Any] | tuple[Any, ...] | dict[str, Any]],
+    ) -> bool:
+        """Loads rows of executemany with INSERT BULK request
+
+        :returns: False if parameters do not fit the statement, types of columns
+                  cannot be inferred or statement lists identity columns,
+                  rows are not loaded in this case
+        """
+        num_columns = len(statement.columns)
+        rows: list[collections.abc.Sequence[Any]]
+        if statement.param_names is None:
+            if not all(
+                isinstance(params, (list, tuple)) and len(params) == num_columns
+                for params in params_seq
+            ):
+                return False
+            rows = typing.cast(list, params_seq)
+        else:
+            rows = []
+            for params in params_seq:
+                if not isinstance(params, dict):
+                    return False
+                try:
+                    rows.append([params[name] for name in statement.param_names])
+                except KeyError:
+                    return False
+        metadata = bulk.infer_columns(self.conn.type_inferrer, statement.columns, rows)
+        if metadata is None:
+            return False
+        # INSERT BULK ignores values of identity columns unless KEEPIDENTITY
+        # is given, while INSERT fails for them unless IDENTITY_INSERT is on,
+        # so such statements are executed as they are
+        if self._lists_identity_column(statement):
+            return False
+        self.submit_plain_query(
+            bulk.insert_bulk_statement(
+                statement.table, metadata, _BULK_EXECUTEMANY_OPTIONS
+            )
+        )
+        self.process_simple_request()
+        self.submit_bulk(metadata, rows)
+        self.process_simple_request()
+        return True
+
+    def _lists_identity_column(self, statement: bulk.InsertStatement) -> bool:
+        """Checks whether statement inserts into identity column of the table"""
+        names = ", ".join(tds_base.tds_quote_id(name) for name in statement.columns)
+        self.submit_plain_query(f"select top 0 {names} from {statement.table}")
+        self.begin_response()
+        identity = False
+        if self.find_result_or_done():
+            info = self.res_info
+            assert info is not None
+            identity = any(
+                col.flags & tds_base.Column.fIdentity for col in info.columns
+            )
+        self.complete_rpc()
+        return identity
+
+    def _execute_rpc_batch(
+        self,
+        calls: list[tuple[tds_base.InternalProc, list[tds_base.Param]]],
+        counts: list[int],
+    ) -> list[tuple[int, tds_base.Error]]:
+        """Sends batch of RPC calls and reads responses of all calls
+
+        Calls list is cleared, row counts of calls are appended to counts list.
+        Errors of failed calls are returned with indexes of the calls
+        after responses of all calls are read, so that connection is left idle.
+        """
+        if not calls:
+            return []
+        num_calls = len(calls)
+        self.submit_rpc_batch(calls)
+        calls.clear()
+        self.begin_response()
+        self.done_flags = 0
+        self.return_value_index = 0
+        procs_done = 0
+        call_count: int | None = None
+        errors: list[tuple[int, tds_base.Error]] = []
+        while procs_done < num_calls:
+            marker = self.get_token_id()
+            if marker in (
+                tds_base.TDS_DONE_TOKEN,
+                tds_base.TDS_DONEPROC_TOKEN,
+                tds_base.TDS_DONEINPROC_TOKEN,
+            ):
+                try:
+                    self.process_end(marker)
+                except tds_base.Error as ex:
+                    # server executes remaining calls of the batch even after
+                    # a failed call, only the first error of each call is kept
+                    if not errors or errors[-1][0] != procs_done:
+                        errors.append((procs_done, ex))
+                # same as with single execution, row count of the first
+                # statement which has it is used
+                if call_count is None and self.done_flags & tds_base.TDS_DONE_COUNT:
+                    call_count = self.rows_affected
+                if marker == tds_base.TDS_DONEPROC_TOKEN:
+                    procs_done += 1
+                    if call_count is not None:
+                        counts.append(call_count)
+                    call_count = None
+                # response can end before all calls are done,
+                # e.g. when batch is aborted by the server
+                if not self.done_flags & tds_base.TDS_DONE_MORE_RESULTS:
+                    break
+            else:
+                self.process_token(marker)
+        return errors
+
+    def execute_pipeline(
+        self,
+        statements: list[
+            tuple[str, list[Any] | tuple[Any, ...] | dict[str, Any] | None]
+        ],
+        results: list[PipelineResult],
+    ) -> None:
+        """Executes statements with a single request
+
+        Every statement is sent as ``sp_executesql`` call of one RPC batch,
+        result of each statement is appended to `results` as soon as
+        its response is read.  See :class:`pytds.pipeline.Pipeline`.
+        """
         self._ensure_transaction()
-        if params is not None:
-            named_params = {}
-            if isinstance(params, (list, tuple)):
-                names = []
-                pid = 1
-                for val in params:
-                    if val is None:
-                        names.append("NULL")
-                    else:
-                        name = f"@P{pid}"
-                        names.append(name)
-                        named_params[name] = val
-                        pid += 1
-                if len(names) == 1:
-                    operation = operation % names[0]
-                else:
-                    operation = operation % tuple(names)
-            elif isinstance(params, dict):
-                # rename parameters
-                rename: dict[str, Any] = {}
-                pid = 1
-                for name, value in params.items():
-                    if value is None:
-                        rename[name] = "NULL"
-                    else:
-                        mssql_name = f"@P{pid}"
-                        rename[name] = mssql_name
-                        named_params[mssql_name] = value
-                        pid += 1
-                operation = operation % rename
-            if named_params:
-                list_named_params = self._convert_params(named_params)
-                param_definition = ",".join(
-                    f"{p.name} {p.type.get_declaration()}" for p in list_named_params
-                )
-                self.submit_rpc(
-                    tds_base.SP_EXECUTESQL,
-                    [
-                        self.make_param("", operation),
-                        self.make_param("", param_definition),
-                    ]
-                    + list_named_params,
-                    0,
+        calls: list[tuple[tds_base.InternalProc, list[tds_base.Param]]] = []
+        for operation, params in statements:
+            query, query_params, param_definition = self._rewrite_query(
+                operation, params
+            )
+            if query_params:
+                call_params = self._executesql_params(
+                    query, param_definition, query_params
                 )
             else:
-                self.submit_plain_query(operation)
+                call_params = [self.make_param("", query)]
+            calls.append((tds_base.SP_EXECUTESQL, call_params))
+        self.submit_rpc_batch(calls)
+        self.begin_response()
+        self.done_flags = 0
+        self.return_value_index = 0
+        result = PipelineResult()
+        while len(results) < len(calls):
+            marker = self.get_token_id()
+            if marker == tds_base.TDS7_RESULT_TOKEN:
+                self.process_token(marker)
+                assert self.res_info is not None
+                result.descriptions.append(self.res_info.description)
+                # reads rows up to and including DONE token of the result set
+                result.result_sets.append(self.fetch_rows())
+                marker = self.end_marker
+            elif marker in (
+                tds_base.TDS_DONE_TOKEN,
+                tds_base.TDS_DONEPROC_TOKEN,
+                tds_base.TDS_DONEINPROC_TOKEN,
+            ):
+                self.process_end(marker)
+            else:
+                self.process_token(marker)
+                continue
+            if result.rowcount == -1 and self.done_flags & tds_base.TDS_DONE_COUNT:
+                result.rowcount = self.rows_affected
+            if marker == tds_base.TDS_DONEPROC_TOKEN:
+                results.append(result)
+                result = PipelineResult()
+            elif not self.done_flags & tds_base.TDS_DONE_MORE_RESULTS:
+                break
+
+    def _rewrite_query(
+        self,
+        operation: str,
+        params: list[Any] | tuple[Any, ...] | dict[str, Any] | None,
+    ) -> tuple[str, list[tds_base.Param], str]:
+        """Replaces parameter placeholders in the query with MSSQL parameter names
+
+        Parameters with NULL values are inlined into the query.
+        Rewritten queries are cached by query text and by which parameters are NULL.
+
+        :returns: Rewritten query, list of parameters which are left in the query
+                  and declaration of these parameters
+        """
+        if params is None:
+            return operation, [], ""
+        if isinstance(params, (list, tuple)):
+            key: tuple[Any, ...] = (operation, None, tuple(v is None for v in params))
+        elif isinstance(params, dict):
+            key = (
+                operation,
+                tuple(params),
+                tuple(v is None for v in params.values()),
+            )
+        else:
+            return operation, [], ""
+        cache = self._tds.statement_cache
+        statement = cache.get(key)
+        if statement is None:
+            statement = _RewrittenQuery(operation, params)
+            cache.put(key, statement)
+        query_params = [
+            self.make_param(name, params[source])  # type: ignore # key matches params type
+            for name, source in statement.params
+        ]
+        return statement.operation, query_params, statement.declaration(query_params)
+
+    def _executesql_params(
+        self, operation: str, param_definition: str, params: list[tds_base.Param]
+    ) -> list[tds_base.Param]:
+        return [
+            self.make_param("", operation),
+            self.make_param("", param_definition),
+        ] + params
+
+    def execute(
+        self,
+        operation: str,
+        params: list[Any] | tuple[Any, ...] | dict[str, Any] | None = None,
+    ) -> None:
+        self._ensure_transaction()
+        operation, query_params, param_definition = self._rewrite_query(
+            operation, params
+        )
+        if query_params and self._tds.prepared_cache is not None:
+            self._execute_prepared(operation, param_definition, query_params)
+            return
+        self._submit_query(operation, query_params, param_definition)
+        self.begin_response()
+        self.find_result_or_done()
+
+    def submit_execute(
+        self,
+        operation: str,
+        params: list[Any] | tuple[Any, ...] | dict[str, Any] | None = None,
+    ) -> None:
+        """Sends query without reading its response
+
+        Prepared statements cache is not used, since preparing statement
+        requires reading response of a separate request.
+        """
+        operation, query_params, param_definition = self._rewrite_query(
+            operation, params
+        )
+        self._submit_query(operation, query_params, param_definition)
+
+    def _submit_query(
+        self,
+        operation: str,
+        query_params: list[tds_base.Param],
+        param_definition: str,
+    ) -> None:
+        if query_params:
+            self.submit_rpc(
+                tds_base.SP_EXECUTESQL,
+                self._executesql_params(operation, param_definition, query_params),
+                0,
+            )
         else:
             self.submit_plain_query(operation)
+
+    def _execute_prepared(
+        self,
+        operation: str,
+        param_definition: str,
+        params: list[tds_base.Param],
+    ) -> None:
+        """Executes parameterized query using prepared statements cache
+
+        First execution of the query prepares it with ``sp_prepexec``, handle
+        returned by the server is cached and used by following executions
+        which call ``sp_execute`` with just the handle and parameter values.
+        """
+        cache = self._tds.prepared_cache
+        assert cache is not None
+        self._unprepare_evicted()
+        key = (operation, param_definition)
+        handle = cache.get(key)
+        if handle is not None:
+            self.submit_rpc(
+                tds_base.SP_EXECUTE,
+                [tds_base.Param(type=tds_types.IntType(), value=handle)] + params,
+            )
+            self.begin_response()
+            try:
+                self.find_result_or_done()
+                return
+            except tds_base.DatabaseError as ex:
+                if ex.msg_no != 8179:  # could not find prepared statement
+                    raise
+                logger.info("Prepared statement handle %d is not valid", handle)
+                cache.pop(key)
+        self.submit_rpc(
+            tds_base.SP_PREPEXEC,
+            [
+                tds_base.Param(
+                    type=tds_types.IntType(), flags=tds_base.fByRefValue
+                ),
+                self.make_param("", param_definition),
+                self.make_param("", operation),
+            ]
+            + params,
+        )
+        self._prepare_key = key
         self.begin_response()
         self.find_result_or_done()
 
+    def _cache_prepared_handle(self, key: tuple[str, str], handle: int | None) -> None:
+        cache = self._tds.prepared_cache
+        if cache is None or handle is None:
+            return
+        self._tds.unprepare_queue.extend(cache.put(key, handle))
+
+    def _unprepare_evicted(self) -> None:
+        """Unprepares statements which were evicted from prepared statements cache"""
+        queue = self._tds.unprepare_queue
+        while queue:
+            handle = queue.pop()
+            self.submit_rpc(
+                tds_base.SP_UNPREPARE,
+                [tds_base.Param(type=tds_types.IntType(), value=handle)],
+            )
+            try:
+                self.process_simple_request()
+            except tds_base.DatabaseError:
+                logger.info("Failed to unprepare statement handle %d", handle)
+
+    def open_cursor(
+        self,
+        operation: str,
+        params: list[Any] | tuple[Any, ...] | dict[str, Any] | None = None,
+    ) -> tuple[int, _Results | None]:
+        """Opens fast forward read only server cursor using ``sp_cursoropen``
+
+        Server sends only metadata of the result set, rows should be fetched
+        with :func:`fetch_cursor`.
+
+        :returns: Cursor handle and result set metadata, metadata is None if
+                  query does not produce result set
+        """
+        self._ensure_transaction()
+        operation, query_params, param_definition = self._rewrite_query(
+            operation, params
+        )
+        scroll_options = tds_base.TDS_CURSOR_SCROLL_FAST_FORWARD
+        if query_params:
+            scroll_options |= tds_base.TDS_CURSOR_SCROLL_PARAMETERIZED_STMT
+        rpc_params = [
+            tds_base.Param(type=tds_types.IntType(), flags=tds_base.fByRefValue),
+            self.make_param("", operation),
+            tds_base.Param(
+                type=tds_types.IntType(),
+                flags=tds_base.fByRefValue,
+                value=scroll_options,
+            ),
+            tds_base.Param(
+                type=tds_types.IntType(),
+                flags=tds_base.fByRefValue,
+                value=tds_base.TDS_CURSOR_CC_READ_ONLY,
+            ),
+            tds_base.Param(type=tds_types.IntType(), flags=tds_base.fByRefValue),
+        ]
+        if query_params:
+            rpc_params += [self.make_param("", param_definition)] + query_params
+        self.submit_rpc(tds_base.SP_CURSOROPEN, rpc_params)
+        self.begin_response()
+        self.process_rpc()
+        info = self.res_info
+        self.complete_rpc()
+        handle = self.output_params[0].value if 0 in self.output_params else None
+        return handle or 0, info
+
+    def fetch_cursor(self, handle: int, info: _Results, size: int) -> list[Any]:
+        """Fetches up to `size` next rows of server cursor using ``sp_cursorfetch``
+
+        :param handle: Cursor handle returned by :func:`open_cursor`
+        :param info: Result set metadata returned by :func:`open_cursor`
+        :returns: List of converted rows, empty when cursor is exhausted
+        """
+        self._ensure_transaction()
+        self.submit_rpc(
+            tds_base.SP_CURSORFETCH,
+            [
+                tds_base.Param(type=tds_types.IntType(), value=handle),
+                tds_base.Param(
+                    type=tds_types.IntType(), value=tds_base.TDS_CURSOR_FETCH_NEXT
+                ),
+                tds_base.Param(type=tds_types.IntType(), value=0),
+                tds_base.Param(type=tds_types.IntType(), value=size),
+            ],
+        )
+        self._cursor_results = info
+        try:
+            self.begin_response()
+            rows = self.fetch_rows() if self.process_rpc() else []
+            self.complete_rpc()
+        finally:
+            self._cursor_results = None
+        return rows
+
+    def close_cursor(self, handle: int) -> None:
+        """Closes server cursor using ``sp_cursorclose``"""
+        self.submit_rpc(
+            tds_base.SP_CURSORCLOSE,
+            [tds_base.Param(type=tds_types.IntType(), value=handle)],
+        )
+        self.process_simple_request()
+
     def execute_scalar(
         self,
         query_string: str,
@@ -979,42 +1621,91 @@ class _TdsSession:
         :return:
         """
         logger.info("Sending INSERT BULK")
-        num_cols = len(metadata)
         w = self._writer
-        serializers = []
         with self.querying_context(tds_base.PacketType.BULK):
-            w.put_byte(tds_base.TDS7_RESULT_TOKEN)
-            w.put_usmallint(num_cols)
-            for col in metadata:
-                if tds_base.IS_TDS72_PLUS(self):
-                    w.put_uint(col.column_usertype)
-                else:
-                    w.put_usmallint(col.column_usertype)
-                w.put_usmallint(col.flags)
-                serializer = col.choose_serializer(
-                    type_factory=self._tds.type_factory,
-                    collation=self._tds.collation,
-                )
-                type_id = serializer.type
-                w.put_byte(type_id)
-                serializers.append(serializer)
-                serializer.write_info(w)
-                w.put_byte(len(col.column_name))
-                w.write_ucs2(col.column_name)
-            for row in rows:
-                w.put_byte(tds_base.TDS_ROW_TOKEN)
-                for i, col in enumerate(metadata):
-                    serializers[i].write(w, row[i])
-
-            # https://msdn.microsoft.com/en-us/library/dd340421.aspx
-            w.put_byte(tds_base.TDS_DONE_TOKEN)
-            w.put_usmallint(tds_base.TDS_DONE_FINAL)
-            w.put_usmallint(0)  # curcmd
-            # row count
+            serializers = self._write_bulk_metadata(metadata)
+            compile_row_encoder(serializers).write_rows(w, rows)
+            self._write_bulk_done()
+
+    def submit_bulk_columns(
+        self,
+        metadata: list[tds_base.Column],
+        columns: list[tuple[Any, Any]],
+    ) -> None:
+        """Sends insert bulk command with rows given as columns.
+
+        Requires NumPy, see :class:`pytds.columnar.ColumnarBulkWriter`.
+
+        :param metadata: A list of :class:`Column` instances.
+        :param columns: Pairs of NumPy arrays of values and NULL masks,
+                        one pair per column.
+        """
+        logger.info("Sending INSERT BULK")
+        with self.querying_context(tds_base.PacketType.BULK):
+            serializers = self._write_bulk_metadata(metadata)
+            names = [col.column_name for col in metadata]
+            ColumnarBulkWriter(serializers, names).write(self._writer, columns)
+            self._write_bulk_done()
+
+    def submit_bulk_encoded(
+        self,
+        metadata: list[tds_base.Column],
+        chunks: Iterable[bytes],
+    ) -> None:
+        """Sends insert bulk command with rows which are already encoded.
+
+        :param metadata: A list of :class:`Column` instances.
+        :param chunks: Chunks of ROW tokens encoded for given columns,
+                       e.g. rows of a file in native format,
+                       see :func:`pytds.export.read_native`.
+        """
+        logger.info("Sending INSERT BULK")
+        with self.querying_context(tds_base.PacketType.BULK):
+            self._write_bulk_metadata(metadata)
+            for chunk in chunks:
+                self._writer.write(chunk)
+            self._write_bulk_done()
+
+    def _write_bulk_metadata(
+        self, metadata: list[tds_base.Column]
+    ) -> list[tds_types.BaseTypeSerializer]:
+        """Writes COLMETADATA token of a bulk request
+
+        :returns: Serializers of the columns
+        """
+        w = self._writer
+        serializers = []
+        w.put_byte(tds_base.TDS7_RESULT_TOKEN)
+        w.put_usmallint(len(metadata))
+        for col in metadata:
             if tds_base.IS_TDS72_PLUS(self):
-                w.put_int8(0)
+                w.put_uint(col.column_usertype)
             else:
-                w.put_int(0)
+                w.put_usmallint(col.column_usertype)
+            w.put_usmallint(col.flags)
+            serializer = col.choose_serializer(
+                type_factory=self._tds.type_factory,
+                collation=self._tds.collation,
+            )
+            type_id = serializer.type
+            w.put_byte(type_id)
+            serializers.append(serializer)
+            serializer.write_info(w)
+            w.put_byte(len(col.column_name))
+            w.write_ucs2(col.column_name)
+        return serializers
+
+    def _write_bulk_done(self) -> None:
+        w = self._writer
+        # https://msdn.microsoft.com/en-us/library/dd340421.aspx
+        w.put_byte(tds_base.TDS_DONE_TOKEN)
+        w.put_usmallint(tds_base.TDS_DONE_FINAL)
+        w.put_usmallint(0)  # curcmd
+        # row count
+        if tds_base.IS_TDS72_PLUS(self):
+            w.put_int8(0)
+        else:
+            w.put_int(0)
 
     def put_cancel(self) -> None:
         """Sends a cancel request to the server.
@@ -1221,6 +1912,7 @@ class _TdsSession:
         If timeout happens during reading of first packet will
         send cancellation message.
         """
+        self._row_buffer.clear()
         try:
             return self._reader.begin_response()
         except tds_base.TimeoutError:
@@ -1616,6 +2308,7 @@ class _TdsSession:
                 self.process_token(marker)
 
     def next_set(self) -> bool | None:
+        self._row_buffer.clear()
         while self.more_rows:
             self.next_row()
         if self.state == tds_base.TDS_IDLE:
@@ -1625,6 +2318,8 @@ class _TdsSession:
         return None
 
     def fetchone(self) -> Any | None:
+        if self._row_buffer:
+            return self._row_buffer.popleft()
         row = self._fetchone()
         if row is None:
             return None
@@ -1632,6 +2327,13 @@ class _TdsSession:
             return self._row_convertor(row)
 
     def _fetchone(self) -> list[Any] | None:
+        self._check_can_fetch()
+        if not self.next_row():
+            return None
+
+        return self.row
+
+    def _check_can_fetch(self) -> None:
         if self.res_info is None:
             raise tds_base.ProgrammingError(
                 "Previous statement didn't produce any results"
@@ -1642,10 +2344,148 @@ class _TdsSession:
                 "Unable to fetch any rows after accessing return_status"
             )
 
-        if not self.next_row():
-            return None
+    def fetch_rows(self, size: int | None = None) -> list[Any]:
+        """Fetches up to `size` converted rows of current result set
 
-        return self.row
+        All remaining rows are fetched if `size` is None.
+        Rows are read in a single loop over ROW/NBCROW tokens without going
+        through per token state transitions and dispatch, other tokens
+        are processed as usual.
+        """
+        self._check_can_fetch()
+        rows: list[Any] = []
+        buffered = self._row_buffer
+        while buffered and (size is None or len(rows) < size):
+            rows.append(buffered.popleft())
+        if not self.more_rows or (size is not None and len(rows) >= size):
+            return rows
+        self.set_state(tds_base.TDS_READING)
+        r = self._reader
+        get_byte = r.get_byte
+        read_row, convert, row, info = self._row_reading_state()
+        while size is None or len(rows) < size:
+            try:
+                marker = get_byte()
+            except tds_base.TimeoutError:
+                self.set_state(tds_base.TDS_PENDING)
+                raise
+            except:
+                self._tds.close()
+                raise
+            if marker == tds_base.TDS_ROW_TOKEN:
+                info.row_count += 1
+                read_row(r, row)
+            elif marker == tds_base.TDS_NBC_ROW_TOKEN:
+                self.process_nbcrow()
+            elif marker in (
+                tds_base.TDS_DONE_TOKEN,
+                tds_base.TDS_DONEPROC_TOKEN,
+                tds_base.TDS_DONEINPROC_TOKEN,
+            ):
+                self.process_end(marker)
+                break
+            else:
+                self.process_token(marker)
+                # token could have started new result set
+                read_row, convert, row, info = self._row_reading_state()
+                continue
+            rows.append(convert(row))
+        return rows
+
+    def _row_reading_state(
+        self,
+    ) -> tuple[Callable[[_TdsReader, list], None], RowGenerator, list[Any], _Results]:
+        """Returns row reader, row convertor, row buffer and results
+        of the current result set"""
+        assert self._row_decoder is not None
+        assert self.row is not None
+        assert self.res_info is not None
+        return self._row_decoder.read_row, self._row_convertor, self.row, self.res_info
+
+    def fetch_next(self, batch_size: int) -> Any | None:
+        """Returns next converted row of current result set or None
+
+        Up to `batch_size` rows are read ahead with :func:`fetch_rows`
+        and kept in internal buffer.
+        Rows are read one by one when result set has columns streamed
+        into user provided streams, since those are shared between rows.
+        """
+        if not self._row_buffer:
+            if self._has_streamed_columns():
+                batch_size = 1
+            rows = self.fetch_rows(batch_size)
+            if not rows:
+                return None
+            self._row_buffer.extend(rows)
+        return self._row_buffer.popleft()
+
+    def _has_streamed_columns(self) -> bool:
+        if self.res_info is None:
+            return False
+        return any(
+            isinstance(
+                getattr(col.serializer, "_chunk_handler", None),
+                tds_types._StreamChunkedHandler,
+            )
+            for col in self.res_info.columns
+        )
+
+    def _check_no_buffered_rows(self) -> None:
+        if self._row_buffer:
+            raise tds_base.ProgrammingError(
+                "Rows were already read ahead by iterating the cursor, "
+                "fetch them with fetchone or fetchmany before fetching columns"
+            )
+
+    def fetch_columns(self, size: int | None = None) -> list[Any]:
+        """Fetches up to `size` rows of current result set as columns
+
+        Requires NumPy, see :class:`pytds.columnar.ColumnarReader`.
+        """
+        self._check_can_fetch()
+        self._check_no_buffered_rows()
+        return ColumnarReader(self).read(size)
+
+    def fetch_arrow_batches(self, batch_rows: int) -> typing.Iterator[Any]:
+        """Fetches remaining rows of current result set as Arrow record batches
+
+        Requires NumPy and PyArrow, see :class:`pytds.columnar.ArrowBatchReader`.
+        """
+        self._check_can_fetch()
+        self._check_no_buffered_rows()
+        return ArrowBatchReader(self).batches(batch_rows)
+
+    def fetch_spooled(self, max_memory: int) -> SpooledRows:
+        """Reads remaining rows of current result set into a spool
+
+        See :class:`pytds.spool.SpooledRows`.
+        """
+        self._check_can_fetch()
+        self._check_no_buffered_rows()
+        return spool_result_set(self, max_memory)
+
+    def export_result_set(
+        self,
+        file: typing.IO,
+        format: str,
+        sep: str,
+        null_string: str,
+        header: bool,
+    ) -> int:
+        """Writes remaining rows of current result set into a file
+
+        See :func:`pytds.export.export_result_set`.
+        """
+        self._check_can_fetch()
+        self._check_no_buffered_rows()
+        return export_result_set(
+            self,
+            file,
+            format=format,
+            sep=sep,
+            null_string=null_string,
+            header=header,
+        )
 
     def next_row(self) -> bool:
         if not self.more_rows:
@@ -1713,6 +2553,7 @@ class _TdsSession:
 
     def find_return_status(self) -> None:
         self.skipped_to_status = True
+        self._row_buffer.clear()
         while True:
             marker = self.get_token_id()
             self.process_token(marker)
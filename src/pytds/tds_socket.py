@@ -6,6 +6,7 @@ from __future__ import annotations
 
 import logging
 import datetime
+from typing import Any, Iterator
 
 from . import tds_base
 from . import tds_types
@@ -13,6 +14,7 @@ from . import tls
 from .tds_base import PreLoginEnc, _TdsEnv, _TdsLogin, Route
 from .row_strategies import list_row_strategy
 from .smp import SmpManager
+from .utils import LruCache
 
 # _token_map is needed by sqlalchemy_pytds connector
 from .tds_session import (
@@ -21,6 +23,9 @@ from .tds_session import (
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of queries with rewritten placeholders cached by a connection
+_STATEMENT_CACHE_SIZE = 256
+
 
 class _TdsSocket:
     """
@@ -61,12 +66,16 @@ class _TdsSocket:
             # initially we use fixed bufsize
             # it may be updated later if server specifies different block size
             bufsize=4096,
+            # MARS sessions are not using read-ahead since SMP transport
+            # already buffers data received for each session
+            readahead_size=0 if login.use_mars else login.readahead_size,
         )
         self._login = login
         self.route: Route | None = None
         self._row_strategy = row_strategy
         self.env.autocommit = autocommit
         self.query_timeout = login.query_timeout
+        self.bulk_executemany_min_rows = login.bulk_executemany_min_rows
         self.type_inferrer = tds_types.TdsTypeInferrer(
             type_factory=self.type_factory,
             collation=self.collation,
@@ -77,6 +86,17 @@ class _TdsSocket:
         self.product_name = ""
         self.product_version = 0
         self.fedauth_required = False
+        # Handles of prepared statements keyed by query text and parameters
+        # declaration, handles are shared by all MARS sessions of the connection
+        self.prepared_cache: LruCache[tuple[str, str], int] | None = None
+        if login.prepared_cache_size:
+            self.prepared_cache = LruCache(login.prepared_cache_size)
+        # Handles evicted from the cache which are not yet unprepared on the server
+        self.unprepare_queue: list[int] = []
+        # Queries with rewritten parameter placeholders, see _TdsSession.execute
+        self.statement_cache: LruCache[tuple[Any, ...], Any] = LruCache(
+            _STATEMENT_CACHE_SIZE
+        )
 
     def __repr__(self) -> str:
         fmt = "<_TdsSocket tran={} mars={} tds_version={} use_tz={}>"
@@ -85,18 +105,32 @@ class _TdsSocket:
         )
 
     def login(self) -> Route | None:
+        for _ in self.login_steps():
+            pass
+        return self.route
+
+    def login_steps(self) -> Iterator[None]:
+        """Performs login, yields every time a request is sent and its response
+        should be received before login can continue.
+
+        This allows to perform login over transport which receives
+        responses asynchronously, see :mod:`pytds.aio`.
+        Blocking transports receive data on demand, so for them yields can be ignored.
+        """
         self._login.server_enc_flag = PreLoginEnc.ENCRYPT_NOT_SUP
         if tds_base.IS_TDS71_PLUS(self._main_session):
             self._main_session.send_prelogin(self._login)
+            yield
             self._main_session.process_prelogin(self._login)
         self._main_session.tds7_send_login(self._login)
         if self._login.server_enc_flag == PreLoginEnc.ENCRYPT_OFF:
             tls.revert_to_clear(self._main_session)
+        yield
         self._main_session.begin_response()
         if not self._main_session.process_login_tokens():
             self._main_session.raise_db_exception()
         if self.route is not None:
-            return self.route
+            return
 
         # update block size if server returned different one
         if (
@@ -130,8 +164,8 @@ class _TdsSocket:
             q.append("use " + tds_base.tds_quote_id(self._login.database))
         if q:
             self._main_session.submit_plain_query("".join(q))
+            yield
             self._main_session.process_simple_request()
-        return None
 
     @property
     def mars_enabled(self) -> bool:
@@ -158,8 +192,18 @@ class _TdsSocket:
     def is_connected(self) -> bool:
         return self._is_connected
 
+    def clear_prepared_cache(self) -> None:
+        """Forgets all prepared statement handles without unpreparing them
+
+        Should be called when server releases prepared statements.
+        """
+        if self.prepared_cache is not None:
+            self.prepared_cache.clear()
+        self.unprepare_queue.clear()
+
     def close(self) -> None:
         self._is_connected = False
+        self.clear_prepared_cache()
         if self.sock is not None:
             self.sock.close()
         if self._smp_manager:
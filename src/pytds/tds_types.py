@@ -9,9 +9,8 @@ import decimal
 import struct
 import re
 import uuid
-import functools
 from io import StringIO, BytesIO
-from typing import Callable
+from typing import Any, Callable
 
 from pytds.tds_base import read_chunks
 from . import tds_base
@@ -34,14 +33,16 @@ def _applytz(dt, tzinfo):
     return dt
 
 
+# context for decimal arithmetic, precision matches maximum precision of DECIMAL
+_decimal_context = decimal.Context(prec=38)
+
+
 def _decode_num(buf):
     """Decodes little-endian integer from buffer
 
     Buffer can be of any size
     """
-    return functools.reduce(
-        lambda acc, val: acc * 256 + tds_base.my_ord(val), reversed(buf), 0
-    )
+    return int.from_bytes(buf, "little")
 
 
 class PlpReader(object):
@@ -100,6 +101,53 @@ class PlpReader(object):
                 yield buf
                 left -= len(buf)
 
+    def read_all(self) -> bytearray:
+        """Reads whole value into single buffer
+
+        When total size is known upfront buffer is preallocated and chunks
+        are read straight into it, otherwise chunks are appended to the buffer.
+        Should not be called for NULL values.
+        """
+        if self.is_unknown_len():
+            buf = bytearray()
+            for chunk in self.chunks():
+                buf += chunk
+            return buf
+        buf = bytearray(self._size)
+        view = memoryview(buf)
+        total = 0
+        while True:
+            chunk_len = self._rdr.get_uint()
+            if chunk_len == 0:
+                break
+            if total + chunk_len > self._size:
+                break
+            self._rdr.readinto(view[total : total + chunk_len])
+            total += chunk_len
+        if chunk_len != 0 or total != self._size:
+            msg = "PLP actual length (%d) doesn't match reported length (%d)" % (
+                total + chunk_len,
+                self._size,
+            )
+            self._rdr.session.bad_stream(msg)
+        return buf
+
+
+def _is_default_handler(chunk_handler) -> bool:
+    """Returns True if values are not consumed by user provided chunk handler"""
+    return chunk_handler is None or type(chunk_handler) is _DefaultChunkedHandler
+
+
+def _make_binary(r, buf: bytearray) -> bytes | memoryview:
+    """Converts buffer into value returned for binary columns
+
+    Depending on binary_as_memoryview login option buffer is either wrapped
+    into read-only memoryview without copying, or copied into bytes.
+    """
+    if r._session._tds._login.binary_as_memoryview:
+        return memoryview(buf).toreadonly()
+    return bytes(buf)
+
 
 class _StreamChunkedHandler(object):
     def __init__(self, stream):
@@ -136,6 +184,10 @@ class SqlTypeMetaclass(tds_base.CommonEqualityMixin):
     def __repr__(self):
         return "<sqltype:{}>".format(self.get_declaration())
 
+    def __hash__(self):
+        # equal types have equal declarations
+        return hash((self.__class__, self.get_declaration()))
+
     def get_declaration(self):
         raise NotImplementedError()
 
@@ -390,8 +442,12 @@ class BasePrimitiveTypeSerializer(BaseTypeSerializer):
     - type - class variable storing type identifier
     - declaration - class variable storing name of sql type
     - isntance - class variable storing instance of class
+    - fixed_format - class variable storing :mod:`struct` format of the value,
+      only set for plain numeric types which can be decoded by :mod:`struct` directly
     """
 
+    fixed_format = ""
+
     def write(self, w, value):
         raise NotImplementedError
 
@@ -511,6 +567,7 @@ class FloatType(SqlTypeMetaclass):
 class BitSerializer(BasePrimitiveTypeSerializer):
     type = tds_base.SYBBIT
     declaration = "BIT"
+    fixed_format = "?"
 
     def write(self, w, value):
         w.put_byte(1 if value else 0)
@@ -540,6 +597,7 @@ class BitNSerializer(BaseTypeSerializerN):
 class TinyIntSerializer(BasePrimitiveTypeSerializer):
     type = tds_base.SYBINT1
     declaration = "TINYINT"
+    fixed_format = "B"
 
     def write(self, w, val):
         w.put_byte(val)
@@ -554,6 +612,7 @@ TinyIntSerializer.instance = tiny_int_serializer = TinyIntSerializer()
 class SmallIntSerializer(BasePrimitiveTypeSerializer):
     type = tds_base.SYBINT2
     declaration = "SMALLINT"
+    fixed_format = "h"
 
     def write(self, w, val):
         w.put_smallint(val)
@@ -568,6 +627,7 @@ SmallIntSerializer.instance = small_int_serializer = SmallIntSerializer()
 class IntSerializer(BasePrimitiveTypeSerializer):
     type = tds_base.SYBINT4
     declaration = "INT"
+    fixed_format = "l"
 
     def write(self, w, val):
         w.put_int(val)
@@ -582,6 +642,7 @@ IntSerializer.instance = int_serializer = IntSerializer()
 class BigIntSerializer(BasePrimitiveTypeSerializer):
     type = tds_base.SYBINT8
     declaration = "BIGINT"
+    fixed_format = "q"
 
     def write(self, w, val):
         w.put_int8(val)
@@ -628,6 +689,7 @@ class IntNSerializer(BaseTypeSerializerN):
 class RealSerializer(BasePrimitiveTypeSerializer):
     type = tds_base.SYBREAL
     declaration = "REAL"
+    fixed_format = "f"
 
     def write(self, w, val):
         w.pack(_flt4_struct, val)
@@ -642,6 +704,7 @@ RealSerializer.instance = real_serializer = RealSerializer()
 class FloatSerializer(BasePrimitiveTypeSerializer):
     type = tds_base.SYBFLT8
     declaration = "FLOAT"
+    fixed_format = "d"
 
     def write(self, w, val):
         w.pack(_flt8_struct, val)
@@ -679,6 +742,46 @@ class VarChar(SqlValueMetaclass):
         return self._val
 
 
+DEFAULT_DECODE_CACHE_SIZE = 1024
+
+
+class DecodeCache:
+    """Bounded cache of decoded strings of a single column
+
+    Identical encoded values are decoded once and share single
+    :class:`str` object.  Cache is cleared when it becomes full.
+    """
+
+    def __init__(self, codec, max_size: int = DEFAULT_DECODE_CACHE_SIZE):
+        self._codec = codec
+        self._max_size = max_size
+        self._cache: dict[bytes, str] = {}
+
+    def read(self, r, size: int) -> str:
+        """Reads encoded string of given size from the stream and decodes it"""
+        # values are short, so copying them into hashable keys is cheap
+        # compared to decoding them
+        key = r.read_bytes(size)
+        cache = self._cache
+        value = cache.get(key)
+        if value is None:
+            if len(cache) >= self._max_size:
+                cache.clear()
+            value = self._codec.decode(key)[0]
+            cache[key] = value
+        return value
+
+
+def supports_decode_cache(serializer: BaseTypeSerializer) -> bool:
+    """Returns True if serializer can use :class:`DecodeCache`
+
+    Supported are VARCHAR/NVARCHAR/CHAR/NCHAR types which are not MAX types.
+    """
+    return isinstance(
+        serializer, (VarChar70Serializer, NVarChar70Serializer)
+    ) and not isinstance(serializer, (VarCharMaxSerializer, NVarCharMaxSerializer))
+
+
 class VarChar70Serializer(BaseTypeSerializer):
     type = tds_base.XSYBVARCHAR
 
@@ -689,6 +792,11 @@ class VarChar70Serializer(BaseTypeSerializer):
             self._codec = codec
         else:
             self._codec = collation.get_codec()
+        self._decode_cache: DecodeCache | None = None
+
+    def set_decode_cache(self, max_size: int | None = DEFAULT_DECODE_CACHE_SIZE):
+        """Enables cache of decoded values, or disables it if max_size is None"""
+        self._decode_cache = None if max_size is None else DecodeCache(self._codec, max_size)
 
     @classmethod
     def from_stream(cls, r):
@@ -714,9 +822,11 @@ class VarChar70Serializer(BaseTypeSerializer):
         if size < 0:
             return None
         if r._session._tds._login.bytes_to_unicode:
+            if self._decode_cache is not None:
+                return self._decode_cache.read(r, size)
             return r.read_str(size, self._codec)
         else:
-            return tds_base.readall(r, size)
+            return r.read_bytes(size)
 
 
 class VarChar71Serializer(VarChar70Serializer):
@@ -781,6 +891,11 @@ class VarCharMaxSerializer(VarChar72Serializer):
         r = PlpReader(r)
         if r.is_null():
             return None
+        if _is_default_handler(self._chunk_handler):
+            buf = r.read_all()
+            if login.bytes_to_unicode:
+                return self._codec.decode(buf)[0]
+            return bytes(buf)
         if self._chunk_handler is None:
             if login.bytes_to_unicode:
                 self._chunk_handler = _DefaultChunkedHandler(StringIO())
@@ -804,6 +919,11 @@ class NVarChar70Serializer(BaseTypeSerializer):
     def __init__(self, size, collation=raw_collation):
         super(NVarChar70Serializer, self).__init__(size=size)
         self._collation = collation
+        self._decode_cache: DecodeCache | None = None
+
+    def set_decode_cache(self, max_size: int | None = DEFAULT_DECODE_CACHE_SIZE):
+        """Enables cache of decoded values, or disables it if max_size is None"""
+        self._decode_cache = None if max_size is None else DecodeCache(ucs2_codec, max_size)
 
     @classmethod
     def from_stream(cls, r):
@@ -828,6 +948,8 @@ class NVarChar70Serializer(BaseTypeSerializer):
         size = r.get_usmallint()
         if size == 0xFFFF:
             return None
+        if self._decode_cache is not None:
+            return self._decode_cache.read(r, size)
         return r.read_str(size, ucs2_codec)
 
 
@@ -897,6 +1019,8 @@ class NVarCharMaxSerializer(NVarChar72Serializer):
         r = PlpReader(r)
         if r.is_null():
             return None
+        if _is_default_handler(self._chunk_handler):
+            return ucs2_codec.decode(r.read_all())[0]
         for chunk in tds_base.iterdecode(r.chunks(), ucs2_codec):
             self._chunk_handler.add_chunk(chunk)
         return self._chunk_handler.end()
@@ -1157,7 +1281,11 @@ class VarBinarySerializer(BaseTypeSerializer):
         size = r.get_usmallint()
         if size == 0xFFFF:
             return None
-        return tds_base.readall(r, size)
+        if r._session._tds._login.binary_as_memoryview:
+            buf = bytearray(size)
+            r.readinto(buf)
+            return memoryview(buf).toreadonly()
+        return r.read_bytes(size)
 
 
 class VarBinarySerializer72(VarBinarySerializer):
@@ -1200,9 +1328,12 @@ class VarBinarySerializerMax(VarBinarySerializer):
             w.put_uint(0)
 
     def read(self, r):
+        rdr = r
         r = PlpReader(r)
         if r.is_null():
             return None
+        if _is_default_handler(self._chunk_handler):
+            return _make_binary(rdr, r.read_all())
         for chunk in r.chunks():
             self._chunk_handler.add_chunk(chunk)
         return self._chunk_handler.end()
@@ -1265,7 +1396,7 @@ class UDT72Serializer(BaseTypeSerializer):
         r = PlpReader(r)
         if r.is_null():
             return None
-        return b"".join(r.chunks())
+        return bytes(r.read_all())
 
 
 class UDT72SerializerMax(UDT72Serializer):
@@ -1297,6 +1428,10 @@ class Image70Serializer(BaseTypeSerializer):
             tds_base.readall(r, 16)  # textptr
             tds_base.readall(r, 8)  # timestamp
             colsize = r.get_int()
+            if _is_default_handler(self._chunk_handler):
+                buf = bytearray(colsize)
+                r.readinto(buf)
+                return _make_binary(r, buf)
             for chunk in read_chunks(r, colsize):
                 self._chunk_handler.add_chunk(chunk)
             return self._chunk_handler.end()
@@ -1977,6 +2112,7 @@ class MsDecimalSerializer(BaseTypeSerializer):
     ]
 
     _info_struct = struct.Struct("BBB")
+    _header_struct = struct.Struct("BB")
 
     def __init__(self, precision=18, scale=0):
         super(MsDecimalSerializer, self).__init__(
@@ -2002,43 +2138,36 @@ class MsDecimalSerializer(BaseTypeSerializer):
         w.pack(self._info_struct, self.size, self.precision, self.scale)
 
     def write(self, w, value):
-        with decimal.localcontext() as context:
-            context.prec = 38
-            if value is None:
-                w.put_byte(0)
-                return
+        if value is None:
+            w.put_byte(0)
+            return
+        if isinstance(value, int):
+            units = abs(value) * 10**self.scale
+        else:
             if not isinstance(value, decimal.Decimal):
                 value = decimal.Decimal(value)
-            value = value.normalize()
-            scale = self.scale
-            size = self.size
-            w.put_byte(size)
-            val = value
-            positive = 1 if val > 0 else 0
-            w.put_byte(positive)  # sign
-            if not positive:
-                val *= -1
-            size -= 1
-            val *= 10**scale
-            for i in range(size):
-                w.put_byte(int(val % 256))
-                val //= 256
-            assert val == 0
-
-    def _decode(self, positive, buf):
-        val = _decode_num(buf)
-        val = decimal.Decimal(val)
-        with decimal.localcontext() as ctx:
-            ctx.prec = 38
-            if not positive:
-                val *= -1
-            val /= 10**self._scale
-        return val
+            # digits beyond the scale are truncated
+            units = int(value.copy_abs().scaleb(self.scale, _decimal_context))
+        size = self.size
+        try:
+            buf = units.to_bytes(size - 1, "little")
+        except OverflowError:
+            raise tds_base.DataError("Decimal value is out of range of the column")
+        w.pack(self._header_struct, size, 1 if value > 0 else 0)
+        w.write(buf)
+
+    def _decode(self, positive, buf, as_int=False):
+        val = int.from_bytes(buf, "little")
+        if not positive:
+            val = -val
+        if as_int:
+            return val
+        return decimal.Decimal(val).scaleb(-self._scale, _decimal_context)
 
     def read_fixed(self, r, size):
         positive = r.get_byte()
         buf = tds_base.readall(r, size - 1)
-        return self._decode(positive, buf)
+        return self._decode(positive, buf, r._session._tds._login.decimals_as_int)
 
     def read(self, r):
         size = r.get_byte()
@@ -2047,16 +2176,39 @@ class MsDecimalSerializer(BaseTypeSerializer):
         return self.read_fixed(r, size)
 
 
+def _money_units(value, bits):
+    """Converts money value into integer number of ten-thousandths
+
+    :param bits: Size of the encoded value in bits
+    """
+    if isinstance(value, int):
+        units = value * 10000
+    elif isinstance(value, decimal.Decimal):
+        units = int(value.scaleb(4, _decimal_context))
+    else:
+        units = int(value * 10000)
+    limit = 1 << (bits - 1)
+    if not -limit <= units < limit:
+        raise tds_base.DataError("Money value is out of range")
+    return units
+
+
+def _money_value(r, units):
+    """Converts integer number of ten-thousandths into value returned to the caller"""
+    if r._session._tds._login.decimals_as_int:
+        return units
+    return decimal.Decimal(units).scaleb(-4, _decimal_context)
+
+
 class Money4Serializer(BasePrimitiveTypeSerializer):
     type = tds_base.SYBMONEY4
     declaration = "SMALLMONEY"
 
     def read(self, r):
-        return decimal.Decimal(r.get_int()) / 10000
+        return _money_value(r, r.get_int())
 
     def write(self, w, val):
-        val = int(val * 10000)
-        w.put_int(val)
+        w.put_int(_money_units(val, 32))
 
 
 Money4Serializer.instance = money4_serializer = Money4Serializer()
@@ -2070,14 +2222,11 @@ class Money8Serializer(BasePrimitiveTypeSerializer):
 
     def read(self, r):
         hi, lo = r.unpack(self._struct)
-        val = hi * (2**32) + lo
-        return decimal.Decimal(val) / 10000
+        return _money_value(r, (hi << 32) | lo)
 
     def write(self, w, val):
-        val *= 10000
-        hi = int(val // (2**32))
-        lo = int(val % (2**32))
-        w.pack(self._struct, hi, lo)
+        units = _money_units(val, 64)
+        w.pack(self._struct, units >> 32, units & 0xFFFFFFFF)
 
 
 Money8Serializer.instance = money8_serializer = Money8Serializer()
@@ -2512,6 +2661,12 @@ def sql_type_by_declaration(declaration):
     return _declarations_parser.parse(declaration)
 
 
+# Maximum number of serializers cached by SerializerFactory,
+# and of declarations cached by DeclarationsParser
+_MAX_CACHED_SERIALIZERS = 1024
+_MAX_CACHED_DECLARATIONS = 1024
+
+
 class SerializerFactory(object):
     """
     Factory class for TDS data types
@@ -2519,6 +2674,7 @@ class SerializerFactory(object):
 
     def __init__(self, tds_ver):
         self._tds_ver = tds_ver
+        self._serializers: dict[tuple[SqlTypeMetaclass, Any], BaseTypeSerializer] = {}
         if self._tds_ver >= tds_base.TDS73:
             self._type_map = _type_map73
         elif self._tds_ver >= tds_base.TDS72:
@@ -2588,6 +2744,23 @@ class SerializerFactory(object):
         )
 
     def serializer_by_type(self, sql_type, collation=raw_collation):
+        """Returns serializer for given SQL type
+
+        Serializers are cached, so returned serializer can be shared and
+        should only be used for writing values.
+        """
+        if isinstance(sql_type, TableType):
+            return self._create_serializer(sql_type, collation)
+        key = (sql_type, collation)
+        serializer = self._serializers.get(key)
+        if serializer is None:
+            if len(self._serializers) >= _MAX_CACHED_SERIALIZERS:
+                self._serializers.clear()
+            serializer = self._create_serializer(sql_type, collation)
+            self._serializers[key] = serializer
+        return serializer
+
+    def _create_serializer(self, sql_type, collation):
         typ = sql_type
         if isinstance(typ, BitType):
             return BitNSerializer(typ)
@@ -2754,6 +2927,7 @@ class DeclarationsParser(object):
             (re.compile(r"^" + regex + "$", re.IGNORECASE), constructor)
             for regex, constructor in declaration_parsers
         ]
+        self._cache: dict[str, SqlTypeMetaclass] = {}
 
     def parse(self, declaration):
         """
@@ -2761,14 +2935,23 @@ class DeclarationsParser(object):
         e.g. VarCharType(10)
 
         @param declaration: Sql declaration to parse, e.g. varchar(10)
-        @return: instance of SqlTypeMetaclass
+        @return: instance of SqlTypeMetaclass, same instance is returned for same declaration
         """
-        declaration = declaration.strip()
+        sql_type = self._cache.get(declaration)
+        if sql_type is not None:
+            return sql_type
+        stripped = declaration.strip()
         for regex, constructor in self._compiled:
-            m = regex.match(declaration)
+            m = regex.match(stripped)
             if m:
-                return constructor(*m.groups())
-        raise ValueError("Unable to parse type declaration", declaration)
+                sql_type = constructor(*m.groups())
+                break
+        else:
+            raise ValueError("Unable to parse type declaration", stripped)
+        if len(self._cache) >= _MAX_CACHED_DECLARATIONS:
+            self._cache.clear()
+        self._cache[declaration] = sql_type
+        return sql_type
 
 
 _declarations_parser = DeclarationsParser()
@@ -2790,6 +2973,11 @@ class TdsTypeInferrer(object):
         self._collation = collation
         self._bytes_to_unicode = bytes_to_unicode
         self._allow_tz = allow_tz
+        # Inferred types keyed by class of value, or for classes whose type
+        # depends on the value, by class and range of the value.
+        # Returned types are shared, they should not be modified.
+        self._value_types: dict[Any, Any] = {}
+        self._class_types: dict[type, Any] = {}
 
     def from_value(self, value):
         """Function infers TDS type from Python value.
@@ -2798,9 +2986,32 @@ class TdsTypeInferrer(object):
         :return: An instance of subclass of :class:`BaseType`
         """
         if value is None:
-            sql_type = NVarCharType(size=1)
+            key: Any = None
         else:
-            sql_type = self._from_class_value(value, type(value))
+            cls = type(value)
+            if cls is int:
+                if -(2**31) <= value <= 2**31 - 1:
+                    key = (int, 32)
+                elif -(2**63) <= value <= 2**63 - 1:
+                    key = (int, 64)
+                else:
+                    return self._from_class_value(value, cls)
+            elif issubclass(cls, datetime.datetime):
+                key = (cls, value.tzinfo is not None)
+            elif issubclass(
+                cls, (decimal.Decimal, Binary, TableValuedParam)
+            ) or (issubclass(cls, int) and not issubclass(cls, bool)):
+                # type depends on the value
+                return self._from_class_value(value, cls)
+            else:
+                key = cls
+        sql_type = self._value_types.get(key)
+        if sql_type is None:
+            if value is None:
+                sql_type = NVarCharType(size=1)
+            else:
+                sql_type = self._from_class_value(value, type(value))
+            self._value_types[key] = sql_type
         return sql_type
 
     def from_class(self, cls):
@@ -2809,7 +3020,11 @@ class TdsTypeInferrer(object):
         :param cls: Class from which to infer type
         :return: An instance of subclass of :class:`BaseType`
         """
-        return self._from_class_value(None, cls)
+        sql_type = self._class_types.get(cls)
+        if sql_type is None:
+            sql_type = self._from_class_value(None, cls)
+            self._class_types[cls] = sql_type
+        return sql_type
 
     def _from_class_value(self, value, value_type):
         type_factory = self._type_factory
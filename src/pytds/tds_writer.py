@@ -18,6 +18,10 @@ from pytds.tds_base import (
     _header,
 )
 
+# Maximum number of packets which are accumulated before they are sent
+# with single sendmsg call
+_MAX_PENDING_PACKETS = 16
+
 
 class _TdsWriter:
     """TDS stream writer
@@ -35,6 +39,17 @@ class _TdsWriter:
         self._buf = bytearray(bufsize)
         self._packet_no = 0
         self._type = 0
+        # When transport supports sendmsg, assembled packets are not sent
+        # right away but accumulated as a list of buffers, which are later
+        # sent with a single call.
+        self._pending: list[bytes | bytearray | memoryview] = []
+        self._pending_packets = 0
+        # Buffers which are referenced by pending packets and
+        # buffers which are free to be used for next packets
+        self._busy_bufs: list[bytearray] = []
+        self._spare_bufs: list[bytearray] = []
+        #: Total size of packets written so far, including headers
+        self.bytes_written = 0
 
     @property
     def session(self):
@@ -50,6 +65,9 @@ class _TdsWriter:
         if len(self._buf) == bufsize:
             return
 
+        self._send_pending()
+        self._spare_bufs.clear()
+
         if bufsize > len(self._buf):
             self._buf.extend(b"\0" * (bufsize - len(self._buf)))
         else:
@@ -62,10 +80,21 @@ class _TdsWriter:
         """
         self._type = packet_type
         self._pos = 8
+        # packets queued by previous message which was aborted are dropped
+        self._pending = []
+        self._pending_packets = 0
+        self._spare_bufs.extend(self._busy_bufs)
+        self._busy_bufs.clear()
 
     def pack(self, struc: struct.Struct, *args) -> None:
         """Packs and writes structure into stream"""
-        self.write(struc.pack(*args))
+        pos = self._pos
+        end = pos + struc.size
+        if end <= len(self._buf):
+            struc.pack_into(self._buf, pos, *args)
+            self._pos = end
+        else:
+            self.write(struc.pack(*args))
 
     def put_byte(self, value: int) -> None:
         """Writes single byte into stream"""
@@ -110,20 +139,43 @@ class _TdsWriter:
     def write(self, data: bytes) -> None:
         """Writes given bytes buffer into the stream
 
-        Function returns only when entire buffer is written
+        Function returns only when entire buffer is written.
+        If transport supports sendmsg, parts of immutable bytes buffer
+        which fill whole packets are sent by reference without copying.
         """
+        pos = self._pos
+        end = pos + len(data)
+        if end <= len(self._buf):
+            # fast path, data fits into current packet
+            self._buf[pos:end] = data
+            self._pos = end
+            return
+        view = memoryview(data).cast("B")
+        data_len = len(view)
         data_off = 0
-        while data_off < len(data):
+        by_reference = isinstance(data, bytes) and self._can_gather()
+        while data_off < data_len:
             left = len(self._buf) - self._pos
             if left <= 0:
                 self._write_packet(final=False)
-            else:
-                to_write = min(left, len(data) - data_off)
-                self._buf[self._pos : self._pos + to_write] = data[
-                    data_off : data_off + to_write
-                ]
-                self._pos += to_write
-                data_off += to_write
+                continue
+            to_write = data_len - data_off
+            if by_reference and self._pos == 8 and to_write > left:
+                # payload fills the whole packet, and since there is more
+                # data after it, packet is known to be not final
+                self._queue_packet(
+                    self._make_header(len(self._buf), final=False),
+                    view[data_off : data_off + left],
+                )
+                self.bytes_written += len(self._buf)
+                data_off += left
+                continue
+            to_write = min(left, to_write)
+            self._buf[self._pos : self._pos + to_write] = view[
+                data_off : data_off + to_write
+            ]
+            self._pos += to_write
+            data_off += to_write
 
     def write_b_varchar(self, s: str) -> None:
         self.put_byte(len(s))
@@ -157,5 +209,51 @@ class _TdsWriter:
             self._buf, 0, self._type, status, self._pos, 0, self._packet_no
         )
         self._packet_no = (self._packet_no + 1) % 256
-        self._transport.sendall(self._buf[: self._pos])
+        self.bytes_written += self._pos
+        if self._can_gather():
+            # buffer is referenced by pending packet, switch to another one
+            self._busy_bufs.append(self._buf)
+            self._queue_packet(memoryview(self._buf)[: self._pos])
+            if self._spare_bufs:
+                self._buf = self._spare_bufs.pop()
+            else:
+                self._buf = bytearray(len(self._buf))
+            if final:
+                self._send_pending()
+        else:
+            self._transport.sendall(self._buf[: self._pos])
         self._pos = 8
+
+    def _can_gather(self) -> bool:
+        return hasattr(self._transport, "sendmsg")
+
+    def _make_header(self, size: int, final: bool) -> bytes:
+        header = _header.pack(self._type, 1 if final else 0, size, 0, self._packet_no)
+        self._packet_no = (self._packet_no + 1) % 256
+        return header
+
+    def _queue_packet(self, *buffers: bytes | bytearray | memoryview) -> None:
+        """Adds packet consisting of given buffers to the list of pending packets"""
+        self._pending.extend(buffers)
+        self._pending_packets += 1
+        if self._pending_packets >= _MAX_PENDING_PACKETS:
+            self._send_pending()
+
+    def _send_pending(self) -> None:
+        """Sends all pending packets using sendmsg"""
+        if not self._pending:
+            return
+        buffers = self._pending
+        self._pending = []
+        self._pending_packets = 0
+        sendmsg = self._transport.sendmsg  # type: ignore # checked by _can_gather
+        while buffers:
+            sent = sendmsg(buffers)
+            # skip buffers which were fully sent, and trim partially sent one
+            while buffers and sent >= len(buffers[0]):
+                sent -= len(buffers[0])
+                buffers.pop(0)
+            if sent:
+                buffers[0] = memoryview(buffers[0])[sent:]
+        self._spare_bufs.extend(self._busy_bufs)
+        self._busy_bufs.clear()
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import logging
-from typing import Any
+from typing import Any, Callable
 import typing
 
 try:
@@ -62,27 +62,29 @@ class EncryptedSocket(tds_base.TransportProtocol):
     ) -> int:
         if size == 0:
             size = len(buffer)
-        res = self.recv(size)
-        buffer[0 : len(res)] = res
-        return len(res)
+        # decrypt directly into caller's buffer to avoid extra copy
+        return self._recv_with(lambda: self._tls_conn.recv_into(buffer, size), 0)
 
     def recv(self, bufsize: int, flags: int = 0) -> bytes:
+        return self._recv_with(lambda: self._tls_conn.recv(bufsize), b"")
+
+    def _recv_with(self, tls_recv: Callable[[], Any], eof: Any) -> Any:
         while True:
             try:
-                buf = self._tls_conn.bio_read(bufsize)
+                buf = self._tls_conn.bio_read(BUFSIZE)
             except OpenSSL.SSL.WantReadError:
                 pass
             else:
                 self._transport.sendall(buf)
 
             try:
-                return self._tls_conn.recv(bufsize)
+                return tls_recv()
             except OpenSSL.SSL.WantReadError:
                 buf = self._transport.recv(BUFSIZE)
                 if buf:
                     self._tls_conn.bio_write(buf)
                 else:
-                    return b""
+                    return eof
 
     def close(self) -> None:
         self._tls_conn.shutdown()
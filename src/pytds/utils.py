@@ -3,6 +3,7 @@ This module contains generic utility functions which don't have dependencies on
 other modules.
 """
 from __future__ import annotations
+import collections
 import logging
 import time
 import typing
@@ -10,6 +11,8 @@ from collections.abc import Callable
 
 logger = logging.getLogger("pytds")
 T = typing.TypeVar("T")
+K = typing.TypeVar("K")
+V = typing.TypeVar("V")
 
 
 def exponential_backoff(
@@ -82,3 +85,57 @@ def ver_to_int(ver: str) -> int:
         return 0
     maj, minor, _ = ver.split(".")
     return (int(maj) << 24) + (int(minor) << 16)
+
+
+class LruCache(typing.Generic[K, V]):
+    """
+    Mapping which keeps at most `max_size` most recently used items
+    """
+
+    def __init__(self, max_size: int):
+        self._max_size = max_size
+        self._items: collections.OrderedDict[K, V] = collections.OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._items
+
+    def get(self, key: K) -> V | None:
+        """
+        Returns value for the key and marks it as most recently used,
+        returns None if key is not in the cache
+        """
+        try:
+            self._items.move_to_end(key)
+        except KeyError:
+            return None
+        return self._items[key]
+
+    def put(self, key: K, value: V) -> list[V]:
+        """
+        Adds item to the cache.
+        Returns values which were removed from the cache, which are the
+        least recently used values and previous value of the same key.
+        """
+        evicted = []
+        old = self._items.pop(key, None)
+        if old is not None:
+            evicted.append(old)
+        self._items[key] = value
+        while len(self._items) > self._max_size:
+            evicted.append(self._items.popitem(last=False)[1])
+        return evicted
+
+    def pop(self, key: K) -> V | None:
+        """
+        Removes item from the cache and returns its value, or None if key is not in the cache
+        """
+        return self._items.pop(key, None)
+
+    def clear(self) -> None:
+        self._items.clear()
+
+    def values(self) -> list[V]:
+        return list(self._items.values())
@@ -0,0 +1,174 @@
+import asyncio
+import struct
+
+import pytest
+
+from pytds import aio, tds_base
+from pytds.collate import raw_collation
+from pytds.tds_base import Column, PreLoginEnc, PreLoginToken
+from pytds.tds_types import IntType, NVarCharType
+from tests.utils import encode_done, encode_reply, encode_result_set
+
+EXECUTESQL_CALL = struct.pack("<hh", -1, tds_base.TDS_SP_EXECUTESQL)
+
+
+def _prelogin_response() -> bytes:
+    # single ENCRYPTION option followed by terminator
+    return encode_reply(
+        bytes([PreLoginToken.ENCRYPTION, 0, 6, 0, 1, PreLoginToken.TERMINATOR])
+        + bytes([PreLoginEnc.ENCRYPT_NOT_SUP])
+    )
+
+
+def _login_response() -> bytes:
+    name = "test".encode("utf-16-le")
+    loginack = (
+        struct.pack("<HB", 1 + 4 + 1 + len(name) + 4, 1)
+        + struct.pack(">I", tds_base.TDS74)
+        + bytes([len(name) // 2])
+        + name
+        + bytes([1, 0, 0, 0])
+    )
+    return encode_reply(
+        bytes([tds_base.TDS_LOGINACK_TOKEN])
+        + loginack
+        + encode_done(tds_base.TDS_DONE_TOKEN, 0)
+    )
+
+
+class Server:
+    """Replies to every request message with the next canned response"""
+
+    def __init__(self, responses):
+        self.responses = [_prelogin_response(), _login_response()] + responses
+        self.requests = []
+
+    async def _handle(self, reader, writer):
+        for response in self.responses:
+            request = bytearray()
+            while True:
+                header = await reader.readexactly(8)
+                _, status, size, _, _ = tds_base._header.unpack(header)
+                request += header + await reader.readexactly(size - 8)
+                if status & 1:
+                    break
+            self.requests.append(bytes(request))
+            if response is None:
+                # never reply
+                await asyncio.sleep(10)
+            writer.write(response)
+            await writer.drain()
+        await reader.read()
+        writer.close()
+
+    async def __aenter__(self):
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def __aexit__(self, *args):
+        self._server.close()
+
+
+def _connect(server, **kwargs):
+    return aio.connect(
+        "127.0.0.1",
+        port=server.port,
+        user="sa",
+        password="pwd",
+        autocommit=True,
+        **kwargs,
+    )
+
+
+def _result_set(columns, rows) -> bytes:
+    tokens = encode_result_set(columns, rows)[8:-13]
+    return encode_reply(
+        tokens
+        + encode_done(tds_base.TDS_DONE_TOKEN, tds_base.TDS_DONE_COUNT, len(rows))
+    )
+
+
+COLUMNS = [
+    Column(name="a", type=IntType()),
+    Column(name="b", type=NVarCharType(size=10)),
+]
+
+
+def test_execute_and_fetch():
+    async def run():
+        responses = [_result_set(COLUMNS, [(1, "x"), (2, "y"), (3, "z")])]
+        async with Server(responses) as server:
+            async with await _connect(server) as conn:
+                cursor = conn.cursor()
+                result = await cursor.execute("select a, b from t where a > %s", (0,))
+                assert result is cursor
+                assert [d[0] for d in cursor.description] == ["a", "b"]
+                assert await cursor.fetchone() == (1, "x")
+                assert await cursor.fetchmany(1) == [(2, "y")]
+                assert [row async for row in cursor] == [(3, "z")]
+                assert cursor.rowcount == 3
+            assert EXECUTESQL_CALL in server.requests[2]
+
+    asyncio.run(run())
+
+
+def test_unread_results_are_skipped():
+    async def run():
+        responses = [
+            _result_set(COLUMNS, [(1, "x"), (2, "y")]),
+            encode_reply(
+                encode_done(tds_base.TDS_DONE_TOKEN, tds_base.TDS_DONE_COUNT, 5)
+            ),
+        ]
+        async with Server(responses) as server:
+            async with await _connect(server) as conn:
+                cursor = conn.cursor()
+                await cursor.execute("select a, b from t")
+                assert await cursor.fetchone() == (1, "x")
+                await cursor.execute("update t set a = 1")
+                assert cursor.rowcount == 5
+
+    asyncio.run(run())
+
+
+def test_copy_to():
+    async def run():
+        responses = [
+            encode_reply(encode_done(tds_base.TDS_DONE_TOKEN, 0)),
+            encode_reply(
+                encode_done(tds_base.TDS_DONE_TOKEN, tds_base.TDS_DONE_COUNT, 2)
+            ),
+        ]
+        async with Server(responses) as server:
+            async with await _connect(server) as conn:
+                # test server does not send collation
+                conn._tds_socket.collation = raw_collation
+                cursor = conn.cursor()
+                await cursor.copy_to(
+                    table_or_view="t", columns=COLUMNS, data=[(1, "x"), (2, "y")]
+                )
+                assert cursor.rowcount == 2
+            statement = "INSERT BULK [t]([a] INT,[b] NVARCHAR(10))"
+            assert statement.encode("utf-16-le") in server.requests[2]
+            assert server.requests[3][0] == tds_base.PacketType.BULK
+
+    asyncio.run(run())
+
+
+def test_timeout_closes_connection():
+    async def run():
+        async with Server([None]) as server:
+            conn = await _connect(server, timeout=0.1)
+            cursor = conn.cursor()
+            with pytest.raises(tds_base.TimeoutError):
+                await cursor.execute("waitfor delay '00:01'")
+            with pytest.raises(tds_base.InterfaceError):
+                await cursor.execute("select 1")
+
+    asyncio.run(run())
+
+
+def test_named_instance_is_not_supported():
+    with pytest.raises(ValueError):
+        asyncio.run(aio.connect("localhost\\sqlexpress"))
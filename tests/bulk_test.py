@@ -0,0 +1,365 @@
+import datetime
+import decimal
+import io
+import struct
+
+import pytest
+
+from pytds import tds_base, tds_types
+from pytds.bulk import (
+    InsertStatement,
+    infer_columns,
+    parallel_copy,
+    parse_insert,
+    table_columns,
+)
+from pytds.collate import raw_collation
+from pytds.connection import NonMarsConnection
+from pytds.tds_base import TDS74, Column, _TdsLogin
+from pytds.tds_socket import _TdsSocket
+from pytds.tds_types import SerializerFactory, TdsTypeInferrer
+from tests.utils import (
+    MockSock,
+    encode_done,
+    encode_error,
+    encode_reply,
+    encode_result_set,
+    make_response_session,
+)
+
+
+def test_parse_insert():
+    assert parse_insert("INSERT INTO t (a, b) VALUES (%s, %s)") == InsertStatement(
+        "t", ["a", "b"], None
+    )
+    assert parse_insert(
+        "insert [dbo].[my table] ([a]]b], \"c\") values (%(x)s,%(y)s);"
+    ) == InsertStatement("[dbo].[my table]", ["a]b", "c"], ["x", "y"])
+    assert parse_insert("insert into #tmp(a) values(%s)") == InsertStatement(
+        "#tmp", ["a"], None
+    )
+
+
+def test_parse_insert_not_supported():
+    # values which are not plain placeholders
+    assert parse_insert("insert into t (a, b) values (%s, 1)") is None
+    assert parse_insert("insert into t (a) values (lower(%s))") is None
+    # mixed placeholder styles
+    assert parse_insert("insert into t (a, b) values (%s, %(b)s)") is None
+    # number of values does not match number of columns
+    assert parse_insert("insert into t (a, b) values (%s)") is None
+    assert parse_insert("insert into t values (%s)") is None
+    assert parse_insert("insert into t (a) select %s") is None
+    assert parse_insert("update t set a = %s") is None
+
+
+def _inferrer():
+    return TdsTypeInferrer(type_factory=SerializerFactory(TDS74))
+
+
+def _declarations(columns):
+    return [col.type.get_declaration() for col in columns]
+
+
+def test_infer_columns():
+    columns = infer_columns(
+        _inferrer(),
+        ["a", "b", "c", "d"],
+        [
+            (1, decimal.Decimal("1.5"), "x", None),
+            (2**40, decimal.Decimal("123.25"), None, None),
+        ],
+    )
+    assert [col.column_name for col in columns] == ["a", "b", "c", "d"]
+    assert _declarations(columns) == [
+        "BIGINT",
+        "DECIMAL(5, 2)",
+        "NVARCHAR(MAX)",
+        "NVARCHAR(1)",
+    ]
+
+
+def test_infer_columns_mixed_types():
+    assert infer_columns(_inferrer(), ["a"], [(1,), ("1",)]) is None
+
+
+def test_table_columns():
+    types = [
+        tds_types.IntType(),
+        tds_types.BigIntType(),
+        tds_types.BitType(),
+        tds_types.DecimalType(precision=10, scale=2),
+        tds_types.MoneyType(),
+        tds_types.DateTimeType(),
+        tds_types.DateTime2Type(precision=3),
+        tds_types.UniqueIdentifierType(),
+        tds_types.NVarCharType(size=30),
+        tds_types.NVarCharMaxType(),
+        tds_types.VarBinaryType(size=16),
+        # non Unicode strings are loaded as Unicode strings
+        tds_types.VarCharType(size=20),
+        tds_types.VarCharType(size=8000),
+    ]
+    columns = [
+        Column(name=f"c{i}", type=typ, flags=Column.fNullable if i % 2 else 0)
+        for i, typ in enumerate(types)
+    ]
+    sess = make_response_session(encode_result_set(columns, []))
+    assert sess.res_info is not None
+    result = table_columns(sess.res_info.columns)
+    assert [col.column_name for col in result] == [col.column_name for col in columns]
+    assert [col.flags for col in result] == [col.flags for col in columns]
+    assert _declarations(result) == [
+        "INT",
+        "BIGINT",
+        "BIT",
+        "DECIMAL(10, 2)",
+        "MONEY",
+        "DATETIME",
+        "DATETIME2(3)",
+        "UNIQUEIDENTIFIER",
+        "NVARCHAR(30)",
+        "NVARCHAR(MAX)",
+        "VARBINARY(16)",
+        "NVARCHAR(20)",
+        "NVARCHAR(MAX)",
+    ]
+
+
+def _table_columns_responses(columns):
+    return [
+        encode_result_set(columns, []),
+        # acknowledgement of cancel, which is sent since result set was not read
+        encode_reply(encode_done(tds_base.TDS_DONE_TOKEN, tds_base.TDS_DONE_CANCELLED)),
+        encode_reply(encode_done(tds_base.TDS_DONE_TOKEN, 0)),
+        encode_reply(encode_done(tds_base.TDS_DONE_TOKEN, tds_base.TDS_DONE_COUNT, 1)),
+    ]
+
+
+TABLE_COLUMNS = [
+    Column(name="a", type=tds_types.IntType()),
+    Column(name="b", type=tds_types.DateTime2Type(precision=7)),
+]
+
+
+def test_copy_to_uses_table_types():
+    conn, sock = _bulk_connection(_table_columns_responses(TABLE_COLUMNS))
+    cursor = conn.cursor()
+    cursor.copy_to(
+        table_or_view="t",
+        data=[(1, datetime.datetime(2020, 1, 2, 3, 4, 5))],
+        native_types=True,
+    )
+    assert cursor.rowcount == 1
+    statement = "INSERT BULK [t]([a] INT,[b] DATETIME2(7))"
+    assert statement.encode("utf-16-le") in sock.consume_output()
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        {"data": [("1", "2020-01-02 03:04:05")]},
+        {"file": io.StringIO("1\t2020-01-02 03:04:05\n")},
+    ],
+)
+def test_copy_to_strings(source):
+    # without native_types values are sent as strings and converted by the server
+    conn, sock = _bulk_connection(_table_columns_responses(TABLE_COLUMNS))
+    cursor = conn.cursor()
+    cursor.copy_to(table_or_view="t", **source)
+    assert cursor.rowcount == 1
+    output = sock.consume_output()
+    statement = "INSERT BULK [t]([a] NVARCHAR(4000),[b] NVARCHAR(4000))"
+    assert statement.encode("utf-16-le") in output
+    assert "2020-01-02 03:04:05".encode("utf-16-le") in output
+
+
+def test_copy_to_native_types_from_file():
+    conn, _ = _bulk_connection([])
+    with pytest.raises(ValueError):
+        conn.cursor().copy_to(io.StringIO("1\n"), "t", native_types=True)
+
+
+def _bulk_connection(responses, autocommit=True):
+    sock = MockSock(responses)
+    tds = _TdsSocket(sock=sock, login=_TdsLogin(), autocommit=autocommit)
+    tds.tds_version = TDS74
+    tds.collation = raw_collation
+    if not autocommit:
+        # transaction is already started
+        tds.tds72_transaction = 1
+    return NonMarsConnection(pooling=False, key=None, tds_socket=tds), sock
+
+
+def _batch_responses(count):
+    return [
+        encode_reply(encode_done(tds_base.TDS_DONE_TOKEN, 0)),
+        encode_reply(
+            encode_done(tds_base.TDS_DONE_TOKEN, tds_base.TDS_DONE_COUNT, count)
+        ),
+    ]
+
+
+def test_copy_to_batches():
+    conn, sock = _bulk_connection(
+        _batch_responses(2) + _batch_responses(2) + _batch_responses(1)
+    )
+    reports = []
+    cursor = conn.cursor()
+    cursor.copy_to(
+        table_or_view="t",
+        columns=[Column(name="a", type=tds_types.IntType())],
+        data=[(i,) for i in range(6)],
+        batch_size=2,
+        start_row=1,
+        progress=reports.append,
+    )
+    assert cursor.rowcount == 5
+    assert [(p.rows, p.next_row) for p in reports] == [(2, 3), (4, 5), (5, 6)]
+    assert 0 < reports[0].bytes < reports[1].bytes < reports[2].bytes
+    assert reports[-1].rows_per_second >= 0
+    output = sock.consume_output()
+    assert output.count("INSERT BULK".encode("utf-16-le")) == 3
+    # first row is skipped
+    assert struct.pack("<BBi", tds_base.TDS_ROW_TOKEN, 4, 0) not in output
+    assert struct.pack("<BBi", tds_base.TDS_ROW_TOKEN, 4, 1) in output
+
+
+def test_copy_to_batches_in_transaction():
+    commit = encode_reply(encode_done(tds_base.TDS_DONE_TOKEN, 0))
+    conn, _ = _bulk_connection(
+        _batch_responses(2)
+        + [commit]
+        + _batch_responses(2)
+        + [commit]
+        + _batch_responses(1)
+        + [commit],
+        autocommit=False,
+    )
+    reports = []
+    cursor = conn.cursor()
+    cursor.copy_to(
+        table_or_view="t",
+        columns=[Column(name="a", type=tds_types.IntType())],
+        data=[(i,) for i in range(5)],
+        batch_size=2,
+        progress=reports.append,
+    )
+    # row counts are not reset by commits which follow batches
+    assert [(p.rows, p.next_row) for p in reports] == [(2, 2), (4, 4), (5, 5)]
+    assert cursor.rowcount == 5
+
+
+def test_copy_to_batch_error():
+    conn, sock = _bulk_connection(
+        _batch_responses(2)
+        + [
+            encode_reply(encode_done(tds_base.TDS_DONE_TOKEN, 0)),
+            encode_reply(
+                encode_error(4815, "Received an invalid column length")
+                + encode_done(tds_base.TDS_DONE_TOKEN, tds_base.TDS_DONE_ERROR)
+            ),
+        ]
+    )
+    with pytest.raises(tds_base.BulkCopyError) as excinfo:
+        conn.cursor().copy_to(
+            table_or_view="t",
+            columns=[Column(name="a", type=tds_types.IntType())],
+            data=[(i,) for i in range(5)],
+            batch_size=2,
+        )
+    assert excinfo.value.rows_loaded == 2
+    assert excinfo.value.loaded_batches == [0]
+    assert [index for index, _ in excinfo.value.errors] == [1]
+    assert isinstance(excinfo.value.__cause__, tds_base.OperationalError)
+
+
+class _LoaderConnection:
+    """Connection which records batches loaded by copy_to"""
+
+    def __init__(self, fail_on=None, cursor_error=None):
+        self.fail_on = fail_on
+        self.cursor_error = cursor_error
+        self.batches = []
+        self.commits = 0
+        self.rollbacks = 0
+        self.closed = False
+
+    def cursor(self):
+        if self.cursor_error is not None:
+            raise self.cursor_error
+        return self
+
+    def copy_to(self, data, **kwargs):
+        assert kwargs["table_or_view"] == "t"
+        assert [col.column_name for col in kwargs["columns"]] == ["a"]
+        rows = list(data)
+        if isinstance(self.fail_on, BaseException):
+            raise self.fail_on
+        if self.fail_on is not None and [self.fail_on] in rows:
+            raise tds_base.IntegrityError("Violation of PRIMARY KEY constraint")
+        self.batches.append(rows)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+def test_parallel_copy():
+    connections = []
+
+    def connect():
+        conn = _LoaderConnection()
+        connections.append(conn)
+        return conn
+
+    rows = ([i] for i in range(95))
+    loaded = parallel_copy(connect, "t", rows, workers=3, batch_size=10, columns=["a"])
+    assert loaded == 95
+    assert len(connections) == 3
+    batches = sorted(batch for conn in connections for batch in conn.batches)
+    assert [row for batch in batches for row in batch] == [[i] for i in range(95)]
+    assert sum(conn.commits for conn in connections) == 10
+    assert all(conn.closed for conn in connections)
+
+
+def test_parallel_copy_error():
+    conn = _LoaderConnection(fail_on=25)
+    rows = [[i] for i in range(50)]
+    with pytest.raises(tds_base.BulkCopyError) as exc_info:
+        parallel_copy(lambda: conn, "t", rows, workers=1, batch_size=10, columns=["a"])
+    error = exc_info.value
+    assert [index for index, _ in error.errors] == [2]
+    assert isinstance(error.errors[0][1], tds_base.IntegrityError)
+    # batches which follow the failed one are skipped
+    assert error.loaded_batches == [0, 1]
+    assert error.rows_loaded == 20
+    assert conn.rollbacks == 1
+    assert conn.closed
+
+
+def test_parallel_copy_cursor_error():
+    conn = _LoaderConnection(cursor_error=tds_base.OperationalError("Closed"))
+    rows = [[i] for i in range(100)]
+    with pytest.raises(tds_base.BulkCopyError) as exc_info:
+        parallel_copy(lambda: conn, "t", rows, workers=1, batch_size=10, columns=["a"])
+    assert [index for index, _ in exc_info.value.errors] == [0]
+    assert exc_info.value.rows_loaded == 0
+
+
+class _WorkerKilled(BaseException):
+    pass
+
+
+def test_parallel_copy_worker_killed():
+    # worker exits on first batch, producer should not block on the full queue
+    conn = _LoaderConnection(fail_on=_WorkerKilled())
+    rows = [[i] for i in range(100)]
+    with pytest.raises(_WorkerKilled):
+        parallel_copy(lambda: conn, "t", rows, workers=1, batch_size=10, columns=["a"])
+    assert conn.closed
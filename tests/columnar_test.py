@@ -0,0 +1,238 @@
+import datetime
+import decimal
+
+import pytest
+
+from pytds import columnar, tds_base
+from pytds.collate import raw_collation
+from pytds.connection import NonMarsConnection
+from pytds.tds_base import TDS74, Column, _TdsLogin
+from pytds.tds_socket import _TdsSocket
+from pytds.tds_types import (
+    BigIntType,
+    BitType,
+    DateTime2Type,
+    DateType,
+    DecimalType,
+    FloatType,
+    IntType,
+    NVarCharType,
+    RealType,
+    SmallIntType,
+    TinyIntType,
+)
+from tests.utils import (
+    MockSock,
+    encode_done,
+    encode_reply,
+    encode_result_set,
+    make_response_session,
+)
+
+np = pytest.importorskip("numpy")
+
+
+def test_numeric_columns():
+    columns = [
+        Column(name="a", type=IntType()),
+        Column(name="b", type=BigIntType()),
+        Column(name="c", type=FloatType()),
+        Column(name="d", type=BitType()),
+        Column(name="e", type=TinyIntType()),
+    ]
+    rows = [(i, i * 2**33, i / 4, i % 2 == 0, i % 256) for i in range(1000)]
+    rows[500] = (None, None, None, None, None)
+    sess = make_response_session(
+        encode_result_set(columns, rows, bufsize=512), bufsize=512
+    )
+    a, b, c, d, e = sess.fetch_columns(10)
+    assert a.dtype == np.int32
+    assert b.dtype == np.int64
+    assert c.dtype == np.float64
+    assert d.dtype == np.bool_
+    assert e.dtype == np.uint8
+    assert a.tolist() == list(range(10))
+    assert not a.mask.any()
+
+    result = sess.fetch_columns()
+    assert len(result[0]) == 990
+    expected = list(zip(*rows[10:]))
+    for column, values in zip(result, expected):
+        assert column.tolist() == list(values)
+    assert result[0].mask[490]
+    assert sess.res_info.row_count == 1000
+    # result set is finished
+    assert len(sess.fetch_columns(10)[0]) == 0
+
+
+def test_mixed_columns():
+    columns = [
+        Column(name="a", type=IntType()),
+        Column(name="b", type=NVarCharType(size=10)),
+        Column(name="c", type=DateType()),
+    ]
+    rows = [
+        (1, "hello", datetime.date(2020, 1, 2)),
+        (None, None, None),
+        (3, "", datetime.date(1, 1, 1)),
+    ]
+    sess = make_response_session(encode_result_set(columns, rows))
+    a, b, c = sess.fetch_columns()
+    assert b.dtype == object
+    assert c.dtype == np.dtype("datetime64[D]")
+    assert a.tolist() == [1, None, 3]
+    assert b.tolist() == ["hello", None, ""]
+    assert c.tolist() == [datetime.date(2020, 1, 2), None, datetime.date(1, 1, 1)]
+
+
+def test_arrow_batches():
+    pa = pytest.importorskip("pyarrow")
+    columns = [
+        Column(name="a", type=IntType()),
+        Column(name="b", type=NVarCharType(size=10)),
+        Column(name="c", type=DateType()),
+    ]
+    rows = [(i, str(i), datetime.date(2000, 1, 1 + i % 28)) for i in range(25)]
+    rows[3] = (None, None, None)
+    sess = make_response_session(encode_result_set(columns, rows))
+    batches = list(sess.fetch_arrow_batches(10))
+    assert [batch.num_rows for batch in batches] == [10, 10, 5]
+    assert batches[0].schema == pa.schema(
+        [("a", pa.int32()), ("b", pa.string()), ("c", pa.date32())]
+    )
+    table = pa.Table.from_batches(batches)
+    assert table.to_pylist()[3] == {"a": None, "b": None, "c": None}
+    assert [tuple(row.values()) for row in table.to_pylist()] == rows
+
+
+def test_arrow_empty_result():
+    pa = pytest.importorskip("pyarrow")
+    sess = make_response_session(
+        encode_result_set([Column(name="a", type=BigIntType())], [])
+    )
+    batches = list(sess.fetch_arrow_batches(10))
+    assert len(batches) == 1
+    assert batches[0].num_rows == 0
+    assert batches[0].schema == pa.schema([("a", pa.int64())])
+
+
+def _bulk_request(submit, responses=()):
+    sock = MockSock(list(responses))
+    tds = _TdsSocket(sock=sock, login=_TdsLogin(), autocommit=True)
+    tds.tds_version = TDS74
+    tds.collation = raw_collation
+    submit(tds.main_session)
+    return sock.consume_output()
+
+
+def _nullable(name, typ):
+    return Column(name=name, type=typ, flags=Column.fNullable)
+
+
+def _assert_same_request(metadata, rows, data):
+    columns = [(values, mask) for _, values, mask in columnar.column_sources(data)]
+    expected = _bulk_request(lambda sess: sess.submit_bulk(metadata, rows))
+    actual = _bulk_request(lambda sess: sess.submit_bulk_columns(metadata, columns))
+    assert actual == expected
+
+
+@pytest.mark.parametrize("chunk_rows", [7, 65536])
+def test_bulk_fixed_columns(monkeypatch, chunk_rows):
+    monkeypatch.setattr(
+        columnar.ColumnarBulkWriter.__init__, "__defaults__", (chunk_rows,)
+    )
+    metadata = [
+        _nullable("a", IntType()),
+        _nullable("b", BigIntType()),
+        _nullable("c", FloatType()),
+        _nullable("d", BitType()),
+        _nullable("e", TinyIntType()),
+        _nullable("f", RealType()),
+        _nullable("g", SmallIntType()),
+    ]
+    count = 50
+    a = np.ma.MaskedArray(np.arange(count), mask=np.arange(count) % 5 == 0)
+    b = np.arange(count, dtype=np.int64) * 2**33
+    c = np.arange(count) / 4
+    c[3] = np.nan
+    d = np.arange(count) % 2 == 0
+    e = np.arange(count, dtype=np.uint8)
+    f = np.arange(count, dtype=np.float32) / 2
+    g = -np.arange(count, dtype=np.int16)
+    rows = list(zip(a.tolist(), b.tolist(), c.tolist(), d.tolist(), e.tolist()))
+    rows = [
+        (x, y, None if i == 3 else z, u, v, f[i].item(), g[i].item())
+        for i, (x, y, z, u, v) in enumerate(rows)
+    ]
+    data = dict(zip("abcdefg", [a, b, c, d, e, f, g]))
+    _assert_same_request(metadata, rows, data)
+
+
+def test_bulk_mixed_columns():
+    metadata = [
+        _nullable("a", IntType()),
+        _nullable("b", NVarCharType(size=10)),
+        _nullable("c", FloatType()),
+        _nullable("d", DateTime2Type(precision=6)),
+        _nullable("e", DecimalType(precision=10, scale=2)),
+    ]
+    rows = [
+        (i, f"s{i}", i / 2, datetime.datetime(2020, 1, 2, 3, i), decimal.Decimal(i))
+        for i in range(20)
+    ]
+    rows[4] = (None, None, None, None, None)
+    data = {
+        "a": np.ma.MaskedArray([row[0] or 0 for row in rows], mask=np.arange(20) == 4),
+        "b": np.array([row[1] for row in rows], dtype=object),
+        "c": np.array([np.nan if row[2] is None else row[2] for row in rows]),
+        "d": np.array([row[3] for row in rows], dtype="datetime64[ns]"),
+        "e": [row[4] for row in rows],
+    }
+    _assert_same_request(metadata, rows, data)
+
+
+def test_bulk_arrow_table():
+    pa = pytest.importorskip("pyarrow")
+    metadata = [_nullable("a", BigIntType()), _nullable("b", NVarCharType(size=10))]
+    rows = [(1, "x"), (None, None), (3, "z")]
+    table = pa.table({"a": [1, None, 3], "b": ["x", None, "z"]})
+    assert [name for name, _, _ in columnar.column_sources(table)] == ["a", "b"]
+    _assert_same_request(metadata, rows, table)
+
+
+def test_bulk_invalid_columns():
+    with pytest.raises(TypeError):
+        columnar.column_sources([(1, 2)])
+    with pytest.raises(ValueError):
+        columnar.column_sources({"a": np.arange(2), "b": np.arange(3)})
+    metadata = [_nullable("a", IntType())]
+    # value does not fit into INT column
+    columns = [(np.array([2**40]), np.array([False]))]
+    with pytest.raises(ValueError):
+        _bulk_request(lambda sess: sess.submit_bulk_columns(metadata, columns))
+
+
+def test_copy_columns_to():
+    columns = [
+        Column(name="a", type=IntType()),
+        Column(name="b", type=NVarCharType(size=10)),
+    ]
+    responses = [
+        encode_result_set(columns, []),
+        # acknowledgement of cancel, which is sent since result set was not read
+        encode_reply(encode_done(tds_base.TDS_DONE_TOKEN, tds_base.TDS_DONE_CANCELLED)),
+        encode_reply(encode_done(tds_base.TDS_DONE_TOKEN, 0)),
+        encode_reply(encode_done(tds_base.TDS_DONE_TOKEN, tds_base.TDS_DONE_COUNT, 2)),
+    ]
+    sock = MockSock(responses)
+    tds = _TdsSocket(sock=sock, login=_TdsLogin(), autocommit=True)
+    tds.tds_version = TDS74
+    tds.collation = raw_collation
+    conn = NonMarsConnection(pooling=False, key=None, tds_socket=tds)
+    cursor = conn.cursor()
+    cursor.copy_columns_to({"a": np.array([1, 2]), "b": ["x", "y"]}, "t")
+    assert cursor.rowcount == 2
+    output = sock.consume_output()
+    assert "select top 1 [a], [b] from [t]".encode("utf-16-le") in output
+    statement = "INSERT BULK [t]([a] INT,[b] NVARCHAR(10))"
+    assert statement.encode("utf-16-le") in output
@@ -0,0 +1,91 @@
+from decimal import Context, Decimal
+
+import pytest
+
+from pytds import tds_base
+from pytds.tds_base import Column, _TdsLogin
+from pytds.tds_types import DecimalType, MoneyType, SmallMoneyType
+from tests.utils import encode_result_set, make_response_session
+
+COLUMNS = [
+    Column(name="a", type=DecimalType(precision=10, scale=2), flags=Column.fNullable),
+    Column(name="b", type=DecimalType(precision=38, scale=10), flags=Column.fNullable),
+    Column(name="c", type=MoneyType(), flags=Column.fNullable),
+    Column(name="d", type=SmallMoneyType(), flags=Column.fNullable),
+]
+
+ROWS = [
+    (Decimal("12.34"), Decimal("1234567890123456789012345678.0123456789"), 1, 1),
+    (Decimal("-12.34"), Decimal("-0.0000000001"), Decimal("-1.5"), Decimal("-2.25")),
+    (-5, 10**27, Decimal("-922337203685477.5808"), Decimal("214748.3647")),
+    (Decimal("0.999"), Decimal(0), Decimal("922337203685477.5807"), -214748),
+    (0.5, 0, -0.0001, 0.5),
+    (None, None, None, None),
+]
+
+EXPECTED = [
+    (Decimal("12.34"), Decimal("1234567890123456789012345678.0123456789"), 1, 1),
+    (Decimal("-12.34"), Decimal("-0.0000000001"), Decimal("-1.5"), Decimal("-2.25")),
+    (-5, 10**27, Decimal("-922337203685477.5808"), Decimal("214748.3647")),
+    (Decimal("0.99"), 0, Decimal("922337203685477.5807"), -214748),
+    (Decimal("0.5"), 0, Decimal("-0.0001"), Decimal("0.5")),
+    (None, None, None, None),
+]
+
+
+context = Context(prec=38)
+
+
+def _read_rows(login=None):
+    sess = make_response_session(encode_result_set(COLUMNS, ROWS), login=login)
+    return [tuple(row) for row in iter(sess.fetchone, None)]
+
+
+def test_round_trip():
+    rows = _read_rows()
+    assert rows == EXPECTED
+    # values keep scale of the column
+    assert str(rows[0][0]) == "12.34"
+    assert str(rows[2][0]) == "-5.00"
+    assert str(rows[0][2]) == "1.0000"
+
+
+def test_decimals_as_int():
+    login = _TdsLogin()
+    login.decimals_as_int = True
+    rows = _read_rows(login)
+    scales = [2, 10, 4, 4]
+    assert rows == [
+        tuple(
+            None if value is None else int(Decimal(value).scaleb(scale, context))
+            for value, scale in zip(row, scales)
+        )
+        for row in EXPECTED
+    ]
+    assert all(type(value) is int for value in rows[0])
+
+
+@pytest.mark.parametrize(
+    "column,value",
+    [
+        (COLUMNS[0], Decimal("1e18")),
+        (COLUMNS[1], 10**38),
+    ],
+)
+def test_decimal_out_of_range(column, value):
+    with pytest.raises(tds_base.DataError):
+        encode_result_set([column], [(value,)])
+
+
+@pytest.mark.parametrize(
+    "column,value",
+    [
+        (COLUMNS[2], Decimal("922337203685477.5808")),
+        (COLUMNS[2], Decimal("-922337203685477.5809")),
+        (COLUMNS[3], Decimal("214748.3648")),
+        (COLUMNS[3], -214749),
+    ],
+)
+def test_money_out_of_range(column, value):
+    with pytest.raises(tds_base.DataError):
+        encode_result_set([column], [(value,)])
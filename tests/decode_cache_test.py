@@ -0,0 +1,70 @@
+from pytds.tds_base import Column, _TdsLogin
+from pytds.tds_types import (
+    IntType,
+    NVarCharMaxType,
+    NVarCharType,
+    VarCharType,
+    supports_decode_cache,
+)
+from tests.utils import encode_result_set, make_response_session
+
+
+ROWS = [(i, ["USD", "EUR", "GBP"][i % 3], "value %d" % i) for i in range(30)]
+
+
+def _columns():
+    return [
+        Column(name="a", type=IntType()),
+        Column(name="b", type=NVarCharType(size=3)),
+        Column(name="c", type=NVarCharType(size=100)),
+    ]
+
+
+def test_decode_cache():
+    # small packets make some values span packets
+    sess = make_response_session(
+        encode_result_set(_columns(), ROWS, bufsize=100), bufsize=100
+    )
+    sess.res_info.columns[1].serializer.set_decode_cache()
+    rows = sess.fetch_rows()
+    assert rows == [list(row) for row in ROWS]
+    assert all(rows[i][1] is rows[i % 3][1] for i in range(30))
+
+
+def test_decode_cache_is_bounded():
+    sess = make_response_session(encode_result_set(_columns(), ROWS))
+    sess.res_info.columns[2].serializer.set_decode_cache(5)
+    assert sess.fetch_rows() == [list(row) for row in ROWS]
+    assert len(sess.res_info.columns[2].serializer._decode_cache._cache) <= 5
+
+
+def test_decode_cache_for_short_columns():
+    login = _TdsLogin()
+    login.string_cache_max_length = 10
+    sess = make_response_session(encode_result_set(_columns(), ROWS), login=login)
+    columns = sess.res_info.columns
+    assert columns[1].serializer._decode_cache is not None
+    assert columns[2].serializer._decode_cache is None
+    rows = sess.fetch_rows()
+    assert rows[0][1] is rows[3][1]
+
+
+def test_supports_decode_cache():
+    sess = make_response_session(
+        encode_result_set(
+            [
+                Column(name="a", type=NVarCharType(size=3)),
+                Column(name="b", type=VarCharType(size=3)),
+                Column(name="c", type=NVarCharMaxType()),
+                Column(name="d", type=IntType()),
+            ],
+            [],
+        )
+    )
+    columns = sess.res_info.columns
+    assert [supports_decode_cache(col.serializer) for col in columns] == [
+        True,
+        True,
+        False,
+        False,
+    ]
@@ -0,0 +1,245 @@
+import struct
+
+import pytest
+
+from pytds import tds_base, tds_session
+from pytds.collate import raw_collation
+from pytds.tds_base import _TdsLogin
+from pytds.tds_socket import _TdsSocket
+from pytds.tds_types import IntType
+from tests.utils import (
+    MockSock,
+    encode_done,
+    encode_error,
+    encode_int_return_value,
+    encode_reply,
+    encode_result_set,
+)
+
+EXECUTESQL_CALL = struct.pack("<hh", -1, tds_base.TDS_SP_EXECUTESQL)
+EXECUTE_CALL = struct.pack("<hh", -1, tds_base.TDS_SP_EXECUTE)
+PREPEXEC_CALL = struct.pack("<hh", -1, tds_base.TDS_SP_PREPEXEC)
+UNPREPARE_CALL = struct.pack("<hh", -1, tds_base.TDS_SP_UNPREPARE)
+
+
+def _call_response(last: bool, handle: int | None = None) -> bytes:
+    more = 0 if last else tds_base.TDS_DONE_MORE_RESULTS
+    return (
+        encode_done(
+            tds_base.TDS_DONEINPROC_TOKEN,
+            tds_base.TDS_DONE_MORE_RESULTS | tds_base.TDS_DONE_COUNT,
+            1,
+        )
+        + (encode_int_return_value(handle) if handle is not None else b"")
+        + struct.pack("<Bi", tds_base.TDS_RETURNSTATUS_TOKEN, 0)
+        + encode_done(tds_base.TDS_DONEPROC_TOKEN, more | tds_base.TDS_DONE_COUNT, 1)
+    )
+
+
+def _batch_response(num_calls: int) -> bytes:
+    return encode_reply(
+        b"".join(_call_response(i == num_calls - 1) for i in range(num_calls))
+    )
+
+
+def _session(prepared_cache_size: int = 0):
+    login = _TdsLogin()
+    login.prepared_cache_size = prepared_cache_size
+    sock = MockSock()
+    tds = _TdsSocket(sock=sock, login=login, autocommit=True)
+    tds.tds_version = tds_base.TDS74
+    return tds.main_session, sock
+
+
+def test_executemany_sends_single_request():
+    sess, sock = _session()
+    sock.set_input([_batch_response(3)])
+    sess.executemany("insert into t values (%s)", [(1,), (2,), (3,)])
+    request = sock.consume_output()
+    # single packet
+    assert request[1] == 1
+    assert len(request) == struct.unpack(">H", request[2:4])[0]
+    assert request.count(EXECUTESQL_CALL) == 3
+    assert sess.rows_affected == 3
+    assert sess.state == tds_base.TDS_IDLE
+
+
+def test_executemany_splits_batches(monkeypatch):
+    monkeypatch.setattr(tds_session, "_EXECUTEMANY_BATCH_SIZE", 2)
+    sess, sock = _session()
+    sock.set_input([_batch_response(2), _batch_response(2), _batch_response(1)])
+    sess.executemany("insert into t values (%s)", [(i,) for i in range(5)])
+    assert sess.rows_affected == 5
+
+
+def test_executemany_plain_queries():
+    sess, sock = _session()
+    response = encode_reply(
+        encode_done(tds_base.TDS_DONE_TOKEN, tds_base.TDS_DONE_COUNT, 1)
+    )
+    sock.set_input([_batch_response(1), response, _batch_response(1)])
+    # parameter set with only NULL values is executed as a plain query
+    sess.executemany("insert into t values (%s)", [(1,), (None,), (2,)])
+    assert sess.rows_affected == 3
+
+
+def test_executemany_error(monkeypatch):
+    monkeypatch.setattr(tds_session, "_EXECUTEMANY_BATCH_SIZE", 3)
+    sess, sock = _session()
+    response = encode_reply(
+        _call_response(last=False)
+        + encode_error(2627, "Violation of PRIMARY KEY constraint")
+        + encode_done(
+            tds_base.TDS_DONEINPROC_TOKEN,
+            tds_base.TDS_DONE_MORE_RESULTS | tds_base.TDS_DONE_ERROR,
+        )
+        + struct.pack("<Bi", tds_base.TDS_RETURNSTATUS_TOKEN, 0)
+        + encode_done(tds_base.TDS_DONEPROC_TOKEN, tds_base.TDS_DONE_MORE_RESULTS)
+        + _call_response(last=True)
+    )
+    sock.set_input([response])
+    with pytest.raises(tds_base.IntegrityError):
+        sess.executemany("insert into t values (%s)", [(1,), (1,), (2,), (3,)])
+    # whole response of the failed batch is read, following batch is not sent
+    assert sess.state == tds_base.TDS_IDLE
+    assert sock.consume_output().count(EXECUTESQL_CALL) == 3
+    sock.set_input([_batch_response(1)])
+    sess.executemany("insert into t values (%s)", [(4,)])
+    request = sock.consume_output()
+    assert request[0] == tds_base.PacketType.RPC
+    assert sess.rows_affected == 1
+
+
+def test_executemany_with_prepared_statements():
+    sess, sock = _session(prepared_cache_size=10)
+    sock.set_input(
+        [encode_reply(_call_response(True, handle=5)), _batch_response(2)]
+    )
+    sess.executemany("insert into t values (%s)", [(1,), (2,), (3,)])
+    # first execution prepares statement, the rest are batched
+    requests = sock.consume_output()
+    assert requests.count(EXECUTE_CALL) == 2
+    assert requests.count(EXECUTESQL_CALL) == 0
+    assert sess.rows_affected == 3
+
+
+def test_executemany_stale_prepared_handle():
+    sess, sock = _session(prepared_cache_size=10)
+    sock.set_input([encode_reply(_call_response(True, handle=5))])
+    sess.executemany("insert into t values (%s)", [(1,)])
+    sock.consume_output()
+    stale_call = encode_error(8179, "Could not find prepared statement with handle 5")
+    stale_response = encode_reply(
+        stale_call
+        + encode_done(
+            tds_base.TDS_DONEPROC_TOKEN,
+            tds_base.TDS_DONE_MORE_RESULTS | tds_base.TDS_DONE_ERROR,
+        )
+        + stale_call
+        + encode_done(tds_base.TDS_DONEPROC_TOKEN, tds_base.TDS_DONE_ERROR)
+    )
+    sock.set_input(
+        [
+            stale_response,
+            encode_reply(_call_response(True, handle=6)),
+            _batch_response(1),
+        ]
+    )
+    sess.executemany("insert into t values (%s)", [(2,), (3,)])
+    # failed calls are executed again, statement is prepared again by the first one
+    requests = sock.consume_output()
+    assert requests.count(PREPEXEC_CALL) == 1
+    assert requests.count(EXECUTE_CALL) == 3
+    assert sess.rows_affected == 2
+    assert list(sess._tds.prepared_cache.values()) == [6]
+
+
+def test_executemany_unprepares_evicted_handles():
+    sess, sock = _session(prepared_cache_size=1)
+    unprepare_response = encode_reply(encode_done(tds_base.TDS_DONEPROC_TOKEN, 0))
+    sock.set_input(
+        [
+            encode_reply(_call_response(True, handle=5)),
+            encode_reply(_call_response(True, handle=6)),
+            unprepare_response,
+        ]
+    )
+    # parameters of different types need different prepared statements
+    sess.executemany("insert into t values (%s)", [(1,), ("a",)])
+    requests = sock.consume_output()
+    assert requests.count(PREPEXEC_CALL) == 2
+    assert requests.count(UNPREPARE_CALL) == 1
+    assert sess._tds.unprepare_queue == []
+    assert sess.rows_affected == 2
+
+
+def _table_response(identity_flags: int = 0) -> bytes:
+    columns = [
+        tds_base.Column(name="a", type=IntType(), flags=identity_flags),
+        tds_base.Column(name="b", type=IntType()),
+    ]
+    return encode_result_set(columns, [])
+
+
+def test_executemany_bulk_insert():
+    sess, sock = _session()
+    sess.conn.bulk_executemany_min_rows = 2
+    sess.conn.collation = raw_collation
+    sock.set_input(
+        [
+            _table_response(),
+            encode_reply(encode_done(tds_base.TDS_DONE_TOKEN, 0)),
+            encode_reply(
+                encode_done(tds_base.TDS_DONE_TOKEN, tds_base.TDS_DONE_COUNT, 3)
+            ),
+        ]
+    )
+    sess.executemany(
+        "insert into t (a, b) values (%(a)s, %(b)s)",
+        ({"a": i, "b": str(i)} for i in range(3)),
+    )
+    requests = sock.consume_output()
+    assert (
+        "INSERT BULK t([a] INT,[b] NVARCHAR(MAX)) "
+        "WITH (CHECK_CONSTRAINTS,FIRE_TRIGGERS,KEEP_NULLS)".encode("utf-16-le")
+        in requests
+    )
+    assert sess.rows_affected == 3
+
+
+def test_executemany_bulk_insert_identity():
+    sess, sock = _session()
+    sess.conn.bulk_executemany_min_rows = 2
+    sock.set_input([_table_response(tds_base.Column.fIdentity), _batch_response(2)])
+    # values of identity column would be ignored by INSERT BULK
+    sess.executemany("insert into t (a, b) values (%s, %s)", [(1, 2), (3, 4)])
+    requests = sock.consume_output()
+    assert "select top 0 [a], [b] from t".encode("utf-16-le") in requests
+    assert "INSERT BULK".encode("utf-16-le") not in requests
+    assert requests.count(EXECUTESQL_CALL) == 2
+    assert sess.rows_affected == 2
+
+
+def test_executemany_bulk_insert_fallback():
+    sess, sock = _session()
+    sess.conn.bulk_executemany_min_rows = 2
+    sock.set_input([_batch_response(2)])
+    # types of values of the column differ, so rows are inserted one by one
+    sess.executemany("insert into t (a) values (%s)", [(1,), ("a",)])
+    assert sock.consume_output().count(EXECUTESQL_CALL) == 2
+    assert sess.rows_affected == 2
+
+
+def test_executemany_batch_ended_early():
+    sess, sock = _session()
+    response = encode_reply(
+        encode_error(3930, "The current transaction cannot be committed")
+        + encode_done(tds_base.TDS_DONEPROC_TOKEN, tds_base.TDS_DONE_ERROR)
+    )
+    # following request would be read if response was not left at its end
+    sock.set_input([response, _batch_response(1)])
+    with pytest.raises(tds_base.DatabaseError):
+        sess.executemany("insert into t values (%s)", [(1,), (2,), (3,)])
+    assert sess.state == tds_base.TDS_IDLE
+    sess.executemany("insert into t values (%s)", [(4,)])
+    assert sess.rows_affected == 1
@@ -0,0 +1,196 @@
+import datetime
+import decimal
+import io
+
+import pytest
+
+from pytds import export, tds_base
+from pytds.collate import raw_collation
+from pytds.connection import NonMarsConnection
+from pytds.tds_base import TDS74, Column, _TdsLogin
+from pytds.tds_socket import _TdsSocket
+from pytds.tds_types import (
+    DateTime2Type,
+    DecimalType,
+    IntType,
+    NVarCharMaxType,
+    NVarCharType,
+    VarBinaryType,
+    VarCharType,
+    XmlType,
+)
+from tests.utils import (
+    MockSock,
+    encode_done,
+    encode_reply,
+    encode_result_set,
+    make_response_session,
+)
+
+COLUMNS = [
+    Column(name="a", type=IntType(), flags=Column.fNullable),
+    Column(name="b", type=NVarCharType(size=20), flags=Column.fNullable),
+    Column(name="c", type=DecimalType(precision=10, scale=2), flags=Column.fNullable),
+    Column(name="d", type=DateTime2Type(precision=6), flags=Column.fNullable),
+    Column(name="e", type=NVarCharMaxType(), flags=Column.fNullable),
+    Column(name="f", type=VarBinaryType(size=10), flags=Column.fNullable),
+]
+
+ROWS = [
+    (
+        i,
+        f"row {i}",
+        decimal.Decimal(i) / 4,
+        datetime.datetime(2020, 1, 2, 3, 4, 5, i),
+        "x" * (i % 100),
+        bytes([i % 256]),
+    )
+    for i in range(2500)
+] + [(None,) * 6]
+
+
+def _session(columns, rows, login=None):
+    sess = make_response_session(
+        encode_result_set(columns, rows, bufsize=512), login=login
+    )
+    sess._tds.collation = raw_collation
+    return sess
+
+
+def test_export_csv():
+    f = io.StringIO(newline="")
+    count = _session(COLUMNS, ROWS).export_result_set(
+        f, format="csv", sep=",", null_string="NULL", header=True
+    )
+    assert count == len(ROWS)
+    lines = f.getvalue().splitlines()
+    assert len(lines) == len(ROWS) + 1
+    assert lines[0] == "a,b,c,d,e,f"
+    assert lines[2] == "1,row 1,0.25,2020-01-02 03:04:05.000001,x,01"
+    assert lines[-1] == "NULL,NULL,NULL,NULL,NULL,NULL"
+
+
+def _bulk_request(submit):
+    sock = MockSock([])
+    tds = _TdsSocket(sock=sock, login=_TdsLogin(), autocommit=True)
+    tds.tds_version = TDS74
+    tds.collation = raw_collation
+    submit(tds.main_session)
+    return sock.consume_output()
+
+
+@pytest.mark.parametrize(
+    "columns,rows",
+    [
+        (COLUMNS, ROWS),
+        # XML values are decoded eagerly and are loaded as NVARCHAR
+        (
+            [Column(name="a", type=IntType()), Column(name="x", type=XmlType())],
+            [(1, "<a/>"), (2, None)],
+        ),
+    ],
+)
+def test_export_native(columns, rows):
+    f = io.BytesIO()
+    count = _session(columns, rows).export_result_set(
+        f, format="native", sep="\t", null_string="", header=False
+    )
+    assert count == len(rows)
+    f.seek(0)
+    metadata, chunks = export.read_native(f)
+    assert [col.column_name for col in metadata] == [col.column_name for col in columns]
+    # rows in the file are the same as rows of bulk request with the same columns
+    expected = _bulk_request(lambda sess: sess.submit_bulk(metadata, rows))
+    actual = _bulk_request(lambda sess: sess.submit_bulk_encoded(metadata, chunks))
+    assert actual == expected
+
+
+def test_export_varchar_as_bytes():
+    login = _TdsLogin()
+    login.bytes_to_unicode = False
+    columns = [Column(name="a", type=IntType()), Column(name="b", type=VarCharType(20))]
+    rows = [(1, "abc"), (2, None)]
+    f = io.StringIO(newline="")
+    _session(columns, rows, login).export_result_set(
+        f, format="csv", sep=",", null_string="NULL", header=False
+    )
+    assert f.getvalue().splitlines() == ["1,abc", "2,NULL"]
+    # VARCHAR values are loaded as NVARCHAR, so they are decoded into strings
+    f = io.BytesIO()
+    _session(columns, rows, login).export_result_set(
+        f, format="native", sep="\t", null_string="", header=False
+    )
+    f.seek(0)
+    metadata, chunks = export.read_native(f)
+    expected = _bulk_request(lambda sess: sess.submit_bulk(metadata, rows))
+    actual = _bulk_request(lambda sess: sess.submit_bulk_encoded(metadata, chunks))
+    assert actual == expected
+
+
+class _Abort(BaseException):
+    pass
+
+
+def test_export_writer_aborted(monkeypatch):
+    monkeypatch.setattr(export, "_BATCH_ROWS", 1)
+    monkeypatch.setattr(export, "_QUEUE_BATCHES", 1)
+
+    def write(self, records):
+        raise _Abort()
+
+    monkeypatch.setattr(export._CsvFormatter, "write", write)
+    # reading thread is not blocked by the full queue after writer thread fails
+    with pytest.raises(_Abort):
+        _session(COLUMNS, ROWS[:100]).export_result_set(
+            io.StringIO(newline=""), format="csv", sep=",", null_string="", header=False
+        )
+
+
+def test_export_invalid_format():
+    with pytest.raises(ValueError):
+        _session(COLUMNS, ROWS[:1]).export_result_set(
+            io.BytesIO(), format="xlsx", sep="\t", null_string="", header=False
+        )
+    with pytest.raises(ValueError):
+        export.read_native(io.BytesIO(b"a,b,c\n"))
+
+
+def _connection(responses):
+    sock = MockSock(responses)
+    tds = _TdsSocket(sock=sock, login=_TdsLogin(), autocommit=True)
+    tds.tds_version = TDS74
+    tds.collation = raw_collation
+    return NonMarsConnection(pooling=False, key=None, tds_socket=tds), sock
+
+
+def test_copy_from_and_back():
+    conn, sock = _connection([encode_result_set(COLUMNS, ROWS)])
+    cursor = conn.cursor()
+    f = io.BytesIO()
+    assert cursor.copy_from("select * from t", f, format="native") == len(ROWS)
+    assert "select * from t".encode("utf-16-le") in sock.consume_output()
+
+    f.seek(0)
+    conn, sock = _connection(
+        [
+            encode_reply(encode_done(tds_base.TDS_DONE_TOKEN, 0)),
+            encode_reply(
+                encode_done(tds_base.TDS_DONE_TOKEN, tds_base.TDS_DONE_COUNT, len(ROWS))
+            ),
+        ]
+    )
+    cursor = conn.cursor()
+    cursor.copy_to(f, "t2", format="native")
+    assert cursor.rowcount == len(ROWS)
+    statement = (
+        "INSERT BULK [t2]([a] INT,[b] NVARCHAR(20),[c] DECIMAL(10, 2),"
+        "[d] DATETIME2(6),[e] NVARCHAR(MAX),[f] VARBINARY(10))"
+    )
+    assert statement.encode("utf-16-le") in sock.consume_output()
+
+
+def test_copy_from_query_with_percent():
+    conn, sock = _connection([encode_result_set(COLUMNS, ROWS[:2])])
+    query = "select * from t where b like 'row%'"
+    assert conn.cursor().copy_from(query, io.StringIO(newline="")) == 2
+    assert query.encode("utf-16-le") in sock.consume_output()
@@ -0,0 +1,62 @@
+from io import StringIO
+
+import pytest
+
+from pytds.tds_base import Column, ProgrammingError
+from pytds.tds_types import IntType, NVarCharMaxType, _StreamChunkedHandler
+from tests.utils import encode_result_set, make_response_session
+
+
+ROWS = [(i, str(i)) for i in range(10)]
+
+
+def _session(rows=ROWS):
+    columns = [
+        Column(name="a", type=IntType()),
+        Column(name="b", type=NVarCharMaxType()),
+    ]
+    return make_response_session(encode_result_set(columns, rows))
+
+
+def test_fetch_rows():
+    sess = _session()
+    assert sess.fetch_rows(3) == [list(row) for row in ROWS[:3]]
+    assert sess.fetchone() == list(ROWS[3])
+    assert sess.fetch_rows() == [list(row) for row in ROWS[4:]]
+    assert sess.res_info.row_count == 10
+    assert sess.fetch_rows(3) == []
+    assert sess.fetchone() is None
+
+
+def test_fetch_rows_falsy_rows():
+    sess = _session([(0, ""), (None, None), (2, "")])
+    # row strategy which produces falsy rows
+    sess._row_convertor = lambda row: row[0]
+    assert sess.fetch_rows(10) == [0, None, 2]
+
+
+def test_fetch_next_buffers_rows():
+    sess = _session()
+    assert sess.fetch_next(4) == list(ROWS[0])
+    assert len(sess._row_buffer) == 3
+    # other fetch methods return buffered rows first
+    assert sess.fetchone() == list(ROWS[1])
+    assert sess.fetch_rows(3) == [list(row) for row in ROWS[2:5]]
+    assert sess.fetch_next(4) == list(ROWS[5])
+    with pytest.raises(ProgrammingError):
+        sess.fetch_columns()
+    assert [sess.fetch_next(4) for _ in ROWS[6:]] == [list(row) for row in ROWS[6:]]
+    assert sess.fetch_next(4) is None
+    assert not sess.next_set()
+
+
+def test_fetch_next_with_streamed_column():
+    sess = _session()
+    stream = StringIO()
+    sess.res_info.columns[1].serializer.set_chunk_handler(
+        _StreamChunkedHandler(stream)
+    )
+    row = sess.fetch_next(4)
+    # stream is shared between rows, so rows are not read ahead
+    assert not sess._row_buffer
+    assert row[1].getvalue() == "0"
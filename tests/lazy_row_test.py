@@ -0,0 +1,96 @@
+import datetime
+import decimal
+import uuid
+
+from pytds.lazy_row import LazyRow
+from pytds.row_strategies import lazy_row_strategy
+from pytds.tds_base import Column, TDS_NBC_ROW_TOKEN, TDS_ROW_TOKEN
+from pytds.tds_types import (
+    BigIntType,
+    DateTime2Type,
+    DecimalType,
+    FloatType,
+    IntType,
+    MoneyType,
+    NVarCharMaxType,
+    NVarCharType,
+    UniqueIdentifierType,
+    VarBinaryType,
+)
+from tests.utils import encode_result_set, make_response_session
+
+
+COLUMNS = [
+    Column(name="a", type=IntType()),
+    Column(name="b", type=NVarCharType(size=20)),
+    Column(name="c", type=DecimalType(precision=10, scale=2)),
+    Column(name="d", type=DateTime2Type(precision=6)),
+    Column(name="e", type=NVarCharMaxType()),
+    Column(name="f", type=VarBinaryType(size=10)),
+    Column(name="g", type=FloatType()),
+    Column(name="h", type=UniqueIdentifierType()),
+    Column(name="i", type=MoneyType()),
+    Column(name="j", type=BigIntType()),
+]
+
+ROWS = [
+    (
+        1,
+        "hello",
+        decimal.Decimal("12.34"),
+        datetime.datetime(2020, 1, 2, 3, 4, 5, 6),
+        "x" * 3000,
+        b"\x01\x02",
+        1.5,
+        uuid.UUID("12345678-1234-5678-1234-567812345678"),
+        decimal.Decimal("5.5"),
+        2**40,
+    ),
+    (None,) * 10,
+]
+
+
+def test_lazy_rows():
+    sess = make_response_session(
+        encode_result_set(COLUMNS, ROWS, bufsize=512),
+        bufsize=512,
+        row_strategy=lazy_row_strategy,
+    )
+    rows = sess.fetch_rows()
+    assert all(isinstance(row, LazyRow) for row in rows)
+    assert rows == [list(row) for row in ROWS]
+    row = rows[0]
+    assert len(row) == 10
+    assert row["c"] == decimal.Decimal("12.34")
+    assert row[-1] == 2**40
+    assert row[1:3] == ("hello", decimal.Decimal("12.34"))
+    # decoded values are cached
+    assert row[4] is row["e"]
+
+
+def test_lazy_rows_decode_only_accessed_columns():
+    sess = make_response_session(
+        encode_result_set(COLUMNS, ROWS), row_strategy=lazy_row_strategy
+    )
+    row = sess.fetchone()
+    assert row[0] == 1
+    assert set(row._values) == {0}
+
+
+def test_lazy_nbcrow():
+    # Replace ROW tokens with NBCROW tokens, NULL bitmap is all zeroes,
+    # so the rest of the row stays unchanged
+    columns = [Column(name="a", type=IntType()), Column(name="b", type=IntType())]
+    response = encode_result_set(columns, [(1, 2)])
+    response = response.replace(
+        bytes([TDS_ROW_TOKEN, 4]), bytes([TDS_NBC_ROW_TOKEN, 0, 4])
+    )
+    # now make first column NULL by setting its bit and removing its value
+    response = response.replace(
+        bytes([TDS_NBC_ROW_TOKEN, 0, 4, 1, 0, 0, 0]), bytes([TDS_NBC_ROW_TOKEN, 1])
+    )
+    # adjust packet size in the header
+    response = response[:2] + len(response).to_bytes(2, "big") + response[4:]
+    sess = make_response_session(response, row_strategy=lazy_row_strategy)
+    assert sess.fetchone() == [None, 2]
+    assert sess.fetchone() is None
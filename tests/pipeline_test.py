@@ -0,0 +1,121 @@
+import struct
+
+import pytest
+
+from pytds import tds_base
+from pytds.connection import NonMarsConnection
+from pytds.tds_base import Column, _TdsLogin
+from pytds.tds_socket import _TdsSocket
+from pytds.tds_types import IntType, NVarCharType
+from tests.utils import (
+    MockSock,
+    encode_done,
+    encode_error,
+    encode_reply,
+    encode_result_set,
+)
+
+EXECUTESQL_CALL = struct.pack("<hh", -1, tds_base.TDS_SP_EXECUTESQL)
+
+
+def _result_set(columns, rows) -> bytes:
+    # strip packet header and final DONE token, in RPC response
+    # result set is terminated by DONEINPROC token
+    tokens = encode_result_set(columns, rows)[8:-13]
+    return tokens + encode_done(
+        tds_base.TDS_DONEINPROC_TOKEN,
+        tds_base.TDS_DONE_MORE_RESULTS | tds_base.TDS_DONE_COUNT,
+        len(rows),
+    )
+
+
+def _end_call(last: bool) -> bytes:
+    more = 0 if last else tds_base.TDS_DONE_MORE_RESULTS
+    return struct.pack("<Bi", tds_base.TDS_RETURNSTATUS_TOKEN, 0) + encode_done(
+        tds_base.TDS_DONEPROC_TOKEN, more
+    )
+
+
+def _connection():
+    sock = MockSock()
+    tds = _TdsSocket(sock=sock, login=_TdsLogin(), autocommit=True)
+    tds.tds_version = tds_base.TDS74
+    return NonMarsConnection(pooling=False, key=None, tds_socket=tds), sock
+
+
+def test_pipeline():
+    conn, sock = _connection()
+    columns = [
+        Column(name="a", type=IntType()),
+        Column(name="b", type=NVarCharType(size=10)),
+    ]
+    sock.set_input(
+        [
+            encode_reply(
+                _result_set(columns, [(1, "x"), (2, "y")])
+                + _end_call(last=False)
+                + encode_done(
+                    tds_base.TDS_DONEINPROC_TOKEN,
+                    tds_base.TDS_DONE_MORE_RESULTS | tds_base.TDS_DONE_COUNT,
+                    5,
+                )
+                + _end_call(last=False)
+                + _result_set(columns[:1], [])
+                + _result_set(columns[1:], [("z",)])
+                + _end_call(last=True)
+            )
+        ]
+    )
+    with conn.pipeline() as pipe:
+        pipe.execute("select a, b from t where a > %s", (0,))
+        pipe.execute("update t set a = a + 1")
+        pipe.execute("select a from t; select b from t")
+    request = sock.consume_output()
+    # all statements are sent in a single packet
+    assert request[1] == 1
+    assert request.count(EXECUTESQL_CALL) == 3
+    first, second, third = pipe.results
+    assert first.rows == [[1, "x"], [2, "y"]]
+    assert [d[0] for d in first.description] == ["a", "b"]
+    assert first.rowcount == 2
+    assert second.result_sets == []
+    assert second.description is None
+    assert second.rowcount == 5
+    assert third.result_sets == [[], [["z"]]]
+    assert [d[0][0] for d in third.descriptions] == ["a", "b"]
+
+
+def test_pipeline_error():
+    conn, sock = _connection()
+    sock.set_input(
+        [
+            encode_reply(
+                encode_done(
+                    tds_base.TDS_DONEINPROC_TOKEN,
+                    tds_base.TDS_DONE_MORE_RESULTS | tds_base.TDS_DONE_COUNT,
+                    1,
+                )
+                + _end_call(last=False)
+                + encode_error(2627, "Violation of PRIMARY KEY constraint")
+                + encode_done(
+                    tds_base.TDS_DONEINPROC_TOKEN,
+                    tds_base.TDS_DONE_MORE_RESULTS | tds_base.TDS_DONE_ERROR,
+                )
+            )
+        ]
+    )
+    pipe = conn.pipeline()
+    pipe.execute("insert into t values (%s)", (1,))
+    pipe.execute("insert into t values (%s)", (1,))
+    with pytest.raises(tds_base.IntegrityError):
+        pipe.run()
+    assert len(pipe.results) == 1
+    assert pipe.results[0].rowcount == 1
+
+
+def test_empty_pipeline():
+    conn, sock = _connection()
+    with conn.pipeline() as pipe:
+        pass
+    assert pipe.results == []
+    assert sock.consume_output() == b""
@@ -0,0 +1,151 @@
+import struct
+
+import pytest
+
+from pytds import tds_base
+from pytds.tds_base import _TdsLogin
+from pytds.tds_socket import _TdsSocket
+from pytds.utils import LruCache
+from tests.utils import (
+    MockSock,
+    encode_done,
+    encode_error,
+    encode_int_return_value,
+    encode_reply,
+)
+
+
+def _prepexec_response(handle: int) -> bytes:
+    return encode_reply(
+        encode_done(
+            tds_base.TDS_DONEINPROC_TOKEN,
+            tds_base.TDS_DONE_MORE_RESULTS | tds_base.TDS_DONE_COUNT,
+            1,
+        )
+        + encode_int_return_value(handle)
+        + struct.pack("<Bi", tds_base.TDS_RETURNSTATUS_TOKEN, 0)
+        + encode_done(tds_base.TDS_DONEPROC_TOKEN, tds_base.TDS_DONE_COUNT, 1)
+    )
+
+
+def _execute_response() -> bytes:
+    return encode_reply(
+        encode_done(tds_base.TDS_DONEPROC_TOKEN, tds_base.TDS_DONE_COUNT, 1)
+    )
+
+
+def _session(monkeypatch, cache_size: int = 10):
+    login = _TdsLogin()
+    login.prepared_cache_size = cache_size
+    sock = MockSock()
+    tds = _TdsSocket(sock=sock, login=login, autocommit=True)
+    tds.tds_version = tds_base.TDS74
+    sess = tds.main_session
+    calls = []
+    submit_rpc = sess.submit_rpc
+
+    def record_rpc(rpc_name, params, flags=0):
+        calls.append((rpc_name, [p.value for p in params]))
+        submit_rpc(rpc_name, params, flags)
+
+    monkeypatch.setattr(sess, "submit_rpc", record_rpc)
+    return sess, sock, calls
+
+
+def _execute(sess, sock, responses, operation, params):
+    sock.set_input(responses)
+    sess.execute(operation, params)
+    sess.complete_rpc()
+
+
+def test_prepared_statement_is_reused(monkeypatch):
+    sess, sock, calls = _session(monkeypatch)
+    _execute(sess, sock, [_prepexec_response(7)], "insert into t values (%s)", (1,))
+    _execute(sess, sock, [_execute_response()], "insert into t values (%s)", (2,))
+    assert calls == [
+        (tds_base.SP_PREPEXEC, [None, "@P1 INT", "insert into t values (@P1)", 1]),
+        (tds_base.SP_EXECUTE, [7, 2]),
+    ]
+    assert sess.rows_affected == 1
+
+
+def test_different_parameter_types_are_prepared_separately(monkeypatch):
+    sess, sock, calls = _session(monkeypatch)
+    _execute(sess, sock, [_prepexec_response(7)], "select %s", (1,))
+    _execute(sess, sock, [_prepexec_response(8)], "select %s", ("a",))
+    assert [name for name, _ in calls] == [tds_base.SP_PREPEXEC] * 2
+    assert len(sess._tds.prepared_cache) == 2
+
+
+def test_evicted_statement_is_unprepared(monkeypatch):
+    sess, sock, calls = _session(monkeypatch, cache_size=1)
+    _execute(sess, sock, [_prepexec_response(7)], "select %s", (1,))
+    _execute(sess, sock, [_prepexec_response(8)], "select %s + 1", (1,))
+    assert sess._tds.unprepare_queue == [7]
+    _execute(
+        sess,
+        sock,
+        [_execute_response(), _execute_response()],
+        "select %s + 1",
+        (2,),
+    )
+    assert calls[2:] == [
+        (tds_base.SP_UNPREPARE, [7]),
+        (tds_base.SP_EXECUTE, [8, 2]),
+    ]
+    assert not sess._tds.unprepare_queue
+
+
+def test_invalid_handle_is_prepared_again(monkeypatch):
+    sess, sock, calls = _session(monkeypatch)
+    _execute(sess, sock, [_prepexec_response(7)], "select %s", (1,))
+    error_response = encode_reply(
+        encode_error(8179, "Could not find prepared statement with handle 7.")
+        + encode_done(tds_base.TDS_DONEPROC_TOKEN, tds_base.TDS_DONE_ERROR)
+    )
+    _execute(sess, sock, [error_response, _prepexec_response(9)], "select %s", (2,))
+    assert calls[1:] == [
+        (tds_base.SP_EXECUTE, [7, 2]),
+        (tds_base.SP_PREPEXEC, [None, "@P1 INT", "select @P1", 2]),
+    ]
+    assert sess._tds.prepared_cache.get(("select @P1", "@P1 INT")) == 9
+
+
+def test_other_errors_are_raised(monkeypatch):
+    sess, sock, calls = _session(monkeypatch)
+    _execute(sess, sock, [_prepexec_response(7)], "select %s", (1,))
+    error_response = encode_reply(
+        encode_error(50000, "failure")
+        + encode_done(tds_base.TDS_DONEPROC_TOKEN, tds_base.TDS_DONE_ERROR)
+    )
+    with pytest.raises(tds_base.OperationalError):
+        _execute(sess, sock, [error_response], "select %s", (2,))
+    assert len(calls) == 2
+
+
+def test_cache_is_disabled_by_default():
+    tds = _TdsSocket(sock=MockSock(), login=_TdsLogin())
+    assert tds.prepared_cache is None
+
+
+def test_cache_is_cleared_on_close(monkeypatch):
+    sess, sock, calls = _session(monkeypatch)
+    _execute(sess, sock, [_prepexec_response(7)], "select %s", (1,))
+    sess._tds.unprepare_queue.append(5)
+    sess._tds.close()
+    assert len(sess._tds.prepared_cache) == 0
+    assert not sess._tds.unprepare_queue
+
+
+def test_lru_cache():
+    cache: LruCache[str, int] = LruCache(2)
+    assert cache.put("a", 1) == []
+    assert cache.put("b", 2) == []
+    assert cache.get("a") == 1
+    # "b" is least recently used
+    assert cache.put("c", 3) == [2]
+    assert "b" not in cache
+    assert cache.put("a", 4) == [1]
+    assert cache.values() == [3, 4]
+    assert cache.pop("c") == 3
+    assert cache.get("c") is None
@@ -0,0 +1,90 @@
+import pytest
+
+from pytds.tds_base import Column, TDS_NBC_ROW_TOKEN, TDS_ROW_TOKEN
+from pytds.tds_types import (
+    BigIntType,
+    BitType,
+    FloatType,
+    IntType,
+    NVarCharMaxType,
+    NVarCharType,
+    SmallIntType,
+    VarBinaryMaxType,
+    VarBinaryType,
+)
+from pytds.row_decoder import compile_row_decoder
+from tests.utils import encode_result_set, make_response_session
+
+
+def _columns():
+    return [
+        Column(name="a", type=IntType()),
+        Column(name="b", type=BigIntType()),
+        Column(name="c", type=FloatType()),
+        Column(name="d", type=BitType()),
+        Column(name="e", type=NVarCharType(size=10)),
+        Column(name="f", type=SmallIntType()),
+        Column(name="g", type=IntType()),
+    ]
+
+
+ROWS = [
+    (1, 2**40, 1.5, True, "hello", -3, 7),
+    (None, 5, None, False, None, None, 8),
+    (-1, None, 0.25, None, "", 32767, None),
+    (2**31 - 1, -(2**63), -2.0, True, "x" * 10, 1, -(2**31)),
+]
+
+
+@pytest.mark.parametrize("bufsize", [4096, 60])
+def test_rows(bufsize):
+    sess = make_response_session(
+        encode_result_set(_columns(), ROWS, bufsize=bufsize), bufsize=bufsize
+    )
+    assert [sess.fetchone() for _ in ROWS] == [list(row) for row in ROWS]
+    assert sess.fetchone() is None
+
+
+def test_nbcrow():
+    # Replace ROW tokens with NBCROW tokens, NULL bitmap is all zeroes,
+    # so the rest of the row stays unchanged
+    response = encode_result_set([Column(name="a", type=IntType())], [(1,), (2,)])
+    response = response.replace(
+        bytes([TDS_ROW_TOKEN, 4]), bytes([TDS_NBC_ROW_TOKEN, 0, 4])
+    )
+    # adjust packet size in the header
+    response = response[:2] + len(response).to_bytes(2, "big") + response[4:]
+    sess = make_response_session(response)
+    assert sess.fetchone() == [1]
+    assert sess.fetchone() == [2]
+    assert sess.fetchone() is None
+
+
+def test_merged_runs():
+    sess = make_response_session(encode_result_set(_columns(), []))
+    decoder = compile_row_decoder(sess.res_info.columns)
+    # a..d are merged into single step, e is a separate step, f..g are merged
+    assert len(decoder._steps) == 3
+
+
+@pytest.mark.parametrize("binary_as_memoryview", [False, True])
+def test_large_binary_values(binary_as_memoryview):
+    columns = [
+        Column(name="a", type=VarBinaryType(size=8000)),
+        Column(name="b", type=VarBinaryMaxType()),
+        Column(name="c", type=NVarCharMaxType()),
+    ]
+    rows = [
+        (bytes(range(256)) * 20, bytes(100000), "x" * 5000),
+        (None, None, None),
+        (b"", b"", ""),
+    ]
+    sess = make_response_session(
+        encode_result_set(columns, rows, bufsize=512), bufsize=512
+    )
+    sess._tds._login.binary_as_memoryview = binary_as_memoryview
+    result = [sess.fetchone() for _ in rows]
+    assert result == [list(row) for row in rows]
+    expected_type = memoryview if binary_as_memoryview else bytes
+    assert type(result[0][0]) is expected_type
+    assert type(result[0][1]) is expected_type
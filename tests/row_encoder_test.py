@@ -0,0 +1,96 @@
+import struct
+
+import pytest
+
+from pytds import tds_base, tds_types
+from pytds.collate import raw_collation
+from pytds.row_encoder import compile_row_encoder
+from pytds.tds_base import TDS74, _TdsLogin
+from pytds.tds_socket import _TdsSocket
+from pytds.tds_types import (
+    BigIntType,
+    BitType,
+    FloatType,
+    IntType,
+    NVarCharType,
+    SmallIntType,
+)
+from tests.utils import MockSock
+
+
+def _serializers(types):
+    factory = tds_types.SerializerFactory(TDS74)
+    return [
+        factory.serializer_by_type(sql_type=typ, collation=raw_collation)
+        for typ in types
+    ]
+
+
+def _write(write_rows, bufsize):
+    sock = MockSock()
+    tds = _TdsSocket(sock=sock, login=_TdsLogin())
+    tds.tds_version = TDS74
+    w = tds.main_session._writer
+    w.bufsize = bufsize
+    w.begin_packet(tds_base.PacketType.BULK)
+    write_rows(w)
+    w.flush()
+    return sock.consume_output()
+
+
+def _assert_same_encoding(serializers, rows, bufsize):
+    def write_by_serializers(w):
+        for row in rows:
+            w.put_byte(tds_base.TDS_ROW_TOKEN)
+            for serializer, value in zip(serializers, row):
+                serializer.write(w, value)
+
+    encoder = compile_row_encoder(serializers)
+    expected = _write(write_by_serializers, bufsize)
+    assert _write(lambda w: encoder.write_rows(w, rows), bufsize) == expected
+
+
+@pytest.mark.parametrize("bufsize", [4096, 60])
+def test_nullable_columns(bufsize):
+    serializers = _serializers(
+        [
+            IntType(),
+            BigIntType(),
+            FloatType(),
+            BitType(),
+            NVarCharType(size=10),
+            SmallIntType(),
+            IntType(),
+        ]
+    )
+    rows = [
+        (1, 2**40, 1.5, True, "hello", -3, 7),
+        (None, 5, None, False, None, None, 8),
+        (-1, None, 0.25, None, "", 32767, None),
+        (2**31 - 1, -(2**63), -2.0, 2, "x" * 10, 1, -(2**31)),
+    ] * 10
+    _assert_same_encoding(serializers, rows, bufsize)
+
+
+@pytest.mark.parametrize("bufsize", [4096, 60])
+def test_not_nullable_columns(bufsize):
+    serializers = [
+        tds_types.NVarChar72Serializer(size=10, collation=raw_collation),
+        tds_types.IntSerializer.instance,
+        tds_types.FloatSerializer.instance,
+        tds_types.BitSerializer.instance,
+        tds_types.IntNSerializer(IntType()),
+        tds_types.TinyIntSerializer.instance,
+    ]
+    rows = [("a", i, i / 3, i % 2, i if i % 3 else None, i % 256) for i in range(50)]
+    _assert_same_encoding(serializers, rows, bufsize)
+
+
+def test_no_columns():
+    _assert_same_encoding([], [(), ()], 4096)
+
+
+def test_invalid_value():
+    encoder = compile_row_encoder(_serializers([IntType(), IntType()]))
+    with pytest.raises(struct.error):
+        _write(lambda w: encoder.write_row(w, (1, "x")), 4096)
@@ -0,0 +1,180 @@
+import struct
+
+import pytest
+
+from pytds import tds_base
+from pytds.connection import NonMarsConnection
+from pytds.row_strategies import lazy_row_strategy
+from pytds.tds_base import Column, _TdsLogin
+from pytds.tds_socket import _TdsSocket
+from pytds.tds_types import IntType, NVarCharType
+from tests.utils import (
+    MockSock,
+    encode_done,
+    encode_int_return_value,
+    encode_reply,
+    encode_result_set,
+    make_response_session,
+)
+
+COLUMNS = [
+    Column(name="a", type=IntType()),
+    Column(name="b", type=NVarCharType(size=10)),
+    # server cursors return row status in additional hidden column
+    Column(name="ROWSTAT", type=IntType(), flags=Column.fHidden),
+]
+
+# COLMETADATA token without metadata, sent in response to sp_cursorfetch
+NO_METADATA = struct.pack("<Bh", tds_base.TDS7_RESULT_TOKEN, -1)
+
+
+def _call(proc_id: int) -> bytes:
+    return struct.pack("<hh", -1, proc_id)
+
+
+def _metadata() -> bytes:
+    # strip packet header and final DONE token
+    return encode_result_set(COLUMNS, [])[8:-13]
+
+
+def _rows(rows) -> bytes:
+    return encode_result_set(COLUMNS, rows)[8:-13][len(_metadata()) :]
+
+
+def _end_call() -> bytes:
+    return struct.pack("<Bi", tds_base.TDS_RETURNSTATUS_TOKEN, 0) + encode_done(
+        tds_base.TDS_DONEPROC_TOKEN, 0
+    )
+
+
+def _open_response(handle: int) -> bytes:
+    return encode_reply(
+        _metadata()
+        + encode_done(tds_base.TDS_DONEINPROC_TOKEN, tds_base.TDS_DONE_MORE_RESULTS)
+        + encode_int_return_value(handle, ordinal=0)
+        + encode_int_return_value(tds_base.TDS_CURSOR_SCROLL_FAST_FORWARD, ordinal=2)
+        + encode_int_return_value(tds_base.TDS_CURSOR_CC_READ_ONLY, ordinal=3)
+        + encode_int_return_value(-1, ordinal=4)
+        + _end_call()
+    )
+
+
+def _fetch_response(rows) -> bytes:
+    return encode_reply(
+        NO_METADATA
+        + _rows(rows)
+        + encode_done(
+            tds_base.TDS_DONEINPROC_TOKEN,
+            tds_base.TDS_DONE_MORE_RESULTS | tds_base.TDS_DONE_COUNT,
+            len(rows),
+        )
+        + _end_call()
+    )
+
+
+def _connection(responses):
+    sock = MockSock(responses)
+    tds = _TdsSocket(sock=sock, login=_TdsLogin(), autocommit=True)
+    tds.tds_version = tds_base.TDS74
+    return NonMarsConnection(pooling=False, key=None, tds_socket=tds), sock
+
+
+def test_server_cursor():
+    conn, sock = _connection(
+        [
+            _open_response(handle=7),
+            _fetch_response([(1, "x", 0), (2, "y", 0)]),
+            _fetch_response([(3, "z", 0)]),
+            encode_reply(_end_call()),
+        ]
+    )
+    cursor = conn.server_cursor(fetch_size=2)
+    cursor.execute("select a, b from t where a > %s", (0,))
+    assert [d[0] for d in cursor.description] == ["a", "b"]
+    request = sock.consume_output()
+    assert _call(tds_base.TDS_SP_CURSOROPEN) in request
+    assert cursor.fetchone() == [1, "x"]
+    # rows are requested from the server one block at a time
+    assert _call(tds_base.TDS_SP_CURSORFETCH) in sock.consume_output()
+    assert cursor.fetchone() == [2, "y"]
+    assert sock.consume_output() == b""
+    assert list(cursor) == [[3, "z"]]
+    # last block is not full, so cursor is closed without extra fetch
+    requests = sock.consume_output()
+    assert requests.count(_call(tds_base.TDS_SP_CURSORFETCH)) == 1
+    assert _call(tds_base.TDS_SP_CURSORCLOSE) in requests
+    assert cursor.fetchall() == []
+
+
+def test_server_cursor_close():
+    conn, sock = _connection(
+        [
+            _open_response(handle=7),
+            _fetch_response([(1, "x", 0), (2, "y", 0)]),
+            encode_reply(_end_call()),
+        ]
+    )
+    with conn.server_cursor(fetch_size=2) as cursor:
+        cursor.execute("select a, b from t")
+        assert cursor.fetchmany(1) == [[1, "x"]]
+        sock.consume_output()
+    request = sock.consume_output()
+    assert _call(tds_base.TDS_SP_CURSORCLOSE) in request
+    assert struct.pack("<i", 7) in request
+
+
+def test_invalid_fetch_size():
+    conn, _ = _connection([])
+    with pytest.raises(ValueError):
+        conn.server_cursor(fetch_size=0)
+
+
+HIDDEN_ROWS = [(1, "a", 5), (None, "b", 6)]
+# all columns have fixed layout, so rows are copied by columnar fast path
+FIXED_COLUMNS = [
+    Column(name="a", type=IntType()),
+    Column(name="ROWSTAT", type=IntType(), flags=Column.fHidden),
+]
+
+
+def _hidden_column_session(columns=COLUMNS, rows=HIDDEN_ROWS, **kwargs):
+    return make_response_session(encode_result_set(columns, rows), **kwargs)
+
+
+def test_hidden_column_tuple_rows():
+    sess = _hidden_column_session()
+    assert [col[0] for col in sess.res_info.description] == ["a", "b"]
+    assert tuple(sess.fetchone()) == (1, "a")
+
+
+def test_hidden_column_lazy_rows():
+    sess = _hidden_column_session(row_strategy=lazy_row_strategy)
+    row = sess.fetchone()
+    assert len(row) == 2
+    assert row == (1, "a")
+    assert row[-1] == "a"
+    with pytest.raises(IndexError):
+        row[2]
+    with pytest.raises(KeyError):
+        row["ROWSTAT"]
+    assert list(sess.fetchone()) == [None, "b"]
+
+
+@pytest.mark.parametrize(
+    "columns,rows,expected",
+    [
+        (COLUMNS, HIDDEN_ROWS, [[1, None], ["a", "b"]]),
+        (FIXED_COLUMNS, [(1, 5), (2, 6)], [[1, 2]]),
+    ],
+)
+def test_hidden_column_fetch_columns(columns, rows, expected):
+    pytest.importorskip("numpy")
+    arrays = _hidden_column_session(columns, rows).fetch_columns()
+    assert [array.tolist() for array in arrays] == expected
+
+
+def test_hidden_column_arrow_batches():
+    pytest.importorskip("pyarrow")
+    batch = next(_hidden_column_session().fetch_arrow_batches(10))
+    assert batch.schema.names == ["a", "b"]
+    assert batch.to_pydict() == {"a": [1, None], "b": ["a", "b"]}
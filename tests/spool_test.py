@@ -0,0 +1,77 @@
+import datetime
+import decimal
+
+import pytest
+
+from pytds.row_strategies import dict_row_strategy, lazy_row_strategy
+from pytds.tds_base import Column
+from pytds.tds_types import (
+    DateTime2Type,
+    DecimalType,
+    IntType,
+    NVarCharMaxType,
+    NVarCharType,
+    XmlType,
+)
+from tests.utils import encode_result_set, make_response_session
+
+COLUMNS = [
+    Column(name="a", type=IntType()),
+    Column(name="b", type=NVarCharType(size=20)),
+    Column(name="c", type=DecimalType(precision=10, scale=2)),
+    Column(name="d", type=DateTime2Type(precision=6)),
+    Column(name="e", type=NVarCharMaxType()),
+]
+
+ROWS = [
+    (
+        i,
+        f"row {i}",
+        decimal.Decimal(i) / 4,
+        datetime.datetime(2020, 1, 2, 3, 4, 5, i),
+        "x" * i * 10,
+    )
+    for i in range(200)
+] + [(None,) * 5]
+
+
+@pytest.mark.parametrize("max_memory", [0, 1000, 1024 * 1024])
+def test_spooled_rows(max_memory):
+    sess = make_response_session(
+        encode_result_set(COLUMNS, ROWS, bufsize=512),
+        bufsize=512,
+    )
+    rows = sess.fetch_spooled(max_memory)
+    assert rows.spooled_to_file == (max_memory < 1024 * 1024)
+    # rows are read to the end of result set
+    assert sess.fetchone() is None
+    assert len(rows) == len(ROWS)
+    assert rows[0] == list(ROWS[0])
+    assert rows[-1] == [None] * 5
+    assert rows[10:12] == [list(ROWS[10]), list(ROWS[11])]
+    assert [tuple(row) for row in rows] == ROWS
+    with pytest.raises(IndexError):
+        rows[len(ROWS)]
+    rows.close()
+    assert len(rows) == 0
+
+
+def test_spooled_rows_strategy():
+    sess = make_response_session(
+        encode_result_set(COLUMNS, ROWS[:2]),
+        row_strategy=dict_row_strategy,
+    )
+    assert sess.fetchone() == dict(zip("abcde", ROWS[0]))
+    with sess.fetch_spooled(0) as rows:
+        assert list(rows) == [dict(zip("abcde", ROWS[1]))]
+
+
+def test_spooled_rows_eagerly_decoded_columns():
+    # XML values can not be copied without decoding
+    columns = [Column(name="a", type=IntType()), Column(name="x", type=XmlType())]
+    sess = make_response_session(
+        encode_result_set(columns, [(1, "<a/>"), (2, None)]),
+        row_strategy=lazy_row_strategy,
+    )
+    with sess.fetch_spooled(0) as rows:
+        assert list(rows) == [(1, "<a/>"), (2, None)]
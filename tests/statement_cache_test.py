@@ -0,0 +1,55 @@
+import pytest
+
+from pytds import tds_base
+from pytds.tds_base import _TdsLogin
+from pytds.tds_socket import _TdsSocket
+from tests.utils import MockSock
+
+
+def _session():
+    tds = _TdsSocket(sock=MockSock(), login=_TdsLogin())
+    tds.tds_version = tds_base.TDS74
+    return tds.main_session
+
+
+def test_rewrite_positional():
+    sess = _session()
+    query, params, declaration = sess._rewrite_query(
+        "select %s, %s, %s", (1, None, "a")
+    )
+    assert query == "select @P1, NULL, @P2"
+    assert [(p.name, p.value) for p in params] == [("@P1", 1), ("@P2", "a")]
+    assert declaration == "@P1 INT,@P2 NVARCHAR(MAX)"
+    assert sess._rewrite_query("select %s", (5,))[0] == "select @P1"
+    assert sess._rewrite_query("select 1", None) == ("select 1", [], "")
+
+
+def test_rewrite_named():
+    sess = _session()
+    query, params, declaration = sess._rewrite_query(
+        "select %(a)s, %(b)s, %(a)s", {"a": 1, "b": None}
+    )
+    assert query == "select @P1, NULL, @P1"
+    assert [(p.name, p.value) for p in params] == [("@P1", 1)]
+    assert declaration == "@P1 INT"
+
+
+def test_rewritten_queries_are_cached():
+    sess = _session()
+    sess._rewrite_query("select %s, %s", (1, 2))
+    query, params, declaration = sess._rewrite_query("select %s, %s", (3, "x"))
+    assert len(sess.conn.statement_cache) == 1
+    assert query == "select @P1, @P2"
+    assert [p.value for p in params] == [3, "x"]
+    # declaration follows types of the values
+    assert declaration == "@P1 INT,@P2 NVARCHAR(MAX)"
+    # NULL values change rewritten query
+    assert sess._rewrite_query("select %s, %s", (None, 2))[0] == "select NULL, @P1"
+    assert len(sess.conn.statement_cache) == 2
+
+
+def test_rewrite_errors_are_not_cached():
+    sess = _session()
+    with pytest.raises(KeyError):
+        sess._rewrite_query("select %(a)s", {"b": 1})
+    assert len(sess.conn.statement_cache) == 0
@@ -1,7 +1,18 @@
+import codecs
+import struct
+
 import pytest
 
-from pytds.tds_base import PacketType, _header, ClosedConnectionError
+from pytds.tds_base import (
+    PacketType,
+    _header,
+    _uint_le,
+    _uint8_le,
+    ClosedConnectionError,
+    readall,
+)
 from pytds.tds_reader import _TdsReader
+from pytds.tds_types import PlpReader
 from tests.utils import BytesSocket
 
 
@@ -132,3 +143,126 @@ def test_begin_response_incorrectly():
         match="begin_response was called before previous response was fully consumed",
     ):
         reader.begin_response()
+
+
+def _responses_stream():
+    # first response consists of two packets, second response of single packet
+    return (
+        _header.pack(PacketType.REPLY, 0, 8 + len(b"hello"), 123, 0)
+        + b"hello"
+        + _header.pack(PacketType.REPLY, 1, 8 + len(b"secondpacket"), 123, 0)
+        + b"secondpacket"
+        + _header.pack(PacketType.TRANS, 1, 8 + len(b"secondresponse"), 123, 0)
+        + b"secondresponse"
+    )
+
+
+@pytest.mark.parametrize("readahead_size", [32, 4096])
+def test_readahead_reader(readahead_size):
+    """
+    Test reader in read-ahead mode, including case when packets
+    wrap around the end of the read-ahead buffer
+    """
+    transport = BytesSocket(_responses_stream())
+    reader = _TdsReader(
+        transport=transport,
+        tds_session=None,
+        bufsize=32,
+        readahead_size=readahead_size,
+    )
+    assert reader.recv(100) == b""
+    assert reader.get_block_size() == 32
+
+    response_header = reader.begin_response()
+    assert response_header.type == PacketType.REPLY
+    assert response_header.spid == 123
+    assert reader.recv(3) == b"hel"
+    # unpacking structure which spans two packets
+    assert reader.unpack(struct.Struct("4s")) == (b"lose",)
+    assert reader.recv(100) == b"condpacket"
+    assert reader.recv(100) == b""
+
+    reader.begin_response()
+    assert reader.packet_type == PacketType.TRANS
+    assert reader.read_whole_packet() == b"secondresponse"
+    assert reader.stream_finished()
+
+    with pytest.raises(ClosedConnectionError):
+        reader.begin_response()
+
+
+def test_readahead_reduces_receives():
+    stream = b"".join(
+        _header.pack(PacketType.REPLY, 0, 8 + 100, 1, 0) + bytes(100)
+        for _ in range(99)
+    ) + _header.pack(PacketType.REPLY, 1, 8 + 100, 1, 0) + bytes(100)
+
+    class CountingSocket(BytesSocket):
+        calls = 0
+
+        def recv_into(self, buffer, size) -> int:
+            self.calls += 1
+            return super().recv_into(buffer, size)
+
+    transport = CountingSocket(stream)
+    reader = _TdsReader(
+        transport=transport, tds_session=None, bufsize=4096, readahead_size=65536
+    )
+    reader.begin_response()
+    assert len(reader.read_whole_packet()) == 100
+    assert len(readall(reader, 9900)) == 9900
+    assert reader.stream_finished()
+    assert transport.calls == 1
+
+
+def _packets(*payloads):
+    stream = b""
+    for i, payload in enumerate(payloads):
+        last = 1 if i == len(payloads) - 1 else 0
+        stream += _header.pack(PacketType.REPLY, last, 8 + len(payload), 1, 0) + payload
+    return stream
+
+
+def test_readinto_and_read_bytes():
+    reader = _TdsReader(
+        transport=BytesSocket(_packets(b"abcdef", b"ghij", b"klmnop")),
+        tds_session=None,
+    )
+    reader.begin_response()
+    assert reader.read_bytes(2) == b"ab"
+    buf = bytearray(10)
+    reader.readinto(memoryview(buf)[1:9])
+    assert buf == b"\x00cdefghij\x00"
+    assert reader.read_bytes(5) == b"klmno"
+    assert reader.read_str(1, codecs.lookup("ascii")) == "p"
+    with pytest.raises(ClosedConnectionError):
+        reader.readinto(bytearray(1))
+
+
+def test_read_str_across_packets():
+    encoded = "привет".encode("utf-16-le")
+    reader = _TdsReader(
+        transport=BytesSocket(_packets(encoded[:5], encoded[5:])),
+        tds_session=None,
+    )
+    reader.begin_response()
+    assert reader.read_ucs2(6) == "привет"
+
+
+def test_plp_read_all():
+    value = bytes(range(200))
+    stream = (
+        _uint8_le.pack(len(value))
+        + _uint_le.pack(150)
+        + value[:150]
+        + _uint_le.pack(50)
+        + value[150:]
+        + _uint_le.pack(0)
+    )
+    reader = _TdsReader(
+        transport=BytesSocket(_packets(stream[:100], stream[100:])),
+        tds_session=None,
+    )
+    reader.begin_response()
+    assert PlpReader(reader).read_all() == value
+    assert reader.stream_finished()
@@ -0,0 +1,122 @@
+import struct
+
+import pytest
+
+from pytds import tds_base
+from pytds.tds_base import PacketType, _header, _int_le
+from pytds.tds_reader import _TdsReader
+from pytds.tds_socket import _TdsSocket
+from pytds.tds_types import IntType
+from pytds.tds_writer import _TdsWriter
+from tests.utils import BytesSocket, MockSock
+
+
+class SendallSocket:
+    def __init__(self):
+        self.data = bytearray()
+
+    def sendall(self, buf, flags=0):
+        self.data += buf
+
+
+class SendmsgSocket(SendallSocket):
+    """
+    Socket which supports sendmsg, sends at most max_send bytes per call
+    to exercise handling of partial sends
+    """
+
+    def __init__(self, max_send=1000):
+        super().__init__()
+        self.max_send = max_send
+        self.calls = 0
+
+    def sendmsg(self, buffers):
+        self.calls += 1
+        sent = 0
+        for buf in buffers:
+            buf = bytes(buf)[: self.max_send - sent]
+            self.data += buf
+            sent += len(buf)
+            if sent >= self.max_send:
+                break
+        return sent
+
+
+def _write_request(transport):
+    writer = _TdsWriter(transport=transport, bufsize=100, tds_session=None)
+    writer.begin_packet(PacketType.QUERY)
+    writer.put_int(-5)
+    writer.write(bytes(range(250)))
+    writer.put_usmallint(7)
+    writer.write(bytearray(b"mutable" * 30))
+    writer.write_ucs2("hello")
+    writer.flush()
+
+
+def _read_response(data):
+    reader = _TdsReader(transport=BytesSocket(bytes(data)), tds_session=None)
+    reader.begin_response()
+    return reader.read_whole_packet() + b"".join(iter(lambda: reader.recv(1000), b""))
+
+
+@pytest.mark.parametrize("max_send", [1000, 37])
+def test_sendmsg_stream_matches_sendall(max_send):
+    plain = SendallSocket()
+    _write_request(plain)
+    gather = SendmsgSocket(max_send=max_send)
+    _write_request(gather)
+    assert gather.data == plain.data
+    payload = _read_response(plain.data)
+    assert payload == (
+        _int_le.pack(-5)
+        + bytes(range(250))
+        + b"\x07\x00"
+        + b"mutable" * 30
+        + "hello".encode("utf-16-le")
+    )
+
+
+def test_large_payload_sent_with_single_call():
+    transport = SendmsgSocket(max_send=10**6)
+    writer = _TdsWriter(transport=transport, bufsize=100, tds_session=None)
+    writer.begin_packet(PacketType.BULK)
+    data = bytes(92 * 10 + 5)
+    writer.write(data)
+    writer.flush()
+    assert transport.calls == 1
+    assert _read_response(transport.data) == data
+    # packet numbers and statuses are consistent
+    headers = [
+        _header.unpack_from(transport.data, pos)
+        for pos in range(0, len(transport.data), 100)
+    ]
+    assert [h[4] for h in headers] == list(range(11))
+    assert [h[1] for h in headers] == [0] * 10 + [1]
+
+
+class SendmsgMockSock(MockSock):
+    def sendmsg(self, buffers):
+        data = b"".join(bytes(buf) for buf in buffers)
+        self.sendall(data)
+        return len(data)
+
+
+def test_aborted_request_is_not_sent():
+    sock = SendmsgMockSock()
+    tds = _TdsSocket(sock=sock, login=tds_base._TdsLogin(), autocommit=True)
+    tds.tds_version = tds_base.TDS74
+    sess = tds.main_session
+    params = [
+        sess.make_param("@a", "x" * 10000),
+        tds_base.Param(name="@b", type=IntType(), value="not a number"),
+    ]
+    # first parameter fills several packets before serializing the second one fails
+    with pytest.raises(struct.error):
+        sess.submit_rpc("proc", params)
+    assert sess.state == tds_base.TDS_IDLE
+    sess.submit_plain_query("select 1")
+    output = sock.consume_output()
+    assert output[0] == PacketType.QUERY
+    # output consists of single final packet of the query
+    assert output[1] == 1
+    assert struct.unpack(">H", output[2:4])[0] == len(output)
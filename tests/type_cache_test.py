@@ -0,0 +1,63 @@
+import datetime
+
+import pytds.tz
+from pytds.collate import raw_collation
+from pytds.tds_base import TDS74
+from pytds.tds_types import (
+    BigIntType,
+    DecimalType,
+    IntType,
+    NVarCharType,
+    SerializerFactory,
+    TdsTypeInferrer,
+    sql_type_by_declaration,
+)
+
+
+def _inferrer():
+    return TdsTypeInferrer(type_factory=SerializerFactory(TDS74), allow_tz=True)
+
+
+def test_inferred_types_are_cached():
+    inferrer = _inferrer()
+    assert inferrer.from_value("a") is inferrer.from_value("b")
+    assert inferrer.from_value(1) is inferrer.from_value(2)
+    assert inferrer.from_value(None) is inferrer.from_value(None)
+    assert inferrer.from_class(int) is inferrer.from_class(int)
+
+
+def test_inference_cache_by_value_range():
+    inferrer = _inferrer()
+    assert inferrer.from_value(1) == IntType()
+    assert inferrer.from_value(2**40) == BigIntType()
+    assert inferrer.from_value(10**20) == DecimalType(precision=38)
+    assert inferrer.from_value(True).get_declaration() == "BIT"
+    assert inferrer.from_value(1) == IntType()
+    naive = datetime.datetime(2020, 1, 1)
+    aware = datetime.datetime(2020, 1, 1, tzinfo=pytds.tz.utc)
+    assert inferrer.from_value(naive).get_declaration() == "DATETIME2(6)"
+    assert inferrer.from_value(aware).get_declaration() == "DATETIMEOFFSET(6)"
+    assert inferrer.from_value(naive).get_declaration() == "DATETIME2(6)"
+
+
+def test_serializers_are_cached():
+    factory = SerializerFactory(TDS74)
+    serializer = factory.serializer_by_type(NVarCharType(size=10), raw_collation)
+    assert factory.serializer_by_type(NVarCharType(size=10), raw_collation) is (
+        serializer
+    )
+    assert factory.serializer_by_type(NVarCharType(size=20), raw_collation) is not (
+        serializer
+    )
+
+
+def test_equal_types_have_equal_hashes():
+    assert hash(NVarCharType(size=10)) == hash(NVarCharType(size=10))
+    assert {DecimalType(10, 2): 1}[DecimalType(10, 2)] == 1
+
+
+def test_declarations_are_cached():
+    assert sql_type_by_declaration("nvarchar(10)") is sql_type_by_declaration(
+        "nvarchar(10)"
+    )
+    assert sql_type_by_declaration(" int ") == IntType()
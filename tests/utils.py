@@ -1,4 +1,7 @@
+from __future__ import annotations
+
 import hashlib
+import struct
 import sys
 import unittest
 from io import BytesIO
@@ -69,6 +72,12 @@ class MockSock:
     def setsockopt(self, *args):
         pass
 
+    def gettimeout(self):
+        return None
+
+    def settimeout(self, timeout):
+        pass
+
     def close(self):
         self._closed = True
 
@@ -94,6 +103,97 @@ class MockSock:
         self._packet_pos = 0
 
 
+def encode_result_set(
+    metadata: list[pytds.Column],
+    rows,
+    tds_version: int = pytds.tds_base.TDS74,
+    bufsize: int = 4096,
+) -> bytes:
+    """
+    Encodes result set as it would be sent by the server: COLMETADATA token,
+    ROW token per row and final DONE token.
+    Bulk insert request has the same layout so it is used to produce the stream.
+    """
+    sock = MockSock()
+    tds = pytds.tds_socket._TdsSocket(sock=sock, login=pytds.tds_base._TdsLogin())
+    tds.tds_version = tds_version
+    tds.collation = pytds.collate.raw_collation
+    tds.main_session._writer.bufsize = bufsize
+    tds.main_session.submit_bulk(metadata, rows)
+    return sock.consume_output()
+
+
+def make_response_session(
+    response: bytes,
+    tds_version: int = pytds.tds_base.TDS74,
+    bufsize: int = 4096,
+    login: pytds.tds_base._TdsLogin | None = None,
+    **kwargs,
+) -> pytds.tds_session._TdsSession:
+    """
+    Creates session which has sent a query and will read given response
+    """
+    sock = MockSock([response])
+    tds = pytds.tds_socket._TdsSocket(
+        sock=sock, login=login or pytds.tds_base._TdsLogin(), **kwargs
+    )
+    tds.tds_version = tds_version
+    sess = tds.main_session
+    sess._reader.set_block_size(bufsize)
+    sess.submit_plain_query("select 1")
+    sess.begin_response()
+    sess.find_result_or_done()
+    return sess
+
+
+def encode_reply(payload: bytes) -> bytes:
+    """
+    Wraps tokens into single final REPLY packet
+    """
+    return (
+        pytds.tds_base._header.pack(
+            pytds.tds_base.PacketType.REPLY, 1, 8 + len(payload), 0, 0
+        )
+        + payload
+    )
+
+
+def encode_done(token: int, status: int, count: int = 0) -> bytes:
+    """
+    Encodes DONE/DONEPROC/DONEINPROC token for TDS 7.2+
+    """
+    return struct.pack("<BHHq", token, status, 0, count)
+
+
+def _b_varchar(s: str) -> bytes:
+    return bytes([len(s)]) + s.encode("utf-16-le")
+
+
+def encode_int_return_value(value: int, ordinal: int = 0) -> bytes:
+    """
+    Encodes RETURNVALUE token with INT value for TDS 7.2+
+    """
+    return (
+        struct.pack("<BH", pytds.tds_base.TDS_PARAM_TOKEN, ordinal)
+        + _b_varchar("")
+        + struct.pack("<BIHBBBi", 1, 0, 0, pytds.tds_base.SYBINTN, 4, 4, value)
+    )
+
+
+def encode_error(msg_no: int, message: str) -> bytes:
+    """
+    Encodes ERROR token for TDS 7.2+
+    """
+    body = (
+        struct.pack("<iBBH", msg_no, 1, 16, len(message))
+        + message.encode("utf-16-le")
+        + _b_varchar("server")
+        + _b_varchar("")
+        + struct.pack("<i", 1)
+    )
+    return struct.pack("<BH", pytds.tds_base.TDS_ERROR_TOKEN, len(body)) + body
+
+
 def does_database_exist(cursor: pytds.Cursor, name: str) -> bool:
     """
     Checks if given database exist and returns true if it does